@@ -0,0 +1,131 @@
+# almacen_series.py
+
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+from base_sqlite import conexion_sqlite
+
+# Base local de series descargadas (Banxico, FRED y archivos); se puede cambiar con la variable de entorno SERIES_DB
+RUTA_ALMACEN = os.environ.get("SERIES_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_locales", "series.sqlite"))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS observaciones (
+    fuente TEXT NOT NULL,
+    id_serie TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    valor REAL,
+    PRIMARY KEY (fuente, id_serie, fecha)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estadisticas (
+    fuente TEXT NOT NULL,
+    id_serie TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    valor REAL,
+    media REAL,
+    volatilidad REAL,
+    p10 REAL,
+    p50 REAL,
+    p90 REAL,
+    percentil_historico REAL,
+    PRIMARY KEY (fuente, id_serie, fecha)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estado_estadisticas (
+    fuente TEXT NOT NULL,
+    id_serie TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    PRIMARY KEY (fuente, id_serie)
+);
+"""
+
+COLUMNAS_ESTADISTICAS = ["valor", "media", "volatilidad", "p10", "p50", "p90", "percentil_historico"]
+
+
+# --- CONEXIÓN ---
+def _conexion(ruta=None):
+    return conexion_sqlite(ruta or RUTA_ALMACEN, ESQUEMA)
+
+
+# --- OBSERVACIONES ---
+def guardar_observaciones(fuente, id_serie, serie, ruta=None):
+    """
+    Inserta o reemplaza las observaciones de una serie (índice de fechas). Devuelve cuántas se escribieron.
+    """
+    serie = serie.dropna()
+    filas = zip([fuente] * len(serie), [id_serie] * len(serie),
+                pd.DatetimeIndex(serie.index).strftime("%Y-%m-%d"), serie.to_numpy(dtype=float).tolist())
+    with _conexion(ruta) as conexion:
+        conexion.executemany("INSERT OR REPLACE INTO observaciones VALUES (?, ?, ?, ?)", filas)
+    return len(serie)
+
+
+def leer_serie(fuente, id_serie, desde=None, ruta=None):
+    """
+    Serie guardada, opcionalmente desde una fecha (inclusive). Vacía si no hay datos.
+    """
+    consulta = "SELECT fecha, valor FROM observaciones WHERE fuente = ? AND id_serie = ?"
+    valores = [fuente, id_serie]
+    if desde is not None:
+        consulta += " AND fecha >= ?"
+        valores.append(pd.Timestamp(desde).strftime("%Y-%m-%d"))
+    with _conexion(ruta) as conexion:
+        datos = pd.read_sql_query(consulta + " ORDER BY fecha", conexion, params=valores, parse_dates=["fecha"], index_col="fecha")
+    return datos["valor"].rename(id_serie)
+
+
+def ultima_fecha(fuente, id_serie, ruta=None):
+    with _conexion(ruta) as conexion:
+        fecha = conexion.execute("SELECT MAX(fecha) FROM observaciones WHERE fuente = ? AND id_serie = ?", (fuente, id_serie)).fetchone()[0]
+    return None if fecha is None else pd.Timestamp(fecha)
+
+
+# --- ESTADÍSTICAS PRECALCULADAS ---
+def guardar_estadisticas(fuente, id_serie, estadisticas, estado, ruta=None, reemplazar=False):
+    """
+    Agrega filas de estadísticas (índice de fechas, COLUMNAS_ESTADISTICAS) y guarda el estado incremental
+    en la misma transacción, para que ambos queden siempre consistentes. Con `reemplazar` se borran antes
+    las filas anteriores de la serie (historia reconstruida desde cero).
+    """
+    filas = ((fuente, id_serie, fecha, *valores) for fecha, valores in
+             zip(estadisticas.index.strftime("%Y-%m-%d"), estadisticas[COLUMNAS_ESTADISTICAS].itertuples(index=False)))
+    with _conexion(ruta) as conexion:
+        if reemplazar:
+            conexion.execute("DELETE FROM estadisticas WHERE fuente = ? AND id_serie = ?", (fuente, id_serie))
+        conexion.executemany("INSERT OR REPLACE INTO estadisticas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+        conexion.execute("INSERT OR REPLACE INTO estado_estadisticas VALUES (?, ?, ?)", (fuente, id_serie, json.dumps(estado)))
+
+
+def leer_estadisticas(fuente, id_serie, ruta=None):
+    with _conexion(ruta) as conexion:
+        return pd.read_sql_query(f"SELECT fecha, {', '.join(COLUMNAS_ESTADISTICAS)} FROM estadisticas WHERE fuente = ? AND id_serie = ? ORDER BY fecha",
+                                 conexion, params=[fuente, id_serie], parse_dates=["fecha"], index_col="fecha")
+
+
+def leer_estado(fuente, id_serie, ruta=None):
+    with _conexion(ruta) as conexion:
+        fila = conexion.execute("SELECT estado FROM estado_estadisticas WHERE fuente = ? AND id_serie = ?", (fuente, id_serie)).fetchone()
+    return None if fila is None else json.loads(fila[0])
+
+
+# --- ESCRITURA DIRECTA DESDE LOS DESCARGADORES ---
+def respaldar_serie(fuente, id_serie, serie, ruta=None):
+    """
+    Copia una descarga al almacén. Un error de la base local nunca interrumpe la descarga.
+    """
+    try:
+        guardar_observaciones(fuente, id_serie, serie, ruta)
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def serie_respaldo(fuente, id_serie, desde=None, ruta=None):
+    """
+    Serie guardada para usarla cuando la API no responde, o None si no hay datos locales.
+    """
+    try:
+        serie = leer_serie(fuente, id_serie, desde, ruta)
+    except (sqlite3.Error, OSError):
+        return None
+    return serie if len(serie) else None
@@ -0,0 +1,32 @@
+# base_sqlite.py
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+# (ruta, esquema) ya creados en este proceso; dos almacenes pueden compartir archivo con esquemas distintos
+_esquemas_creados = set()
+
+
+@contextmanager
+def conexion_sqlite(ruta, esquema):
+    """
+    Conexión de corta duración (una por consulta) dentro de una transacción, compartida por los almacenes locales
+    (almacen_series, historial_resultados). El archivo se crea en modo WAL y el esquema se aplica una vez por proceso.
+    """
+    if (ruta, esquema) not in _esquemas_creados:
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with sqlite3.connect(ruta) as conexion:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.executescript(esquema)
+        conexion.close()
+        _esquemas_creados.add((ruta, esquema))
+
+    conexion = sqlite3.connect(ruta, timeout=30) # Espera a otro proceso que esté escribiendo en lugar de fallar
+    conexion.execute("PRAGMA foreign_keys=ON")
+    conexion.execute("PRAGMA synchronous=NORMAL") # Seguro con WAL y evita un fsync por transacción
+    try:
+        with conexion:
+            yield conexion
+    finally:
+        conexion.close()
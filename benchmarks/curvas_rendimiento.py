@@ -0,0 +1,70 @@
+# benchmarks/curvas_rendimiento.py
+"""
+Ajuste histórico de curvas Nelson-Siegel/Svensson por rejilla con búsqueda tibia contra una
+optimización no lineal (scipy.optimize.least_squares) fecha por fecha.
+
+Uso:
+    python benchmarks/curvas_rendimiento.py [--fechas 5000] [--modelo svensson] [--procesos 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from curva_rendimientos import PLAZOS_CURVA, ajustar_curvas, cargas_factores  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fechas", type=int, default=5000)
+    parser.add_argument("--modelo", choices=["nelson_siegel", "svensson"], default="svensson")
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    # Curvas sintéticas: factores que siguen caminatas aleatorias, ruido de 1 pb y 3% de nodos faltantes
+    rng = np.random.default_rng(0)
+    plazos = np.array(list(PLAZOS_CURVA["usa"].values()))
+    betas = np.cumsum(rng.normal(0, 0.02, (args.fechas, 4)), axis=0) + [5, -2, 1, 0.5]
+    betas[:, 0] = np.abs(betas[:, 0])
+    tau1 = np.exp(np.log(1.5) + np.cumsum(rng.normal(0, 0.01, args.fechas)))
+    rendimientos = np.einsum('dmk,dk->dm', cargas_factores(plazos, tau1, np.full(args.fechas, 6.0)), betas)
+    rendimientos += rng.normal(0, 0.01, rendimientos.shape)
+    rendimientos[rng.random(rendimientos.shape) < 0.03] = np.nan
+    curva = pd.DataFrame(rendimientos, index=pd.bdate_range("2005-01-03", periods=args.fechas), columns=plazos)
+
+    inicio = time.perf_counter()
+    parametros = ajustar_curvas(curva, args.modelo, n_procesos=args.procesos)
+    t_rejilla = time.perf_counter() - inicio
+
+    # Referencia: mínimos cuadrados no lineales desde un punto fijo, sobre una muestra de fechas
+    from scipy.optimize import least_squares
+
+    svensson = args.modelo == "svensson"
+    muestra = rng.choice(args.fechas, 200, replace=False)
+    rmse_referencia = []
+    inicio = time.perf_counter()
+    for t in muestra:
+        observado = ~np.isnan(rendimientos[t])
+        m, y = plazos[observado], rendimientos[t, observado]
+
+        def residuos(theta):
+            X = cargas_factores(m, np.exp(theta[-2 if svensson else -1]), np.exp(theta[-1]) if svensson else None)
+            return X @ theta[:X.shape[1]] - y
+
+        x0 = np.r_[y[-1], y[0] - y[-1], 0.0, 0.0, np.log(1.0), np.log(5.0)] if svensson else np.r_[y[-1], y[0] - y[-1], 0.0, np.log(1.0)]
+        rmse_referencia.append(np.sqrt(np.mean(least_squares(residuos, x0).fun ** 2)))
+    t_referencia = (time.perf_counter() - inicio) / len(muestra) * args.fechas
+
+    print(f"{args.fechas} curvas ({args.modelo}), {len(plazos)} nodos")
+    print(f"  rejilla con búsqueda tibia: {t_rejilla:8.2f} s   RMSE mediano {parametros['rmse'].median() * 100:.2f} pb")
+    print(f"  least_squares por fecha:    {t_referencia:8.2f} s   RMSE mediano {np.median(rmse_referencia) * 100:.2f} pb (estimado)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/ensamble_modelos.py
+"""
+Tiempo del ensamble de modelos (ajuste completo + backtest de cada especificación candidata) en serie
+y repartido en procesos, contra el candidato individual más lento. Con tantos núcleos como candidatos,
+el tiempo en paralelo debería acercarse al del candidato más lento más el arranque de los procesos.
+
+Uso:
+    python benchmarks/ensamble_modelos.py [--observaciones 280] [--variables 3] [--procesos 0] [--exogenas]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def simular_datos(n_obs, k, semilla=0):
+    """
+    Inflación estacionaria y k - 1 series con una tendencia estocástica común (cointegradas).
+    """
+    rng = np.random.default_rng(semilla)
+    tendencia = np.cumsum(rng.normal(0, 0.05, n_obs))
+    inflacion = np.zeros(n_obs)
+    for t in range(1, n_obs):
+        inflacion[t] = 0.9 * inflacion[t - 1] + rng.normal(0, 0.3)
+    columnas = {"inflacion": 4 + inflacion}
+    for j in range(1, k):
+        columnas[f"serie_{j}"] = (1 + 0.5 * j) * tendencia + rng.normal(0, 0.05, n_obs)
+    return pd.DataFrame(columnas, index=pd.date_range("2002-01-01", periods=n_obs, freq="MS"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--observaciones", type=int, default=280)
+    parser.add_argument("--variables", type=int, default=3)
+    parser.add_argument("--procesos", type=int, default=0, help="0 = un proceso por candidato (hasta os.cpu_count())")
+    parser.add_argument("--exogenas", action="store_true")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    import statsmodels.tsa.api  # noqa: F401  (la importación no debe contar en el primer candidato)
+
+    from ensamble_modelos import _evaluar_candidato, ajustar_ensamble, especificaciones_candidatas, orden_en_niveles
+    from motor_var_vecm import HORIZONTE_MAXIMO_ANOS
+
+    df = simular_datos(args.observaciones, args.variables)
+    variables = tuple(df.columns[1:])
+    exogenas = pd.DataFrame({"exogena": np.sin(np.arange(len(df)) / 12)}, index=df.index) if args.exogenas else None
+
+    especificaciones = especificaciones_candidatas(args.variables)
+    orden_maximo = max(orden_en_niveles(e) for e in especificaciones)
+    diferenciadas = [col in variables for col in df.columns]
+    exog = None if exogenas is None else exogenas.to_numpy()
+    tiempos = []
+    for e in especificaciones:
+        inicio = time.perf_counter()
+        _evaluar_candidato(df.to_numpy(), exog, e, diferenciadas, orden_maximo - orden_en_niveles(e), HORIZONTE_MAXIMO_ANOS * 12)
+        tiempos.append(time.perf_counter() - inicio)
+
+    n_procesos = args.procesos or min(os.cpu_count() or 1, len(especificaciones))
+    medidas = {}
+    for procesos in sorted({1, n_procesos}):
+        ajustar_ensamble.clear()
+        inicio = time.perf_counter()
+        ajuste = ajustar_ensamble(df, exogenas, variables, "aic", n_procesos=procesos)
+        medidas[procesos] = time.perf_counter() - inicio
+
+    print(f"{len(especificaciones)} candidatos, {args.observaciones} observaciones, {args.variables} variables, {os.cpu_count()} núcleos")
+    print(f"  candidato más lento:            {max(tiempos) * 1000:8.1f} ms ({especificaciones[int(np.argmax(tiempos))]['nombre']})")
+    print(f"  suma de los candidatos:         {sum(tiempos) * 1000:8.1f} ms")
+    for procesos, transcurrido in medidas.items():
+        print(f"  ensamble con {procesos:>2} proceso(s):      {transcurrido * 1000:8.1f} ms")
+    print(f"  modelo de mayor peso:           {ajuste['ensamble'].index[0]} ({ajuste['ensamble']['Peso'].iloc[0]:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/estadisticas_embi.py
+"""
+Actualización incremental de las estadísticas del EMBI (un día nuevo) contra recalcular
+las ventanas móviles de toda la historia con pandas.
+
+Uso:
+    python benchmarks/estadisticas_embi.py [--dias 7000] [--repeticiones 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from riesgo_pais_embi import VENTANA_DIAS, actualizar_estadisticas, estado_inicial  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=7000)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range("1998-01-01", periods=args.dias + 1)
+    diferencial = pd.Series(300 + np.cumsum(rng.normal(0, 6, args.dias + 1)).clip(-250, None), index=fechas)
+    historia, nuevo = diferencial.iloc[:-1], diferencial.iloc[-1:]
+
+    inicio = time.perf_counter()
+    estadisticas, estado = actualizar_estadisticas(estado_inicial(), historia)
+    t_inicial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        actualizar_estadisticas(estado, nuevo)
+    t_incremental = (time.perf_counter() - inicio) / args.repeticiones
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        ventana = diferencial.rolling(VENTANA_DIAS, min_periods=1)
+        referencia = pd.DataFrame({"media": ventana.mean(), "p10": ventana.quantile(0.10), "p50": ventana.quantile(0.50), "p90": ventana.quantile(0.90),
+                                   "volatilidad": diferencial.diff().pow(2).rolling(VENTANA_DIAS - 1).mean().pow(0.5) * np.sqrt(252)})
+    t_recalculo = (time.perf_counter() - inicio) / args.repeticiones
+
+    ultimo, _ = actualizar_estadisticas(estado, nuevo)
+    print(f"{args.dias} días de historia, ventana de {VENTANA_DIAS}")
+    print(f"  ingesta inicial (una vez):     {t_inicial * 1e3:9.1f} ms")
+    print(f"  un día nuevo, incremental:     {t_incremental * 1e3:9.3f} ms")
+    print(f"  un día nuevo, recalculando:    {t_recalculo * 1e3:9.3f} ms")
+    print(f"  diferencia en media:           {abs(ultimo['media'].iloc[-1] - referencia['media'].iloc[-1]):.2e}")
+    print(f"  diferencia en p90 (pb):        {abs(ultimo['p90'].iloc[-1] - referencia['p90'].iloc[-1]):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/historial_consultas.py
+"""
+Tiempo de consulta del historial de proyecciones con muchas corridas guardadas.
+
+Uso:
+    python benchmarks/historial_consultas.py [--corridas 5000]
+Usa una base temporal; no toca datos_locales/.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historial_resultados import buscar_corridas, cargar_escenarios, guardar_corrida  # noqa: E402
+
+
+def resultados_sinteticos(vintage, anos, rng):
+    fechas = pd.date_range(vintage + pd.DateOffset(months=1), periods=anos * 12, freq="MS")
+    base = pd.Series(3 + rng.normal(0, 0.1, len(fechas)).cumsum() * 0.01, index=fechas)
+    return {
+        "df_historico": pd.DataFrame(index=[vintage]),
+        "escenario_base": base, "escenario_positivo": base - 0.5, "escenario_negativo": base + 0.5,
+        "promedios": {"Base": base.mean(), "Positivo": base.mean() - 0.5, "Negativo": base.mean() + 0.5},
+        "modelo_usado": "VAR", "relaciones_coint": 0, "anos_proyectados": anos,
+    }
+
+
+def medir(funcion, repeticiones=200):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corridas", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ruta = os.path.join(tempfile.mkdtemp(), "historial.sqlite")
+    vintages = pd.date_range("2015-01-01", periods=120, freq="MS")
+
+    inicio = time.perf_counter()
+    for i in range(args.corridas):
+        pais = ("mexico", "usa")[i % 2]
+        parametros = {"start_date": "2002-01-01", "anos_proyeccion": 30, "meta_alta": 5.0 + (i // 240) * 0.1}
+        guardar_corrida(pais, parametros, resultados_sinteticos(vintages[(i // 2) % len(vintages)], 30, rng), ruta=ruta)
+    t_escritura = time.perf_counter() - inicio
+
+    ultimo_id = int(buscar_corridas("mexico", limite=1, ruta=ruta)["id"].iloc[0])
+    print(f"{args.corridas} corridas de 30 años guardadas en {t_escritura:.1f} s")
+    print(f"  buscar_corridas(pais):           {medir(lambda: buscar_corridas('mexico', ruta=ruta)):6.2f} ms")
+    print(f"  buscar_corridas(pais, vintage):  {medir(lambda: buscar_corridas('usa', vintage='2020-06-01', ruta=ruta)):6.2f} ms")
+    print(f"  cargar_escenarios(id):           {medir(lambda: cargar_escenarios(ultimo_id, ruta=ruta)):6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/intervalos_pronostico.py
+"""
+Compara los intervalos de statsmodels (forecast_interval, un cálculo completo por cada alpha)
+contra los componentes MA(∞) de pronostico_analitico calculados una vez por ajuste.
+
+Uso:
+    python benchmarks/intervalos_pronostico.py [--pasos 600] [--variables 3] [--rezagos 12]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pronostico_analitico import calcular_componentes, intervalo  # noqa: E402
+
+
+def simular_var(n_obs, k, p, semilla=0):
+    rng = np.random.default_rng(semilla)
+    coefs = rng.normal(0, 0.3 / (k * p), size=(p, k, k))
+    coefs[0] += 0.5 * np.eye(k)
+    y = np.zeros((n_obs + p, k))
+    for t in range(p, n_obs + p):
+        y[t] = sum(coefs[j] @ y[t - j - 1] for j in range(p)) + rng.normal(size=k)
+    return y[p:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasos", type=int, default=600)
+    parser.add_argument("--variables", type=int, default=3)
+    parser.add_argument("--rezagos", type=int, default=12)
+    args = parser.parse_args()
+
+    from statsmodels.tsa.api import VAR
+
+    resultados = VAR(simular_var(300, args.variables, args.rezagos)).fit(args.rezagos)
+    y_input = resultados.endog[-resultados.k_ar:]
+    alphas = (0.32, 0.10, 0.05)
+
+    inicio = time.perf_counter()
+    referencia = [resultados.forecast_interval(y=y_input, steps=args.pasos, alpha=a) for a in alphas]
+    t_statsmodels = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    punto = resultados.forecast(y=y_input, steps=args.pasos)
+    componentes = calcular_componentes(resultados.coefs, resultados.sigma_u, args.pasos)
+    bandas = [intervalo(punto, componentes["desv_est"], a) for a in alphas]
+    t_analitico = time.perf_counter() - inicio
+
+    diferencia = max(np.max(np.abs(ref[1] - b[0])) for ref, b in zip(referencia, bandas))
+    print(f"{args.pasos} pasos, {args.variables} variables, {args.rezagos} rezagos, {len(alphas)} niveles")
+    print(f"  statsmodels forecast_interval: {t_statsmodels * 1000:8.1f} ms")
+    print(f"  componentes MA(∞) + intervalos: {t_analitico * 1000:8.1f} ms")
+    print(f"  diferencia máxima en límites:   {diferencia:.2e}")
+
+
+if __name__ == "__main__":
+    main()
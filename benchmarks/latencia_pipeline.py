@@ -0,0 +1,114 @@
+# benchmarks/latencia_pipeline.py
+"""
+Latencia de la proyección completa (descarga + ajuste + escenarios) en modo reproducir, sin red externa.
+
+Con --sinteticas se generan grabaciones con el formato de las APIs de Banxico y FRED, así que también corre
+en CI sin grabaciones reales. Con --servidor las respuestas pasan por el servidor HTTP local de reproducción
+(con --latencia-ms de retraso fijo por respuesta) en lugar de leerse directo del disco.
+
+Uso:
+    python benchmarks/latencia_pipeline.py [--sinteticas] [--servidor] [--latencia-ms 0] [--repeticiones 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def escribir_grabaciones_sinteticas(directorio, parametros_defecto):
+    """
+    Grabaciones con el formato de cada API para las series y fechas de inicio de las proyecciones por defecto.
+    """
+    from fuentes_datos import _ruta_grabacion
+
+    rng = np.random.default_rng(0)
+    for pais, parametros in parametros_defecto.items():
+        fuente = "banxico" if pais == "mexico" else "fred"
+        inicio = parametros["start_date"]
+        for nombre, id_serie in parametros["series_ids"].items():
+            fechas = pd.date_range(inicio, "2025-06-30", freq="MS" if nombre in ("inflacion", "cpi_index") else "B")
+            if nombre == "inflacion":
+                valores = 4 + np.convolve(rng.normal(0, 0.3, len(fechas)), 0.9 ** np.arange(24))[:len(fechas)]
+            elif nombre == "cpi_index":
+                valores = 200 * np.exp(np.cumsum(0.002 + rng.normal(0, 0.002, len(fechas))))
+            elif nombre == "tasa_interes":
+                valores = np.clip(5 + np.cumsum(rng.normal(0, 0.02, len(fechas))), 0.1, None)
+            else:
+                valores = 15 * np.exp(np.cumsum(rng.normal(0, 0.004, len(fechas))))
+
+            if fuente == "banxico":
+                datos = {"bmx": {"series": [{"idSerie": id_serie, "datos": [{"fecha": f.strftime("%d/%m/%Y"), "dato": f"{v:,.4f}"} for f, v in zip(fechas, valores)]}]}}
+            else:
+                datos = {"observations": [{"date": f.strftime("%Y-%m-%d"), "value": f"{v:.4f}"} for f, v in zip(fechas, valores)]}
+            ruta = _ruta_grabacion(directorio, fuente, id_serie, inicio)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump(datos, archivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directorio", default=None, help="Directorio de grabaciones (por defecto GRABACIONES_DIR)")
+    parser.add_argument("--sinteticas", action="store_true")
+    parser.add_argument("--servidor", action="store_true")
+    parser.add_argument("--latencia-ms", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    directorio = args.directorio or (tempfile.mkdtemp(prefix="grabaciones_") if args.sinteticas else None)
+    os.environ["FUENTE_DATOS"] = "reproducir"
+    if directorio:
+        os.environ["GRABACIONES_DIR"] = directorio
+    # El almacén local no debe servir de respaldo ni ensuciarse durante la medición
+    os.environ["SERIES_DB"] = os.path.join(tempfile.mkdtemp(prefix="series_"), "series.sqlite")
+
+    import streamlit as st
+    from fuentes_datos import directorio_grabaciones, servir
+    from sesion_resultados import MODULOS_PAIS, PARAMETROS_DEFECTO, _ejecutar_proyeccion
+
+    if args.sinteticas:
+        escribir_grabaciones_sinteticas(directorio_grabaciones(), PARAMETROS_DEFECTO)
+
+    if args.servidor:
+        import socket
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            puerto = s.getsockname()[1]
+        threading.Thread(target=servir, args=(directorio_grabaciones(), puerto, args.latencia_ms), daemon=True).start()
+        os.environ["URL_REPRODUCCION"] = f"http://127.0.0.1:{puerto}"
+        time.sleep(0.3)
+
+    print(f"Grabaciones: {directorio_grabaciones()}" + (f" (servidor local, {args.latencia_ms} ms por respuesta)" if args.servidor else " (disco)"))
+    for pais in MODULOS_PAIS:
+        frio, caliente = [], []
+        for _ in range(args.repeticiones):
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            inicio = time.perf_counter()
+            resultados = _ejecutar_proyeccion(pais, "reproduccion", PARAMETROS_DEFECTO[pais])
+            frio.append(time.perf_counter() - inicio)
+            if resultados is None:
+                raise SystemExit(f"No se pudo generar la proyección de {pais} con las grabaciones.")
+
+            inicio = time.perf_counter()
+            _ejecutar_proyeccion(pais, "reproduccion", PARAMETROS_DEFECTO[pais])
+            caliente.append(time.perf_counter() - inicio)
+
+        print(f"{pais:>7}: en frío mediana {np.median(frio) * 1e3:8.1f} ms (máx. {np.max(frio) * 1e3:8.1f})"
+              f" | con caché mediana {np.median(caliente) * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/tiempo_importacion.py
+"""
+Reporte de tiempos de importación (python -X importtime) del dashboard.
+
+Cada grupo se importa en un intérprete nuevo, igual que ocurre al arrancar la app o un worker de Streamlit.
+Uso:
+    python benchmarks/tiempo_importacion.py [--repeticiones 3] [--top 10]
+Termina con código 1 si el arranque supera PRESUPUESTO_ARRANQUE_MS.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Presupuesto para el primer pintado (menú + página de bienvenida)
+PRESUPUESTO_ARRANQUE_MS = 1000
+
+# Grupos de importaciones según el momento en que el dashboard las necesita
+GRUPOS = {
+    "arranque (dashboard.py)": ["streamlit", "streamlit_option_menu", "sesion_resultados", "programador_actualizaciones", "metricas"],
+    "pestaña de inflación": ["pandas", "numpy", "plotly.graph_objects"],
+    "módulos de análisis": ["VAR_VECM_MEXICO_MODULO_CACHE2", "VAR_VECM_USA_MODULO_CACHE"],
+    "ajuste del modelo": ["statsmodels.tsa.api", "statsmodels.tsa.vector_ar.vecm", "requests"],
+}
+
+PATRON_LINEA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir_grupo(modulos, previos=()):
+    """
+    Importa `previos` (sin medirlos) y después `modulos` con -X importtime.
+    Devuelve el total en ms y la lista (cumulativo_ms, paquete) de los paquetes de primer nivel.
+    """
+    codigo = "".join(f"import {m}\n" for m in previos)
+    codigo += "import sys; sys.stderr.write('--inicio--\\n')\n"
+    codigo += "".join(f"import {m}\n" for m in modulos)
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ_REPO,
+                             capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    salida = proceso.stderr.split("--inicio--", 1)[1]
+    paquetes = []
+    for linea in salida.splitlines():
+        coincidencia = PATRON_LINEA.match(linea)
+        # Solo los paquetes de primer nivel (sin sangría); su cumulativo ya incluye a los hijos
+        if coincidencia and len(coincidencia.group(3)) == 1:
+            paquetes.append((int(coincidencia.group(2)) / 1000, coincidencia.group(4)))
+    return sum(ms for ms, _ in paquetes), paquetes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    previos = []
+    total_arranque = None
+    for nombre, modulos in GRUPOS.items():
+        try:
+            mediciones = [medir_grupo(modulos, previos) for _ in range(args.repeticiones)]
+        except RuntimeError as e:
+            print(f"\n== {nombre}: no se pudo medir ({e})")
+            continue
+        total, paquetes = min(mediciones, key=lambda m: m[0])
+        if total_arranque is None:
+            total_arranque = total
+
+        print(f"\n== {nombre}: {total:8.1f} ms (mejor de {args.repeticiones})")
+        for ms, paquete in sorted(paquetes, reverse=True)[:args.top]:
+            print(f"   {ms:8.1f} ms  {paquete}")
+        # Cada grupo se mide sobre lo ya importado por los anteriores, como en la app
+        previos += modulos
+
+    if total_arranque is not None:
+        estado = "OK" if total_arranque <= PRESUPUESTO_ARRANQUE_MS else "EXCEDIDO"
+        print(f"\nArranque: {total_arranque:.1f} ms / presupuesto {PRESUPUESTO_ARRANQUE_MS} ms -> {estado}")
+        return 0 if estado == "OK" else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# beta_desapalancada.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+FRECUENCIAS = {"Mensual": "ME", "Semanal": "W-FRI", "Diaria": None}
+
+
+# --- 1. CARGA DE DATOS LOCALES ---
+def leer_tabla_local(origen):
+    """
+    Lee un CSV o Parquet (ruta o archivo subido). La primera columna se usa como índice, salvo en un Parquet
+    guardado con su índice (fechas o tickers).
+    """
+    nombre = origen if isinstance(origen, str) else origen.name
+    if nombre.lower().endswith(".parquet"):
+        tabla = pd.read_parquet(origen)
+        if isinstance(tabla.index, pd.RangeIndex): # Guardado con index=False: la primera columna es la llave
+            tabla = tabla.set_index(tabla.columns[0])
+        return tabla
+    return pd.read_csv(origen, index_col=0)
+
+
+def preparar_precios(tabla):
+    """
+    Índice de fechas ordenado y columnas numéricas (lo no numérico queda como NaN).
+    """
+    tabla = tabla.copy()
+    tabla.index = pd.to_datetime(tabla.index)
+    return tabla.sort_index().apply(pd.to_numeric, errors='coerce')
+
+
+@st.cache_data
+def cargar_precios(ruta, modificado=None):
+    """
+    Precios de cierre por fecha (filas) y ticker (columnas) desde un archivo local.
+    `modificado` (fecha de modificación del archivo) solo sirve para invalidar la caché si el archivo cambia.
+    """
+    return preparar_precios(leer_tabla_local(ruta))
+
+
+def leer_precios(origen):
+    """
+    Precios desde una ruta local (en caché mientras el archivo no cambie) o desde un archivo subido.
+    """
+    if isinstance(origen, str):
+        return cargar_precios(origen, os.path.getmtime(origen))
+    return preparar_precios(leer_tabla_local(origen))
+
+
+# --- 2. BETAS APALANCADAS (TODOS LOS TICKERS A LA VEZ) ---
+def rendimientos(precios, frecuencia="Mensual"):
+    regla = FRECUENCIAS[frecuencia]
+    if regla is not None:
+        precios = precios.resample(regla).last()
+    return precios.pct_change(fill_method=None).iloc[1:]
+
+
+def _sumas_ventana(x, ventana):
+    """
+    Sumas móviles por columna a partir de la suma acumulada: S_t = C_t - C_{t-ventana}.
+    """
+    acumulada = np.concatenate([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+    return acumulada[ventana:] - acumulada[:-ventana]
+
+
+def betas_moviles(r_activos, r_mercado, ventana, minimo_observaciones=None):
+    """
+    Betas de todos los activos contra el mercado en ventanas móviles, sin ciclo por ventana ni por ticker.
+    Con sumas acumuladas de r, m, r·m y m² (enmascaradas donde falta el activo) se obtienen las
+    covarianzas y varianzas de cada ventana en O(T·N). Forma del resultado: (T - ventana + 1, N).
+    """
+    r = np.asarray(r_activos, dtype=float)
+    m = np.asarray(r_mercado, dtype=float).reshape(-1, 1)
+    valido = ~np.isnan(r) & ~np.isnan(m)
+    r0 = np.where(valido, r, 0.0)
+    m0 = np.where(valido, m, 0.0)
+
+    n = _sumas_ventana(valido.astype(float), ventana)
+    s_r, s_m = _sumas_ventana(r0, ventana), _sumas_ventana(m0, ventana)
+    s_rm, s_mm = _sumas_ventana(r0 * m0, ventana), _sumas_ventana(m0 * m0, ventana)
+
+    minimo_observaciones = minimo_observaciones or max(3, int(0.8 * ventana))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covarianza = s_rm - s_r * s_m / n
+        varianza = s_mm - s_m ** 2 / n
+        betas = covarianza / varianza
+    betas[(n < minimo_observaciones) | (varianza <= 0)] = np.nan
+    return betas
+
+
+def betas_regresion(r_activos, r_mercado):
+    """
+    Beta de toda la muestra para todos los activos con una sola regresión matricial R = [1 m] B.
+    Supone que no faltan datos (se usa sobre la ventana más reciente ya depurada).
+    """
+    X = np.column_stack([np.ones(len(r_mercado)), r_mercado])
+    coeficientes, *_ = np.linalg.lstsq(X, r_activos, rcond=None)
+    return coeficientes[1]
+
+
+@st.cache_data(show_spinner=False)
+def calcular_betas(precios, indice, ventana, frecuencia="Mensual"):
+    """
+    Betas apalancadas móviles y de la ventana más reciente para todos los tickers del universo contra `indice`.
+    Queda en caché por universo (precios), índice, ventana y frecuencia.
+    """
+    r = rendimientos(precios, frecuencia)
+    activos = [col for col in r.columns if col != indice]
+    if len(r) < ventana:
+        raise ValueError(f"Se necesitan al menos {ventana} rendimientos y solo hay {len(r)}.")
+
+    moviles = pd.DataFrame(betas_moviles(r[activos].to_numpy(), r[indice].to_numpy(), ventana), index=r.index[ventana - 1:], columns=activos)
+
+    reciente = r.iloc[-ventana:]
+    completos = [col for col in activos if reciente[col].notna().all()]
+    beta_reciente = pd.Series(np.nan, index=activos)
+    if completos:
+        beta_reciente[completos] = betas_regresion(reciente[completos].to_numpy(), reciente[indice].to_numpy())
+    # Los activos con huecos en la ventana reciente toman el último valor de la beta móvil enmascarada
+    beta_reciente = beta_reciente.fillna(moviles.iloc[-1])
+
+    return {"betas_moviles": moviles, "beta_apalancada": beta_reciente, "observaciones": reciente[activos].notna().sum()}
+
+
+# --- 3. DESAPALANCAMIENTO (HAMADA) ---
+def desapalancar_hamada(beta_apalancada, deuda_capital, tasa_impuestos):
+    """
+    βu = βL / (1 + (1 - t) · D/E). Acepta escalares, arreglos o Series alineadas por ticker.
+    """
+    return beta_apalancada / (1 + (1 - tasa_impuestos) * deuda_capital)
+
+
+def tabla_betas(betas, apalancamiento):
+    """
+    Une las betas apalancadas con D/E y tasa de impuestos por ticker y agrega la beta desapalancada.
+    `apalancamiento` tiene índice ticker y columnas 'deuda_capital' y 'tasa_impuestos' (fracción).
+    """
+    tabla = pd.DataFrame({"Beta apalancada": betas["beta_apalancada"], "Observaciones": betas["observaciones"]})
+    tabla = tabla.join(apalancamiento[["deuda_capital", "tasa_impuestos"]])
+    tabla["Beta desapalancada"] = desapalancar_hamada(tabla["Beta apalancada"], tabla["deuda_capital"], tabla["tasa_impuestos"])
+    return tabla.rename(columns={"deuda_capital": "D/E", "tasa_impuestos": "Tasa de impuestos"})
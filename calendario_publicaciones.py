@@ -0,0 +1,84 @@
+# calendario_publicaciones.py
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# --- CALENDARIO DE PUBLICACIÓN ---
+# Horario aproximado en que cada serie de las proyecciones por defecto aparece en su API.
+# Las fechas mensuales son típicas (INEGI publica el INPC alrededor del día 9, BLS el CPI a mediados de mes);
+# si una publicación se retrasa, la actualización diaria de las otras series del país la recoge al día siguiente.
+# Los días inhábiles solo se aproximan con fines de semana.
+CALENDARIO = {
+    "mexico": [
+        {"serie": "SP30578", "descripcion": "INPC (inflación anual)", "frecuencia": "mensual", "dia": 9, "hora": (6, 0), "zona": "America/Mexico_City"},
+        {"serie": "SF43718", "descripcion": "Tipo de cambio FIX", "frecuencia": "diaria", "hora": (12, 0), "zona": "America/Mexico_City"},
+        {"serie": "SF43783", "descripcion": "TIIE a 28 días", "frecuencia": "diaria", "hora": (14, 0), "zona": "America/Mexico_City"},
+    ],
+    "usa": [
+        {"serie": "CPIAUCSL", "descripcion": "CPI (BLS)", "frecuencia": "mensual", "dia": 12, "hora": (8, 30), "zona": "America/New_York"},
+        {"serie": "EFFR", "descripcion": "Effective Federal Funds Rate", "frecuencia": "diaria", "hora": (9, 0), "zona": "America/New_York"},
+        {"serie": "DTWEXAFEGS", "descripcion": "Índice del dólar (H.10, semanal)", "frecuencia": "semanal", "dia_semana": 0, "hora": (16, 15), "zona": "America/New_York"},
+    ],
+}
+
+# Margen después de la hora de publicación para que la API ya tenga el dato
+MARGEN_PUBLICACION = timedelta(minutes=20)
+
+# Cuánto hay que retroceder para encontrar al menos una publicación anterior de cada frecuencia
+RETROCESO = {"mensual": timedelta(days=40), "semanal": timedelta(days=8), "diaria": timedelta(days=4)}
+
+
+# --- 1. PRÓXIMAS PUBLICACIONES ---
+def proxima_publicacion(regla, desde):
+    """
+    Siguiente momento (UTC) posterior a `desde` en que la serie de `regla` queda disponible, con el margen incluido.
+    """
+    zona = ZoneInfo(regla["zona"])
+    local = desde.astimezone(zona)
+    hora, minuto = regla["hora"]
+
+    if regla["frecuencia"] == "mensual":
+        anio, mes = local.year, local.month
+        while True:
+            fecha = datetime(anio, mes, regla["dia"], hora, minuto, tzinfo=zona)
+            while fecha.weekday() >= 5: # Si cae en fin de semana se publica el lunes
+                fecha += timedelta(days=1)
+            if fecha + MARGEN_PUBLICACION > desde:
+                return (fecha + MARGEN_PUBLICACION).astimezone(timezone.utc)
+            anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+    fecha = local.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+    while (fecha + MARGEN_PUBLICACION <= desde or fecha.weekday() >= 5
+           or (regla["frecuencia"] == "semanal" and fecha.weekday() != regla["dia_semana"])):
+        fecha = datetime.combine(fecha.date() + timedelta(days=1), fecha.timetz())
+    return (fecha + MARGEN_PUBLICACION).astimezone(timezone.utc)
+
+
+def proximos_eventos(desde, calendario=CALENDARIO):
+    """
+    Lista ordenada de (momento UTC, país, regla) con la siguiente publicación de cada serie.
+    """
+    return sorted(((proxima_publicacion(regla, desde), pais, regla) for pais, reglas in calendario.items() for regla in reglas),
+                  key=lambda evento: evento[0])
+
+
+# --- 2. VINTAGE DE LOS DATOS ---
+def publicacion_anterior(regla, hasta):
+    """
+    Último momento (UTC) no posterior a `hasta` en que la serie de `regla` quedó disponible.
+    """
+    momento = proxima_publicacion(regla, hasta - RETROCESO[regla["frecuencia"]])
+    anterior = None
+    while momento <= hasta:
+        anterior = momento
+        momento = proxima_publicacion(regla, momento)
+    return anterior
+
+
+def vintage_datos(pais, ahora=None, calendario=CALENDARIO):
+    """
+    Momento de la última publicación de cualquier serie del país (texto ISO en UTC). Cambia con cada publicación,
+    así que como argumento de una función con st.cache_data invalida sus entradas al llegar datos nuevos.
+    """
+    ahora = ahora or datetime.now(timezone.utc)
+    return max(publicacion_anterior(regla, ahora) for regla in calendario[pais]).isoformat(timespec="minutes")
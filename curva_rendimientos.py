@@ -0,0 +1,246 @@
+# curva_rendimientos.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Nodos de la curva de cada país: id de serie -> plazo en años.
+# EE.UU.: rendimientos diarios a vencimiento constante del Tesoro (FRED).
+# México: resultados de subasta de Cetes y Bonos M (Banxico); se publican por subasta, no diario.
+PLAZOS_CURVA = {
+    "usa": {"DGS1MO": 1 / 12, "DGS3MO": 0.25, "DGS6MO": 0.5, "DGS1": 1, "DGS2": 2, "DGS3": 3,
+            "DGS5": 5, "DGS7": 7, "DGS10": 10, "DGS20": 20, "DGS30": 30},
+    "mexico": {"SF43936": 28 / 364, "SF43939": 91 / 364, "SF43942": 182 / 364, "SF43945": 1,
+               "SF43883": 3, "SF43886": 5, "SF44071": 10, "SF45384": 20, "SF60696": 30},
+}
+
+# Días hábiles que se arrastra el último dato de cada nodo (feriados en EE.UU., calendario de subastas en México)
+DIAS_ARRASTRE = {"usa": 5, "mexico": 45}
+
+# Rejillas de los parámetros de decaimiento (años). En Svensson se exige tau2 >= RAZON_MINIMA_TAUS * tau1
+# para evitar factores casi colineales y la simetría entre las dos jorobas.
+TAUS = np.geomspace(0.08, 30, 80)
+RAZON_MINIMA_TAUS = 1.25
+
+# Radio (en puntos de la rejilla) de la búsqueda alrededor de los taus del día anterior
+RADIO_BUSQUEDA = 3
+
+# Fechas por bloque: cada bloque arranca con búsqueda completa (no hereda los taus del bloque anterior)
+# y es la unidad de trabajo por proceso
+FECHAS_POR_BLOQUE = 1000
+
+PLAZO_LARGO = 20
+
+
+# --- 1. CARGA DE DATOS ---
+@st.cache_data
+def cargar_curva(pais, credencial, start_date):
+    """
+    Rendimientos diarios (%) de todos los nodos de la curva, una columna por plazo en años.
+    Las fechas sin ningún nodo se descartan; los nodos faltantes quedan en NaN.
+    """
+    if pais == "usa":
+        from VAR_VECM_USA_MODULO_CACHE import obtener_serie_fred as obtener_serie
+    else:
+        from VAR_VECM_MEXICO_MODULO_CACHE2 import obtener_serie_banxico as obtener_serie
+
+    series = {}
+    for id_serie, plazo in PLAZOS_CURVA[pais].items():
+        serie = obtener_serie(id_serie, credencial, start_date)
+        if serie is None:
+            return None
+        series[plazo] = pd.to_numeric(serie, errors='coerce')
+
+    curva = pd.concat(series, axis=1).sort_index()
+    curva.index = pd.to_datetime(curva.index)
+    curva = curva.asfreq('B').ffill(limit=DIAS_ARRASTRE[pais])
+    return curva.dropna(how='all')
+
+
+# --- 2. FACTORES NELSON-SIEGEL / SVENSSON ---
+def _pendiente_joroba(x):
+    """
+    Cargas de pendiente (1 - e^-x) / x y de joroba (pendiente - e^-x), con el límite correcto en x -> 0.
+    """
+    x = np.maximum(x, 1e-10)
+    pendiente = -np.expm1(-x) / x
+    return pendiente, pendiente - np.exp(-x)
+
+
+def cargas_factores(plazos, tau1, tau2=None):
+    """
+    Matriz de cargas (..., plazos, k) para taus de cualquier forma: k = 3 (Nelson-Siegel) o 4 (Svensson).
+    """
+    plazos = np.asarray(plazos, dtype=float)
+    tau1 = np.asarray(tau1, dtype=float)[..., None]
+    pendiente, joroba = _pendiente_joroba(plazos / tau1)
+    factores = [np.ones_like(pendiente), pendiente, joroba]
+    if tau2 is not None:
+        factores.append(_pendiente_joroba(plazos / np.asarray(tau2, dtype=float)[..., None])[1])
+    return np.stack(factores, axis=-1)
+
+
+def rejilla_taus(modelo):
+    """
+    Candidatos (n1, n2) de tau1 y tau2 y la máscara de los válidos. En Nelson-Siegel n2 = 1 y tau2 es NaN.
+    """
+    if modelo == "nelson_siegel":
+        return TAUS[:, None], np.full((len(TAUS), 1), np.nan), np.ones((len(TAUS), 1), dtype=bool)
+    tau1, tau2 = np.meshgrid(TAUS, TAUS, indexing='ij')
+    return tau1, tau2, tau2 >= RAZON_MINIMA_TAUS * tau1
+
+
+def _pseudo_inversas(cargas):
+    """
+    Pseudo-inversas (k x M) de las cargas de todos los candidatos: las betas por MCO son pseudo_inversa @ y.
+    Dependen solo de los plazos observados, así que se calculan una vez por patrón de datos faltantes.
+    """
+    transpuesta = np.swapaxes(cargas, -1, -2)
+    return np.linalg.inv(transpuesta @ cargas) @ transpuesta
+
+
+# --- 3. AJUSTE POR BLOQUE DE FECHAS (BÚSQUEDA TIBIA) ---
+def _bloque_ajuste(rendimientos, plazos, modelo):
+    """
+    Ajusta las curvas de un bloque de fechas, en orden. Para cada par de taus candidato las betas salen por MCO,
+    así que el objetivo (suma de residuos al cuadrado) se evalúa para todos los candidatos de una vez.
+    La primera fecha del bloque busca en toda la rejilla (el bloque no depende de los anteriores); las siguientes
+    solo alrededor de los taus del día anterior, y si el óptimo cae en el borde de esa vecindad la vecindad se recentra ahí hasta que quede dentro.
+    Se descartan curvas con tasa larga (beta0) o tasa instantánea (beta0 + beta1) negativas, salvo que
+    ningún candidato las cumpla. Se ejecuta dentro de un proceso trabajador. Devuelve (betas, tau1, tau2, rmse).
+    """
+    k = 3 if modelo == "nelson_siegel" else 4
+    n_fechas = len(rendimientos)
+    betas = np.full((n_fechas, 4), np.nan)
+    taus = np.full((n_fechas, 2), np.nan)
+    rmse = np.full(n_fechas, np.nan)
+    tau1_rejilla, tau2_rejilla, validos = rejilla_taus(modelo)
+    n1, n2 = tau1_rejilla.shape
+    # Los candidatos inválidos de Svensson reciben un tau2 cualquiera no colineal; su objetivo se descarta
+    cargas = cargas_factores(plazos, tau1_rejilla, None if modelo == "nelson_siegel" else np.where(validos, tau2_rejilla, 2 * tau1_rejilla))
+
+    pseudo_inversas = {}
+    anterior = None
+    for t in range(n_fechas):
+        observado = ~np.isnan(rendimientos[t])
+        if observado.sum() <= k:
+            continue
+        patron = observado.tobytes()
+        if patron not in pseudo_inversas:
+            cargas_observadas = np.ascontiguousarray(cargas[..., observado, :])
+            pseudo_inversas[patron] = cargas_observadas, _pseudo_inversas(cargas_observadas)
+        cargas_observadas, pseudo_inversa = pseudo_inversas[patron]
+        y = rendimientos[t, observado]
+
+        completa, mejor = anterior is None, np.inf
+        while True:
+            if completa:
+                i0, i1, j0, j1 = 0, n1, 0, n2
+            else:
+                i, j = anterior
+                i0, i1 = max(i - RADIO_BUSQUEDA, 0), min(i + RADIO_BUSQUEDA + 1, n1)
+                j0, j1 = max(j - RADIO_BUSQUEDA, 0), min(j + RADIO_BUSQUEDA + 1, n2)
+            b = pseudo_inversa[i0:i1, j0:j1] @ y
+            sse = np.square(y - (cargas_observadas[i0:i1, j0:j1] @ b[..., None])[..., 0]).sum(axis=-1)
+            sse[~validos[i0:i1, j0:j1]] = np.inf
+            admisibles = (b[..., 0] > 0) & (b[..., 0] + b[..., 1] > 0)
+            if admisibles[np.isfinite(sse)].any():
+                sse[~admisibles] = np.inf
+            di, dj = np.unravel_index(np.argmin(sse), sse.shape)
+            i, j = i0 + di, j0 + dj
+            en_borde = (i in (i0, i1 - 1) and 0 < i < n1 - 1) or (j in (j0, j1 - 1) and 0 < j < n2 - 1)
+            if completa or not en_borde or sse[di, dj] >= mejor:
+                break
+            anterior, mejor = (i, j), sse[di, dj]
+
+        anterior = (i, j)
+        betas[t, :k] = b[di, dj]
+        taus[t] = tau1_rejilla[i, j], tau2_rejilla[i, j]
+        rmse[t] = np.sqrt(sse[di, dj] / len(y))
+    return betas, taus[:, 0], taus[:, 1], rmse
+
+
+def ajustar_curvas(curva, modelo="svensson", n_procesos=None):
+    """
+    Ajusta una curva Nelson-Siegel ("nelson_siegel") o Svensson ("svensson") por fecha.
+    `curva` tiene fechas en el índice y plazos (años) en las columnas. Los bloques de FECHAS_POR_BLOQUE fechas
+    son independientes: la primera fecha de cada uno busca en toda la rejilla en lugar de partir de los taus
+    de la última fecha del bloque anterior. Así se reparten en procesos y el resultado no depende de cuántos
+    se usen, pero en el cambio de bloque los taus pueden saltar al óptimo global de la rejilla aunque
+    la búsqueda tibia del día anterior siguiera en otro óptimo local.
+    """
+    if modelo not in ("nelson_siegel", "svensson"):
+        raise ValueError("El modelo debe ser 'nelson_siegel' o 'svensson'.")
+    rendimientos = curva.to_numpy(dtype=float)
+    plazos = np.asarray(curva.columns, dtype=float)
+
+    cortes = range(0, len(rendimientos), FECHAS_POR_BLOQUE)
+    bloques_datos = [rendimientos[i:i + FECHAS_POR_BLOQUE] for i in cortes]
+    n_procesos = n_procesos or min(os.cpu_count() or 1, len(bloques_datos))
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+            bloques = list(ejecutor.map(_bloque_ajuste, bloques_datos, [plazos] * len(bloques_datos), [modelo] * len(bloques_datos)))
+    else:
+        bloques = [_bloque_ajuste(datos, plazos, modelo) for datos in bloques_datos]
+
+    betas, tau1, tau2, rmse = (np.concatenate(partes) for partes in zip(*bloques))
+    parametros = pd.DataFrame(betas, index=curva.index, columns=["beta0", "beta1", "beta2", "beta3"])
+    parametros["tau1"], parametros["tau2"], parametros["rmse"] = tau1, tau2, rmse
+    if modelo == "nelson_siegel":
+        parametros = parametros.drop(columns=["beta3", "tau2"])
+    return parametros
+
+
+def rendimientos_ajustados(parametros, plazos):
+    """
+    Rendimientos (%) de las curvas ajustadas en los plazos pedidos, para todas las fechas a la vez.
+    """
+    plazos = np.atleast_1d(np.asarray(plazos, dtype=float))
+    svensson = "tau2" in parametros.columns
+    columnas_beta = ["beta0", "beta1", "beta2", "beta3"] if svensson else ["beta0", "beta1", "beta2"]
+    X = cargas_factores(plazos, parametros["tau1"].to_numpy(), parametros["tau2"].to_numpy() if svensson else None)
+    valores = np.einsum('dmk,dk->dm', X, parametros[columnas_beta].to_numpy())
+    return pd.DataFrame(valores, index=parametros.index, columns=plazos)
+
+
+# --- 4. FUNCIÓN PRINCIPAL ---
+@st.cache_data(show_spinner=False)
+def calcular_curvas(pais, credencial, start_date, modelo="svensson"):
+    """
+    Ajuste histórico de la curva de `pais` y su rendimiento a 20 años. Queda en caché por país, fecha de inicio y modelo.
+    """
+    curva = cargar_curva(pais, credencial, start_date)
+    if curva is None or curva.empty:
+        return None
+    parametros = ajustar_curvas(curva, modelo)
+    return {
+        "curva_observada": curva,
+        "parametros": parametros,
+        "rendimiento_largo": rendimientos_ajustados(parametros, PLAZO_LARGO)[float(PLAZO_LARGO)].rename("rendimiento_20"),
+        "modelo": modelo,
+    }
+
+
+def costo_deuda_largo_plazo(rendimiento_largo, diferencial_pb, tasa_impuestos=0.0):
+    """
+    Costo de la deuda a largo plazo (%): rendimiento soberano a 20 años más el diferencial de crédito,
+    antes o después de impuestos.
+    """
+    return (rendimiento_largo + diferencial_pb / 100) * (1 - tasa_impuestos)
+
+
+# --- 5. VARIABLES EXÓGENAS PARA LOS MODELOS DE INFLACIÓN ---
+def exogenas_curva(pais, credencial, start_date, indice_mensual):
+    """
+    Promedio mensual del rendimiento ajustado a 20 años, alineado con el índice mensual del modelo.
+    Devuelve None si no cubre todas las fechas del modelo.
+    """
+    curvas = calcular_curvas(pais, credencial, start_date)
+    if curvas is None:
+        return None
+    mensual = curvas["rendimiento_largo"].resample('MS').mean().ffill()
+    exogenas = mensual.reindex(indice_mensual).to_frame()
+    return None if exogenas.isna().any().any() else exogenas
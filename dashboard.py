@@ -1,21 +1,171 @@
 # dashboard.py
 
 # --- 0. LIBRERÍAS ---
+# Solo lo indispensable para pintar el menú. pandas, plotly, statsmodels y los módulos de análisis
+# se importan dentro de la página que los usa para que el arranque (y cada worker nuevo) sea rápido.
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
-from statsmodels.tsa.stattools import acf
-import numpy as np
 
 # --- 1. IMPORTAR MÓDULOS DE ANÁLISIS ---
 
-from VAR_VECM_MEXICO_MODULO_CACHE2 import generar_proyeccion_mexico
-from VAR_VECM_USA_MODULO_CACHE import generar_proyeccion_usa
+from fuentes_datos import credencial
+from metricas import iniciar_exportador
+from programador_actualizaciones import iniciar_programador
+from sesion_resultados import guardar_resultado, obtener_resultado, precargar, resultado_desactualizado
 
 # --- 2. CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Dashboard de Proyecciones", layout="wide", page_icon="📊")
 
+# Hilo único por proceso: calienta las cachés al arrancar y refresca datos y proyecciones por defecto
+# después de cada publicación de Banxico/FRED (ver programador_actualizaciones)
+iniciar_programador()
+# Métricas en formato Prometheus en un puerto o archivo local si METRICAS_PUERTO/METRICAS_ARCHIVO están definidas
+# (Streamlit no permite rutas propias como /metrics en su servidor; ver metricas)
+iniciar_exportador()
+
+
+# --- 2.1 SECCIONES COMPARTIDAS ENTRE PAÍSES ---
+def seleccionar_corridas_anteriores(pais, resultados):
+    """
+    Selector de proyecciones anteriores del historial local para superponerlas en la gráfica.
+    Devuelve una lista de (etiqueta, escenarios) con las corridas elegidas.
+    """
+    from historial_resultados import buscar_corridas, cargar_escenarios
+
+    corridas = buscar_corridas(pais)
+    # Se excluye la corrida que ya se está mostrando (mismo vintage y mismos parámetros)
+    vintage_actual = resultados["df_historico"].index[-1].strftime("%Y-%m-%d")
+    clave_actual = st.session_state.get('resultado_activo', {}).get(pais)
+    corridas = corridas[(corridas["vintage"] != vintage_actual) | (corridas["hash_parametros"] != clave_actual)]
+    if corridas.empty:
+        return []
+    etiquetas = {
+        f"Vintage {fila.vintage} · corrida {fila.fecha_corrida[:10]} · {fila.modelo_usado} (Prom. base {fila.promedio_base:.2f}%)": fila.id
+        for fila in corridas.itertuples()
+    }
+    seleccion = st.multiselect("Comparar con proyecciones anteriores", list(etiquetas), key=f"historial_{pais}")
+    anteriores = [(etiqueta.split(" · ")[0], cargar_escenarios(etiquetas[etiqueta])) for etiqueta in seleccion]
+    return [(etiqueta, escenarios) for etiqueta, escenarios in anteriores if not escenarios.empty]
+
+
+
+def mostrar_impulso_respuesta(resultados, clave):
+    """
+    Sub-sección de diagnósticos con impulso-respuesta (con bandas bootstrap opcionales) y FEVD.
+    `clave` distingue los widgets de cada país.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    from impulso_respuesta import calcular_impulso_respuesta
+
+    st.subheader("Impulso-Respuesta y Descomposición de Varianza")
+    st.write("Cómo se propaga un choque de una desviación estándar en una variable sobre las demás (identificación de Cholesky en el orden inflación, tasa de interés, tipo de cambio).")
+
+    nombres_mapa = {
+        'inflacion': 'inflación',
+        'tasa_interes': 'tasa de interés',
+        'tipo_cambio': 'tipo de cambio'
+    }
+    parametros = resultados['parametros_var']
+    nombres = [nombres_mapa.get(col, col) for col in parametros['columnas']]
+
+    col_choque, col_respuesta, col_replicas = st.columns(3)
+    with col_choque:
+        choque = st.selectbox("Variable del choque", nombres, index=min(1, len(nombres) - 1), key=f"irf_choque_{clave}")
+    with col_respuesta:
+        respuesta = st.selectbox("Variable que responde", nombres, index=0, key=f"irf_respuesta_{clave}")
+    with col_replicas:
+        n_replicas = st.select_slider("Réplicas bootstrap (bandas al 95%)", options=[0, 500, 1000, 2000, 5000], value=0, key=f"irf_replicas_{clave}")
+
+    with st.spinner("Calculando impulso-respuesta..."):
+        irf = calcular_impulso_respuesta(parametros, periodos=24, n_replicas=n_replicas)
+
+    i, j = nombres.index(respuesta), nombres.index(choque)
+    horizonte = np.arange(irf['irf'].shape[0])
+
+    col_espacio1, col_irf, col_espacio2, col_fevd, col_espacio3 = st.columns([1, 4, 1, 4, 1])
+
+    with col_irf:
+        fig_irf = go.Figure()
+        if irf['inferior'] is not None:
+            fig_irf.add_trace(go.Scatter(x=np.concatenate([horizonte, horizonte[::-1]]), y=np.concatenate([irf['superior'][:, i, j], irf['inferior'][::-1, i, j]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), name='Banda bootstrap 95%'))
+        fig_irf.add_trace(go.Scatter(x=horizonte, y=irf['irf'][:, i, j], mode='lines+markers', name='Respuesta', line=dict(color='#003366', width=3)))
+        fig_irf.add_hline(y=0, line_color="black", line_width=1)
+        fig_irf.update_layout(template="plotly_white", height=400, title_text=f"Respuesta de {respuesta} a un choque en {choque}", xaxis_title="Meses después del choque")
+        st.plotly_chart(fig_irf, use_container_width=True)
+
+    with col_fevd:
+        fig_fevd = go.Figure()
+        for k, nombre in enumerate(nombres):
+            fig_fevd.add_trace(go.Bar(x=horizonte[1:], y=100 * irf['fevd'][1:, i, k], name=f"Choque en {nombre}"))
+        fig_fevd.update_layout(template="plotly_white", height=400, barmode='stack', title_text=f"Descomposición de la varianza de {respuesta} (%)", xaxis_title="Horizonte (meses)")
+        st.plotly_chart(fig_fevd, use_container_width=True)
+
+    en_niveles = resultados['modelo_usado'] == "VECM" or resultados.get('estimador') == "minnesota" or resultados.get('ensamble') is not None
+    if not en_niveles and resultados['series_no_estacionarias']:
+        en_diferencias = ", ".join(nombres_mapa.get(var, var) for var in resultados['series_no_estacionarias'])
+        st.caption(f"El VAR se estimó en diferencias para {en_diferencias}, así que sus respuestas son cambios mensuales.")
+
+
+def mostrar_pruebas_residuos(resultados, clave):
+    """
+    Tabla de pruebas sobre los residuos de todas las ecuaciones y correlaciones cruzadas por rezago.
+    Todo viene precalculado con el ajuste del modelo; aquí solo se muestra.
+    """
+    import plotly.graph_objects as go
+
+    nombres_mapa = {
+        'inflacion': 'inflación',
+        'tasa_interes': 'tasa de interés',
+        'tipo_cambio': 'tipo de cambio'
+    }
+    diagnosticos = resultados['diagnosticos']
+    nombres = [nombres_mapa.get(col, col) for col in diagnosticos['columnas']]
+
+    st.markdown("**Pruebas sobre los residuos de todas las ecuaciones**")
+    st.dataframe(diagnosticos['tabla'].rename(index=dict(zip(diagnosticos['columnas'], nombres))).round(3), use_container_width=True)
+
+    portmanteau = diagnosticos['portmanteau']
+    st.markdown(f"Prueba portmanteau conjunta ({portmanteau['rezagos']} rezagos): Q = **{portmanteau['estadistico']:.1f}**, "
+                f"{portmanteau['grados_libertad']} grados de libertad, p-valor = **{portmanteau['p_valor']:.3f}**.")
+    st.markdown("**Interpretación:** p-valores mayores a 0.05 indican que no hay evidencia de autocorrelación (Ljung-Box y portmanteau), "
+                "de no normalidad (Jarque-Bera) ni de varianza cambiante en el tiempo (ARCH-LM).")
+
+    rezago = st.slider("Rezago de las correlaciones cruzadas (meses)", 1, len(diagnosticos['acf']) - 1, 1, key=f"ccf_rezago_{clave}")
+    fig_ccf = go.Figure(go.Heatmap(z=diagnosticos['correlaciones_cruzadas'][rezago], x=nombres, y=nombres, zmin=-1, zmax=1, colorscale='RdBu',
+                                   text=diagnosticos['correlaciones_cruzadas'][rezago].round(2), texttemplate="%{text}"))
+    fig_ccf.update_layout(template="plotly_white", height=350, title_text=f"corr(residuo de fila en t + {rezago}, residuo de columna en t)")
+    st.plotly_chart(fig_ccf, use_container_width=True)
+
+
+def formulario_curva(clave):
+    """
+    Formulario de país, fecha de inicio y modelo de la curva de rendimientos. Ajusta (o reutiliza) la curva
+    y la guarda en el espacio "curva", que comparten las pestañas de bonos y de deuda a largo plazo.
+    Devuelve True si se envió el formulario.
+    """
+    import pandas as pd
+
+    with st.form(key=f"form_curva_{clave}"):
+        pais = st.selectbox("País", ["mexico", "usa"], format_func=lambda p: {"mexico": "México", "usa": "Estados Unidos"}[p])
+        start_date_curva = st.date_input("Fecha de Inicio", pd.to_datetime("2010-01-01"))
+        modelo = st.radio("Modelo", ["svensson", "nelson_siegel"], format_func=lambda m: {"svensson": "Svensson", "nelson_siegel": "Nelson-Siegel"}[m])
+        submit_button = st.form_submit_button(label="Ajustar Curvas")
+
+    if submit_button:
+        parametros_curva = {"pais": pais, "start_date": start_date_curva.strftime("%Y-%m-%d"), "modelo": modelo}
+        if obtener_resultado("curva", parametros_curva) is None:
+            valor_credencial = credencial("TOKEN_BANXICO" if pais == "mexico" else "FRED_API_KEY")
+            with st.spinner("Ajustando curvas diarias..."):
+                from curva_rendimientos import calcular_curvas
+
+                resultados_curva = calcular_curvas(pais, valor_credencial, parametros_curva["start_date"], modelo)
+            if resultados_curva:
+                guardar_resultado("curva", parametros_curva, {**resultados_curva, "pais": pais})
+            else:
+                st.error("Ocurrió un error al descargar o ajustar la curva.")
+    return submit_button
+
 
 # --- 3. BARRA LATERAL CON MENÚ DE NAVEGACIÓN ---
 with st.sidebar:
@@ -24,8 +174,8 @@ with st.sidebar:
     
     pagina_seleccionada = option_menu(
         menu_title="Menú Principal",
-        options=["Bienvenida", "Variables Económicas"],
-        icons=["house", "graph-up-arrow"],
+        options=["Bienvenida", "Variables Económicas", "Administración"],
+        icons=["house", "graph-up-arrow", "gear"],
         menu_icon="cast",
         default_index=0
     )
@@ -62,6 +212,13 @@ if pagina_seleccionada == "Variables Económicas":
 
     # --- Contenido de la Pestaña de Inflación México ---
     if analisis_seleccionado == "Inflación México":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import numpy as np
+        import plotly.graph_objects as go
+        from ensamble_modelos import ESQUEMAS_PESOS
+        from var_bayesiano import ESTIMADORES
+
         st.header("Proyección de Inflación para México")
 
         # Pestañas anidadas 
@@ -129,7 +286,7 @@ if pagina_seleccionada == "Variables Económicas":
             with col_formulario:
                 st.subheader("Parámetros")
                 with st.form(key="form_mex"):
-                    token_banxico = st.secrets["TOKEN_BANXICO"]
+                    token_banxico = credencial("TOKEN_BANXICO")
                     start_date_mex = st.date_input("Fecha de Inicio", pd.to_datetime("2002-01-01"))
                     anos_proyeccion_mex = st.number_input("Años a Proyectar", 5, 50, 30)
 
@@ -139,107 +296,142 @@ if pagina_seleccionada == "Variables Económicas":
                         meta_baja = st.number_input("Meta Baja (%)", value=3.0, step=0.1)
                     with col_metas2:
                         meta_alta = st.number_input("Meta Alta (%)", value=5.5, step=0.1)
+
+                    usar_bono_20 = st.checkbox("Incluir bono a 20 años como exógena", value=False, help="Rendimiento a 20 años de la curva Nelson-Siegel-Svensson; en la proyección se mantiene en su último valor.")
+                    estimador_mex = st.selectbox("Estimador", list(ESTIMADORES), format_func=ESTIMADORES.get, help="Los VAR con contracción (Minnesota o ridge) permiten agregar de 10 a 20 series sin sobreajustar.")
+                    ensamble_mex = st.selectbox("Modo", [None, *ESQUEMAS_PESOS], format_func=lambda e: "Selección automática (ADF/Johansen)" if e is None else ESQUEMAS_PESOS[e], help="El ensamble combina VAR en niveles, VAR en diferencias y VECM de cada rango con varios rezagos, en lugar de elegir uno solo. Usa MCO, así que ignora el estimador.")
+                    series_extra_mex = st.text_input("Series adicionales (IDs separados por coma)", value="", placeholder="SF61745, SP1")
                         
                     submit_button = st.form_submit_button(label="Generar Proyección")
 
             with col_analisis:
+                # Parámetros de la proyección (sin el token), su huella identifica el resultado guardado
+                parametros_mex = {
+                    "series_ids": {"inflacion": "SP30578", "tasa_interes": "SF43783", "tipo_cambio": "SF43718"},
+                    "start_date": start_date_mex.strftime("%Y-%m-%d"),
+                    "anos_proyeccion": anos_proyeccion_mex,
+                    "params_escenarios": {
+                        'anos_modelo': 5, 'meta_central': meta_central, 'meta_baja': meta_baja, 'meta_alta': meta_alta,
+                        'theta_central': 0.030, 'theta_baja': 0.015, 'theta_alta': 0.050
+                    }
+                }
+                # Solo se agrega si se pide, para que la huella de la proyección por defecto no cambie
+                if usar_bono_20:
+                    parametros_mex["exogenas"] = ["bono_20"]
+                if estimador_mex != "mco":
+                    parametros_mex["estimador"] = estimador_mex
+                if ensamble_mex:
+                    parametros_mex["ensamble"] = ensamble_mex
+                for id_serie in [x.strip() for x in series_extra_mex.split(",") if x.strip()]:
+                    parametros_mex["series_ids"][id_serie] = id_serie
 
                 if submit_button:
                     if not token_banxico:
                         st.warning("Por favor, ingresa un Token de Banxico válido.")
                     else:
-                        with st.spinner("Ejecutando modelo econométrico..."):
-                            # Parámetros para los escenarios (puedes moverlos a la barra lateral después)
-                            params_escenarios = {
-                                'anos_modelo': 5, 'meta_central': meta_central, 'meta_baja': meta_baja, 'meta_alta': meta_alta,
-                                'theta_central': 0.030, 'theta_baja': 0.015, 'theta_alta': 0.050
-                            }
-                            series_ids = {
-                                "inflacion": "SP30578", "tasa_interes": "SF43783", "tipo_cambio": "SF43718"
-                            }
-                            
-                            # Llamamos a la función del módulo
-                            resultados = generar_proyeccion_mexico(
-                                token=token_banxico,
-                                series_ids=series_ids,
-                                start_date=start_date_mex.strftime("%Y-%m-%d"),
-                                anos_proyeccion=anos_proyeccion_mex,
-                                params_escenarios=params_escenarios
-                            )
-
-                        if resultados:
-                            st.session_state['resultados'] = resultados # Guarda los resultados obtenidos en la pestaña proyeccion para visualizar diagnostico
-                            st.success("Proyección generada exitosamente.")
-                            
-                            # Diccionarios con los resultados
-                            promedios = resultados["promedios"]
-                            df_historico = resultados["df_historico"]
-                            escenario_base = resultados["escenario_base"]
-                            escenario_positivo = resultados["escenario_positivo"]
-                            escenario_negativo = resultados["escenario_negativo"]
-                            
-                            # Mostrar KPIs (1/3)
-                            with st.container():
-                                st.subheader("Promedios Proyectados")
-                                col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
-                                col1.metric("Escenario Base", f"{promedios['Base']:.2f}%")
-                                col2.metric("Escenario Positivo", f"{promedios['Positivo']:.2f}%")
-                                col3.metric("Escenario Negativo", f"{promedios['Negativo']:.2f}%")
-
-                            st.divider()
-
-                            # --- Creación de la Gráfica Interactiva con Plotly ---
-                            st.subheader("Gráfica de Proyección")
-
-                            df_historico_serie = resultados["df_historico"]['inflacion']
-                            ultimo_punto_historico = df_historico_serie.iloc[-1:]
-                            base_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_base']])
-                            positivo_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_positivo']])
-                            negativo_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_negativo']])
-
-                            fig = go.Figure()
-                            fig.add_trace(go.Scatter(x=df_historico_serie.index, y=df_historico_serie, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
-                            fig.add_trace(go.Scatter(x=base_para_graficar.index, y=base_para_graficar, mode='lines', name=f"Base (Prom: {promedios['Base']:.2f}%)", line=dict(color='#003366', width=4)))
-                            fig.add_trace(go.Scatter(x=positivo_para_graficar.index, y=positivo_para_graficar, mode='lines', name=f"Positivo (Prom: {promedios['Positivo']:.2f}%)", line=dict(color='#6699CC', dash='dash')))
-                            fig.add_trace(go.Scatter(x=negativo_para_graficar.index, y=negativo_para_graficar, mode='lines', name=f"Negativo (Prom: {promedios['Negativo']:.2f}%)", line=dict(color='#666666', dash='dash')))
-                            
-                            fig.add_hline(y=3.0, line_dash="dot", line_color="black", annotation_text="Meta Banxico (3%)", annotation_position="bottom right")
-
-                            # Configurar el diseño de la gráfica
-                            fig.update_layout(
-                                title_text=f"Proyección de inflación en México a {anos_proyeccion_mex} años",
-                                xaxis_title="Fecha",
-                                yaxis_title="Inflación Anualizada (%)",
-                                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                                template="plotly_white",
-                                font=dict(
-                                    family="Arial, sans-serif",
-                                    size=12,
-                                    color="black"
-                                ),
-                                height=600,
-                                xaxis=dict(gridcolor='#EAEAEA'), # Color de la cuadrícula
-                                yaxis=dict(gridcolor='#EAEAEA')
-                            )
-                            
-                            # Mostrar la gráfica de Plotly (2/3)
-                            st.plotly_chart(fig, use_container_width=True)
-                            
-                            st.divider()
-
-                            # Tabla comparativa de escenarios (3/3)
-
-                            with st.container():
-                                st.subheader("Comparativa de Escenarios")
-
-                                col0, col1, col2 = st.columns([1, 2, 1])
-
-                                with col1:      
-                                    st.dataframe(resultados['tabla_escenarios'], use_container_width=True)   
-
-                        else:
-                            st.error("Ocurrió un error al generar la proyección.")
-                else:
+                        # Si ya existe una proyección con estos mismos parámetros no se vuelve a calcular
+                        resultados = obtener_resultado("mexico", parametros_mex)
+                        if resultados is None:
+                            with st.spinner("Ejecutando modelo econométrico..."):
+                                from VAR_VECM_MEXICO_MODULO_CACHE2 import generar_proyeccion_mexico
+
+                                # Llamamos a la función del módulo
+                                resultados = generar_proyeccion_mexico(token=token_banxico, **parametros_mex)
+
+                            if resultados:
+                                guardar_resultado("mexico", parametros_mex, resultados)
+                                # Historial local para comparar vintages en sesiones futuras
+                                from historial_resultados import guardar_corrida
+                                guardar_corrida("mexico", parametros_mex, resultados)
+                                # Precarga en segundo plano la proyección por defecto del otro país
+                                precargar("usa")
+                                st.success("Proyección generada exitosamente.")
+                            else:
+                                st.error("Ocurrió un error al generar la proyección.")
+
+                # Los resultados se guardan por país, así que cambiar de pestaña no mezcla proyecciones
+                resultados = obtener_resultado("mexico")
+                if resultados:
+                    if resultado_desactualizado("mexico", resultados):
+                        st.info("Se publicaron datos nuevos después de esta proyección; vuelve a generarla para incluirlos.")
+                    # Diccionarios con los resultados
+                    promedios = resultados["promedios"]
+                    df_historico = resultados["df_historico"]
+                    escenario_base = resultados["escenario_base"]
+                    escenario_positivo = resultados["escenario_positivo"]
+                    escenario_negativo = resultados["escenario_negativo"]
+                    
+                    # Mostrar KPIs (1/3)
+                    with st.container():
+                        st.subheader("Promedios Proyectados")
+                        col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                        col1.metric("Escenario Base", f"{promedios['Base']:.2f}%")
+                        col2.metric("Escenario Positivo", f"{promedios['Positivo']:.2f}%")
+                        col3.metric("Escenario Negativo", f"{promedios['Negativo']:.2f}%")
+
+                    st.divider()
+
+                    # --- Creación de la Gráfica Interactiva con Plotly ---
+                    st.subheader("Gráfica de Proyección")
+
+                    corridas_previas = seleccionar_corridas_anteriores("mexico", resultados)
+
+                    df_historico_serie = resultados["df_historico"]['inflacion']
+                    ultimo_punto_historico = df_historico_serie.iloc[-1:]
+                    base_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_base']])
+                    positivo_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_positivo']])
+                    negativo_para_graficar = pd.concat([ultimo_punto_historico, resultados['escenario_negativo']])
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=df_historico_serie.index, y=df_historico_serie, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
+
+                    # Abanico de bandas de confianza del modelo (de la más amplia a la más estrecha)
+                    bandas = resultados['bandas_confianza']
+                    for nivel, opacidad in [("95%", 0.12), ("90%", 0.18), ("68%", 0.28)]:
+                        fig.add_trace(go.Scatter(x=np.concatenate([bandas.index, bandas.index[::-1]]), y=np.concatenate([bandas[f"Superior {nivel}"], bandas[f"Inferior {nivel}"][::-1]]), fill='toself', fillcolor=f'rgba(0, 51, 102, {opacidad})', line=dict(color='rgba(255,255,255,0)'), name=f"Intervalo {nivel}", hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=base_para_graficar.index, y=base_para_graficar, mode='lines', name=f"Base (Prom: {promedios['Base']:.2f}%)", line=dict(color='#003366', width=4)))
+                    fig.add_trace(go.Scatter(x=positivo_para_graficar.index, y=positivo_para_graficar, mode='lines', name=f"Positivo (Prom: {promedios['Positivo']:.2f}%)", line=dict(color='#6699CC', dash='dash')))
+                    fig.add_trace(go.Scatter(x=negativo_para_graficar.index, y=negativo_para_graficar, mode='lines', name=f"Negativo (Prom: {promedios['Negativo']:.2f}%)", line=dict(color='#666666', dash='dash')))
+                    
+                    # Proyecciones anteriores (otros vintages de datos o parámetros) guardadas en el historial
+                    for etiqueta, escenarios_previos in corridas_previas:
+                        fig.add_trace(go.Scatter(x=escenarios_previos.index, y=escenarios_previos['Base'], mode='lines', name=f"Base {etiqueta}", line=dict(width=2, dash='dot')))
+
+                    fig.add_hline(y=3.0, line_dash="dot", line_color="black", annotation_text="Meta Banxico (3%)", annotation_position="bottom right")
+
+                    # Configurar el diseño de la gráfica
+                    fig.update_layout(
+                        title_text=f"Proyección de inflación en México a {resultados['anos_proyectados']} años",
+                        xaxis_title="Fecha",
+                        yaxis_title="Inflación Anualizada (%)",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                        template="plotly_white",
+                        font=dict(
+                            family="Arial, sans-serif",
+                            size=12,
+                            color="black"
+                        ),
+                        height=600,
+                        xaxis=dict(gridcolor='#EAEAEA'), # Color de la cuadrícula
+                        yaxis=dict(gridcolor='#EAEAEA')
+                    )
+                    
+                    # Mostrar la gráfica de Plotly (2/3)
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    st.divider()
+
+                    # Tabla comparativa de escenarios (3/3)
+
+                    with st.container():
+                        st.subheader("Comparativa de Escenarios")
+
+                        col0, col1, col2 = st.columns([1, 2, 1])
+
+                        with col1:      
+                            st.dataframe(resultados['tabla_escenarios'], use_container_width=True)   
+
+                elif not submit_button:
                     st.info("Ingresa los parámetros en el formulario y haz clic en 'Generar Proyección' para ver los resultados.")
    
     # --- Contenido de la Pestaña de Diagnósticos ---
@@ -247,15 +439,23 @@ if pagina_seleccionada == "Variables Económicas":
             st.subheader("Diagnósticos del Modelo")
             st.divider() # Crea una linea divisoria
 
-            # Verificamos si ya se generó una proyección QUIZAS TENER CUIDADO CON LA PALABRA RESULTADOS, puede ser resultados_mex revisar codigo gemini con eso
-            if 'resultados' in st.session_state:
-                resultados = st.session_state['resultados']
+            # Verificamos si ya se generó una proyección para este país
+            resultados = obtener_resultado("mexico")
+            if resultados:
 
                 with st.container():
 
                     # Pruebas hechas (1/3)
                     st.markdown("#### Pruebas hechas para decidir entre VAR/VECM")
                     st.info(f"El modelo seleccionado automáticamente para esta proyección fue un **{resultados['modelo_usado']}**.")
+                    if resultados.get('exogenas'):
+                        st.caption("Variables exógenas: rendimiento ajustado del bono a 20 años (constante en su último valor durante la proyección).")
+                    if resultados.get('ensamble') is not None:
+                        st.caption("En modo ensamble las pruebas ADF y de Johansen no deciden el modelo; se muestran solo como referencia. Impulso-respuesta y residuos corresponden al modelo de mayor peso.")
+                        with st.expander("Ver pesos de los modelos del ensamble"):
+                            st.dataframe(resultados['ensamble'].round(4), use_container_width=True)
+                    elif resultados.get('estimador', 'mco') != 'mco':
+                        st.caption("Con el estimador con contracción no se estima VECM: el VAR bayesiano usa niveles (prior de caminata aleatoria para las series no estacionarias) y el ridge, diferencias. La prueba de Johansen no se aplica.")
 
                     col_espacio1, col_prueba1, col_espacio2, col_prueba2, col_espacio3 = st.columns([2, 3, 2, 3, 2])
 
@@ -302,16 +502,15 @@ if pagina_seleccionada == "Variables Económicas":
                     with col_acf:
                         st.markdown("**Autocorrelación (ACF)**")
 
-                        # Calcular ACF y los intervalos de confianza
-                        acf_values, confint = acf(resultados['residuos'], nlags=24, alpha=0.05)
+                        # ACF y bandas de Bartlett de la ecuación de la inflación, calculadas una vez con el ajuste
+                        acf_values = resultados['diagnosticos']['acf'][:, 0]
+                        banda = resultados['diagnosticos']['bandas_acf'][:, 0]
                         
                         fig_acf = go.Figure()
                         
                         # Banda de confianza (sombreado azul)
-                        conf_upper = confint[1:, 1] - acf_values[1:]
-                        conf_lower = confint[1:, 0] - acf_values[1:]
-                        x_axis = np.arange(1, 25)
-                        fig_acf.add_trace(go.Scatter(x=np.concatenate([x_axis-1, 1+x_axis[::-1]]), y=np.concatenate([conf_upper, conf_lower[::-1]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), showlegend=False))
+                        x_axis = np.arange(1, len(acf_values))
+                        fig_acf.add_trace(go.Scatter(x=np.concatenate([x_axis-1, 1+x_axis[::-1]]), y=np.concatenate([banda, -banda[::-1]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), showlegend=False))
                         fig_acf.add_trace(go.Bar(x=x_axis, y=acf_values[1:], name='ACF', width=0.2)) # 'width' hace las barras más finas          
                         fig_acf.update_layout(template="plotly_white", height=400, title_text="Autocorrelación de Residuos")
                         st.plotly_chart(fig_acf, use_container_width=True)
@@ -326,9 +525,16 @@ if pagina_seleccionada == "Variables Económicas":
                         st.plotly_chart(fig_hist, use_container_width=True)
 
                         st.markdown("**Interpretación:** La distribución de los errores debe parecerse a una **campana (distribución normal)**. Esto sugiere que los errores del modelo son aleatorios y no están sesgados.")
+
+                    mostrar_pruebas_residuos(resultados, "mexico")
             
                 st.divider()
 
+                # Impulso-respuesta y FEVD
+                mostrar_impulso_respuesta(resultados, "mexico")
+
+                st.divider()
+
                 # Resumen estadístico (3/3)
                 with st.expander("Ver Resumen Estadístico Completo"):
                     st.text(resultados['resumen_texto'])
@@ -341,9 +547,9 @@ if pagina_seleccionada == "Variables Económicas":
             st.subheader("Descargar Datos de la Proyección")
             st.divider()
             
-            # 1. Verificar si los resultados existen en la memoria de la sesión
-            if 'resultados' in st.session_state:
-                resultados = st.session_state['resultados']
+            # 1. Verificar si los resultados de este país existen en la memoria de la sesión
+            resultados = obtener_resultado("mexico")
+            if resultados:
                 
                 # 2. Preparar un DataFrame uniendo los tres escenarios proyectados
                 df_para_descarga = pd.DataFrame({
@@ -390,6 +596,13 @@ if pagina_seleccionada == "Variables Económicas":
 
     # --- Contenido de la Pestaña de Inflación EE.UU. ---
     if analisis_seleccionado == "Inflación Estados Unidos":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import numpy as np
+        import plotly.graph_objects as go
+        from ensamble_modelos import ESQUEMAS_PESOS
+        from var_bayesiano import ESTIMADORES
+
         st.header("Proyección de Inflación para EE.UU.")
  
         tab_metodologia, tab_proyeccion, tab_diagnosticos, tab_descarga = st.tabs([
@@ -455,7 +668,7 @@ if pagina_seleccionada == "Variables Económicas":
             with col_formulario:
                 st.subheader("Parámetros")
                 with st.form(key="form_usa"):
-                    fred_api_key = st.secrets["FRED_API_KEY"]
+                    fred_api_key = credencial("FRED_API_KEY")
                     start_date_usa = st.date_input("Fecha de Inicio", pd.to_datetime("2005-01-01"))
                     anos_proyeccion_usa = st.number_input("Años a Proyectar", 5, 50, 30)
 
@@ -465,106 +678,142 @@ if pagina_seleccionada == "Variables Económicas":
                         meta_baja = st.number_input("Meta Baja (%)", value=2.0, step=0.1)
                     with col_metas2:
                         meta_alta = st.number_input("Meta Alta (%)", value=3.5, step=0.1)
+
+                    usar_bono_20 = st.checkbox("Incluir bono a 20 años como exógena", value=False, help="Rendimiento a 20 años de la curva Nelson-Siegel-Svensson; en la proyección se mantiene en su último valor.")
+                    estimador_usa = st.selectbox("Estimador", list(ESTIMADORES), format_func=ESTIMADORES.get, help="Los VAR con contracción (Minnesota o ridge) permiten agregar de 10 a 20 series sin sobreajustar.")
+                    ensamble_usa = st.selectbox("Modo", [None, *ESQUEMAS_PESOS], format_func=lambda e: "Selección automática (ADF/Johansen)" if e is None else ESQUEMAS_PESOS[e], help="El ensamble combina VAR en niveles, VAR en diferencias y VECM de cada rango con varios rezagos, en lugar de elegir uno solo. Usa MCO, así que ignora el estimador.")
+                    series_extra_usa = st.text_input("Series adicionales (IDs separados por coma)", value="", placeholder="UNRATE, INDPRO")
                         
                     submit_button = st.form_submit_button(label="Generar Proyección")
 
             with col_analisis:
+                # Parámetros de la proyección (sin el token), su huella identifica el resultado guardado
+                parametros_usa = {
+                    "series_ids": {"cpi_index": "CPIAUCSL", "tasa_interes": "EFFR", "tipo_cambio": "DTWEXAFEGS"},
+                    "start_date": start_date_usa.strftime("%Y-%m-%d"),
+                    "anos_proyeccion": anos_proyeccion_usa,
+                    "params_escenarios": {
+                        'anos_modelo': 5, 'meta_central': meta_central, 'meta_baja': meta_baja, 'meta_alta': meta_alta,
+                        'theta_central': 0.030, 'theta_baja': 0.050, 'theta_alta': 0.015
+                    }
+                }
+                # Solo se agrega si se pide, para que la huella de la proyección por defecto no cambie
+                if usar_bono_20:
+                    parametros_usa["exogenas"] = ["bono_20"]
+                if estimador_usa != "mco":
+                    parametros_usa["estimador"] = estimador_usa
+                if ensamble_usa:
+                    parametros_usa["ensamble"] = ensamble_usa
+                for id_serie in [x.strip() for x in series_extra_usa.split(",") if x.strip()]:
+                    parametros_usa["series_ids"][id_serie] = id_serie
+
                 if submit_button:
                     if not fred_api_key:
                         st.warning("Por favor, ingresa un Token de FRED válido.")
                     else:
-                        with st.spinner("Ejecutando modelo econométrico..."):
-                            # Parámetros para los escenarios (puedes moverlos a la barra lateral después)
-                            params_escenarios_usa = {
-                                'anos_modelo': 5, 'meta_central': meta_central, 'meta_baja': meta_baja, 'meta_alta': meta_alta,
-                                'theta_central': 0.030, 'theta_baja': 0.050, 'theta_alta': 0.015
-                            }
-                            series_ids_usa = {
-                                "cpi_index": "CPIAUCSL", "tasa_interes": "EFFR", "tipo_cambio": "DTWEXAFEGS"#"inflacion": "SP30578", "tasa_interes": "SF43783", "tipo_cambio": "SF43718"
-                            }
-                                
-                            # Llamamos a la función del módulo
-                            resultados_usa = generar_proyeccion_usa(
-                                api_key=fred_api_key,
-                                series_ids=series_ids_usa,
-                                start_date=start_date_usa.strftime("%Y-%m-%d"),
-                                anos_proyeccion=anos_proyeccion_usa,
-                                params_escenarios=params_escenarios_usa
-                            )
-
-                        if resultados_usa:
-                            st.session_state['resultados'] = resultados_usa # Guarda los resultados obtenidos en la pestaña proyeccion para visualizar diagnostico
-                            st.success("Proyección generada exitosamente.")
-                            
-                            # Diccionarios con los resultados
-                            promedios = resultados_usa["promedios"]
-                            df_historico = resultados_usa["df_historico"]
-                            escenario_base = resultados_usa["escenario_base"]
-                            escenario_positivo = resultados_usa["escenario_positivo"]
-                            escenario_negativo = resultados_usa["escenario_negativo"]
-                            
-                            # Mostrar KPIs (1/3)
-                            with st.container():
-                                st.subheader("Promedios Proyectados")
-                                col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
-                                col1.metric("Escenario Base", f"{promedios['Base']:.2f}%")
-                                col2.metric("Escenario Positivo", f"{promedios['Positivo']:.2f}%")
-                                col3.metric("Escenario Negativo", f"{promedios['Negativo']:.2f}%")
-
-                            st.divider()
-
-                            # --- Creación de la Gráfica Interactiva con Plotly ---
-                            st.subheader("Gráfica de Proyección")
-
-                            df_historico_serie = resultados_usa["df_historico"]['inflacion']
-                            ultimo_punto_historico = df_historico_serie.iloc[-1:]
-                            base_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_base']])
-                            positivo_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_positivo']])
-                            negativo_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_negativo']])
-
-                            fig = go.Figure()
-                            fig.add_trace(go.Scatter(x=df_historico_serie.index, y=df_historico_serie, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
-                            fig.add_trace(go.Scatter(x=base_para_graficar.index, y=base_para_graficar, mode='lines', name=f"Base (Prom: {promedios['Base']:.2f}%)", line=dict(color='#003366', width=4)))
-                            fig.add_trace(go.Scatter(x=positivo_para_graficar.index, y=positivo_para_graficar, mode='lines', name=f"Positivo (Prom: {promedios['Positivo']:.2f}%)", line=dict(color='#6699CC', dash='dash')))
-                            fig.add_trace(go.Scatter(x=negativo_para_graficar.index, y=negativo_para_graficar, mode='lines', name=f"Negativo (Prom: {promedios['Negativo']:.2f}%)", line=dict(color='#666666', dash='dash')))
-                            
-                            fig.add_hline(y=2.0, line_dash="dot", line_color="black", annotation_text="Meta FRED (2%)", annotation_position="bottom right")
-
-                            # Configurar el diseño de la gráfica
-                            fig.update_layout(
-                                title_text=f"Proyección de inflación en Estados Unidos a {anos_proyeccion_usa} años",
-                                xaxis_title="Fecha",
-                                yaxis_title="Inflación Anualizada (%)",
-                                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                                template="plotly_white",
-                                font=dict(
-                                    family="Arial, sans-serif",
-                                    size=12,
-                                    color="black"
-                                ),
-                                height=600,
-                                xaxis=dict(gridcolor='#EAEAEA'), # Color de la cuadrícula
-                                yaxis=dict(gridcolor='#EAEAEA')
-                            )
-                            
-                            # Mostrar la gráfica de Plotly (2/3)
-                            st.plotly_chart(fig, use_container_width=True)
-                            
-                            st.divider()
-
-                            # Tabla comparativa de escenarios (3/3)
-
-                            with st.container():
-                                st.subheader("Comparativa de Escenarios")
-
-                                col0, col1, col2 = st.columns([1, 2, 1])
-
-                                with col1:      
-                                    st.dataframe(resultados_usa['tabla_escenarios'], use_container_width=True)   
-
-                        else:
-                            st.error("Ocurrió un error al generar la proyección.")
-                else:
+                        # Si ya existe una proyección con estos mismos parámetros no se vuelve a calcular
+                        resultados_usa = obtener_resultado("usa", parametros_usa)
+                        if resultados_usa is None:
+                            with st.spinner("Ejecutando modelo econométrico..."):
+                                from VAR_VECM_USA_MODULO_CACHE import generar_proyeccion_usa
+
+                                # Llamamos a la función del módulo
+                                resultados_usa = generar_proyeccion_usa(api_key=fred_api_key, **parametros_usa)
+
+                            if resultados_usa:
+                                guardar_resultado("usa", parametros_usa, resultados_usa)
+                                # Historial local para comparar vintages en sesiones futuras
+                                from historial_resultados import guardar_corrida
+                                guardar_corrida("usa", parametros_usa, resultados_usa)
+                                # Precarga en segundo plano la proyección por defecto del otro país
+                                precargar("mexico")
+                                st.success("Proyección generada exitosamente.")
+                            else:
+                                st.error("Ocurrió un error al generar la proyección.")
+
+                # Los resultados se guardan por país, así que cambiar de pestaña no mezcla proyecciones
+                resultados_usa = obtener_resultado("usa")
+                if resultados_usa:
+                    if resultado_desactualizado("usa", resultados_usa):
+                        st.info("Se publicaron datos nuevos después de esta proyección; vuelve a generarla para incluirlos.")
+                    # Diccionarios con los resultados
+                    promedios = resultados_usa["promedios"]
+                    df_historico = resultados_usa["df_historico"]
+                    escenario_base = resultados_usa["escenario_base"]
+                    escenario_positivo = resultados_usa["escenario_positivo"]
+                    escenario_negativo = resultados_usa["escenario_negativo"]
+                    
+                    # Mostrar KPIs (1/3)
+                    with st.container():
+                        st.subheader("Promedios Proyectados")
+                        col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                        col1.metric("Escenario Base", f"{promedios['Base']:.2f}%")
+                        col2.metric("Escenario Positivo", f"{promedios['Positivo']:.2f}%")
+                        col3.metric("Escenario Negativo", f"{promedios['Negativo']:.2f}%")
+
+                    st.divider()
+
+                    # --- Creación de la Gráfica Interactiva con Plotly ---
+                    st.subheader("Gráfica de Proyección")
+
+                    corridas_previas = seleccionar_corridas_anteriores("usa", resultados_usa)
+
+                    df_historico_serie = resultados_usa["df_historico"]['inflacion']
+                    ultimo_punto_historico = df_historico_serie.iloc[-1:]
+                    base_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_base']])
+                    positivo_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_positivo']])
+                    negativo_para_graficar = pd.concat([ultimo_punto_historico, resultados_usa['escenario_negativo']])
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=df_historico_serie.index, y=df_historico_serie, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
+
+                    # Abanico de bandas de confianza del modelo (de la más amplia a la más estrecha)
+                    bandas = resultados_usa['bandas_confianza']
+                    for nivel, opacidad in [("95%", 0.12), ("90%", 0.18), ("68%", 0.28)]:
+                        fig.add_trace(go.Scatter(x=np.concatenate([bandas.index, bandas.index[::-1]]), y=np.concatenate([bandas[f"Superior {nivel}"], bandas[f"Inferior {nivel}"][::-1]]), fill='toself', fillcolor=f'rgba(0, 51, 102, {opacidad})', line=dict(color='rgba(255,255,255,0)'), name=f"Intervalo {nivel}", hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=base_para_graficar.index, y=base_para_graficar, mode='lines', name=f"Base (Prom: {promedios['Base']:.2f}%)", line=dict(color='#003366', width=4)))
+                    fig.add_trace(go.Scatter(x=positivo_para_graficar.index, y=positivo_para_graficar, mode='lines', name=f"Positivo (Prom: {promedios['Positivo']:.2f}%)", line=dict(color='#6699CC', dash='dash')))
+                    fig.add_trace(go.Scatter(x=negativo_para_graficar.index, y=negativo_para_graficar, mode='lines', name=f"Negativo (Prom: {promedios['Negativo']:.2f}%)", line=dict(color='#666666', dash='dash')))
+                    
+                    # Proyecciones anteriores (otros vintages de datos o parámetros) guardadas en el historial
+                    for etiqueta, escenarios_previos in corridas_previas:
+                        fig.add_trace(go.Scatter(x=escenarios_previos.index, y=escenarios_previos['Base'], mode='lines', name=f"Base {etiqueta}", line=dict(width=2, dash='dot')))
+
+                    fig.add_hline(y=2.0, line_dash="dot", line_color="black", annotation_text="Meta FRED (2%)", annotation_position="bottom right")
+
+                    # Configurar el diseño de la gráfica
+                    fig.update_layout(
+                        title_text=f"Proyección de inflación en Estados Unidos a {resultados_usa['anos_proyectados']} años",
+                        xaxis_title="Fecha",
+                        yaxis_title="Inflación Anualizada (%)",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                        template="plotly_white",
+                        font=dict(
+                            family="Arial, sans-serif",
+                            size=12,
+                            color="black"
+                        ),
+                        height=600,
+                        xaxis=dict(gridcolor='#EAEAEA'), # Color de la cuadrícula
+                        yaxis=dict(gridcolor='#EAEAEA')
+                    )
+                    
+                    # Mostrar la gráfica de Plotly (2/3)
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    st.divider()
+
+                    # Tabla comparativa de escenarios (3/3)
+
+                    with st.container():
+                        st.subheader("Comparativa de Escenarios")
+
+                        col0, col1, col2 = st.columns([1, 2, 1])
+
+                        with col1:      
+                            st.dataframe(resultados_usa['tabla_escenarios'], use_container_width=True)   
+
+                elif not submit_button:
                     st.info("Ingresa los parámetros en el formulario y haz clic en 'Generar Proyección' para ver los resultados.")
 
 
@@ -573,15 +822,23 @@ if pagina_seleccionada == "Variables Económicas":
             st.subheader("Diagnósticos del Modelo")
             st.divider() # Crea una linea divisoria
 
-            # Verificamos si ya se generó una proyección QUIZAS TENER CUIDADO CON LA PALABRA RESULTADOS, puede ser resultados_mex revisar codigo gemini con eso
-            if 'resultados' in st.session_state:
-                resultados_usa = st.session_state['resultados']
+            # Verificamos si ya se generó una proyección para este país
+            resultados_usa = obtener_resultado("usa")
+            if resultados_usa:
 
                 with st.container():
 
                     # Pruebas hechas (1/3)
                     st.markdown("#### Pruebas hechas para decidir entre VAR/VECM")
                     st.info(f"El modelo seleccionado automáticamente para esta proyección fue un **{resultados_usa['modelo_usado']}**.")
+                    if resultados_usa.get('exogenas'):
+                        st.caption("Variables exógenas: rendimiento ajustado del bono a 20 años (constante en su último valor durante la proyección).")
+                    if resultados_usa.get('ensamble') is not None:
+                        st.caption("En modo ensamble las pruebas ADF y de Johansen no deciden el modelo; se muestran solo como referencia. Impulso-respuesta y residuos corresponden al modelo de mayor peso.")
+                        with st.expander("Ver pesos de los modelos del ensamble"):
+                            st.dataframe(resultados_usa['ensamble'].round(4), use_container_width=True)
+                    elif resultados_usa.get('estimador', 'mco') != 'mco':
+                        st.caption("Con el estimador con contracción no se estima VECM: el VAR bayesiano usa niveles (prior de caminata aleatoria para las series no estacionarias) y el ridge, diferencias. La prueba de Johansen no se aplica.")
 
                     col_espacio1, col_prueba1, col_espacio2, col_prueba2, col_espacio3 = st.columns([2, 3, 2, 3, 2])
 
@@ -628,16 +885,15 @@ if pagina_seleccionada == "Variables Económicas":
                     with col_acf:
                         st.markdown("**Autocorrelación (ACF)**")
 
-                        # Calcular ACF y los intervalos de confianza
-                        acf_values, confint = acf(resultados_usa['residuos'], nlags=24, alpha=0.05)
+                        # ACF y bandas de Bartlett de la ecuación de la inflación, calculadas una vez con el ajuste
+                        acf_values = resultados_usa['diagnosticos']['acf'][:, 0]
+                        banda = resultados_usa['diagnosticos']['bandas_acf'][:, 0]
                         
                         fig_acf = go.Figure()
                         
                         # Banda de confianza (sombreado azul)
-                        conf_upper = confint[1:, 1] - acf_values[1:]
-                        conf_lower = confint[1:, 0] - acf_values[1:]
-                        x_axis = np.arange(1, 25)
-                        fig_acf.add_trace(go.Scatter(x=np.concatenate([x_axis-1, 1+x_axis[::-1]]), y=np.concatenate([conf_upper, conf_lower[::-1]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), showlegend=False))
+                        x_axis = np.arange(1, len(acf_values))
+                        fig_acf.add_trace(go.Scatter(x=np.concatenate([x_axis-1, 1+x_axis[::-1]]), y=np.concatenate([banda, -banda[::-1]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), showlegend=False))
                         fig_acf.add_trace(go.Bar(x=x_axis, y=acf_values[1:], name='ACF', width=0.2)) # 'width' hace las barras más finas          
                         fig_acf.update_layout(template="plotly_white", height=400, title_text="Autocorrelación de Residuos")
                         st.plotly_chart(fig_acf, use_container_width=True)
@@ -652,9 +908,16 @@ if pagina_seleccionada == "Variables Económicas":
                         st.plotly_chart(fig_hist, use_container_width=True)
 
                         st.markdown("**Interpretación:** La distribución de los errores debe parecerse a una **campana (distribución normal)**. Esto sugiere que los errores del modelo son aleatorios y no están sesgados.")
+
+                    mostrar_pruebas_residuos(resultados_usa, "usa")
             
                 st.divider()
 
+                # Impulso-respuesta y FEVD
+                mostrar_impulso_respuesta(resultados_usa, "usa")
+
+                st.divider()
+
                 # Resumen estadístico (3/3)
                 with st.expander("Ver Resumen Estadístico Completo"):
                     st.text(resultados_usa['resumen_texto'])
@@ -667,9 +930,9 @@ if pagina_seleccionada == "Variables Económicas":
             st.subheader("Descargar Datos de la Proyección")
             st.divider()
             
-            # 1. Verificar si los resultados existen en la memoria de la sesión
-            if 'resultados' in st.session_state:
-                resultados_usa = st.session_state['resultados']
+            # 1. Verificar si los resultados de este país existen en la memoria de la sesión
+            resultados_usa = obtener_resultado("usa")
+            if resultados_usa:
                 
                 # 2. Preparar un DataFrame uniendo los tres escenarios proyectados
                 df_para_descarga = pd.DataFrame({
@@ -690,7 +953,7 @@ if pagina_seleccionada == "Variables Económicas":
                 st.download_button(
                 label="Descargar Proyección (CSV)", # Texto del botón
                 data=csv_data,                      # Los datos a descargar
-                file_name='proyeccion_inflacion_mexico.csv', # Nombre del archivo
+                file_name='proyeccion_inflacion_usa.csv', # Nombre del archivo
                 mime='text/csv',                      # Tipo de archivo
                 )
             else:
@@ -710,6 +973,738 @@ if pagina_seleccionada == "Variables Económicas":
 
     # --- Contenido de la Pestaña del S&P 500 ---
     if analisis_seleccionado == "S&P 500":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import numpy as np
+        import plotly.graph_objects as go
+
         st.header("Proyección de Rendimiento del S&P 500")
-        st.info("La funcionalidad para este análisis se añadirá aquí.")
-        # Aquí iría el formulario y la lógica para el análisis del S&P 500.
\ No newline at end of file
+
+        tab_metodologia, tab_proyeccion, tab_descarga = st.tabs([
+            "📄 Metodología",
+            "📈 Proyección",
+            "📥 Descarga de Datos"
+        ])
+
+    # --- Contenido de la Pestaña de Metodología ---
+        with tab_metodologia:
+            st.subheader("Metodología de la Simulación Monte Carlo")
+
+            col1, col2 = st.columns(2, gap="large")
+
+            with col1:
+                with st.container(border=True):
+                    st.subheader("Simulación de Trayectorias")
+                    st.markdown("""
+                    Se simulan miles de trayectorias posibles del índice mes a mes y se resumen con percentiles.
+
+                    - **Movimiento Browniano Geométrico (GBM):** Los rendimientos logarítmicos mensuales siguen una distribución normal con la media y la volatilidad históricas.
+                    - **Bootstrap Histórico:** Cada mes simulado toma al azar (con reemplazo) un rendimiento mensual observado, conservando colas gruesas y asimetrías de los datos.
+                    """)
+
+            with col2:
+                with st.container(border=True):
+                    st.subheader("Escenarios y Datos")
+                    st.markdown("""
+                    * **Escenarios:** Rendimiento anual compuesto acumulado hasta cada año, en el percentil 50 (Base), 75 (Positivo) y 25 (Negativo) de las trayectorias simuladas.
+                    * **Índice S&P 500:** Nivel diario de cierre, se usa el último dato de cada mes.
+                        - *ID de Serie (FRED):* `SP500` (FRED publica aproximadamente los últimos 10 años).
+                    """)
+
+    # --- Contenido de la Pestaña de Proyección ---
+        with tab_proyeccion:
+            st.subheader("Generar Proyección")
+            st.divider()
+
+            col_espacio1, col_analisis, col_espacio2, col_formulario = st.columns([0.5, 5.0, 0.5, 1])
+
+            with col_formulario:
+                st.subheader("Parámetros")
+                with st.form(key="form_sp500"):
+                    fred_api_key = credencial("FRED_API_KEY")
+                    start_date_sp500 = st.date_input("Fecha de Inicio", pd.to_datetime("2015-01-01"))
+                    anos_proyeccion_sp500 = st.number_input("Años a Proyectar", 5, 50, 30)
+                    n_trayectorias = st.select_slider("Trayectorias", options=[10_000, 50_000, 100_000], value=100_000)
+                    metodo = st.radio("Método", ["gbm", "bootstrap"], format_func=lambda m: {"gbm": "GBM", "bootstrap": "Bootstrap histórico"}[m])
+
+                    submit_button = st.form_submit_button(label="Generar Proyección")
+
+            with col_analisis:
+                parametros_sp500 = {
+                    "id_serie": "SP500",
+                    "start_date": start_date_sp500.strftime("%Y-%m-%d"),
+                    "anos_proyeccion": anos_proyeccion_sp500,
+                    "n_trayectorias": n_trayectorias,
+                    "metodo": metodo,
+                }
+
+                if submit_button:
+                    if not fred_api_key:
+                        st.warning("Por favor, ingresa un Token de FRED válido.")
+                    else:
+                        resultados_sp500 = obtener_resultado("sp500", parametros_sp500)
+                        if resultados_sp500 is None:
+                            with st.spinner("Simulando trayectorias..."):
+                                from monte_carlo_sp500 import generar_proyeccion_sp500
+
+                                resultados_sp500 = generar_proyeccion_sp500(api_key=fred_api_key, **parametros_sp500)
+
+                            if resultados_sp500:
+                                guardar_resultado("sp500", parametros_sp500, resultados_sp500)
+                                st.success("Proyección generada exitosamente.")
+                            else:
+                                st.error("Ocurrió un error al generar la proyección.")
+
+                resultados_sp500 = obtener_resultado("sp500")
+                if resultados_sp500:
+                    promedios = resultados_sp500["promedios"]
+
+                    # Mostrar KPIs (1/3)
+                    with st.container():
+                        st.subheader("Rendimiento Anual Compuesto Promedio")
+                        col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                        col1.metric("Escenario Base", f"{promedios['Base']:.2f}%")
+                        col2.metric("Escenario Positivo", f"{promedios['Positivo']:.2f}%")
+                        col3.metric("Escenario Negativo", f"{promedios['Negativo']:.2f}%")
+                        st.caption(f"Histórico: rendimiento anual {resultados_sp500['rendimiento_anual_historico']:.2f}%, volatilidad anual {resultados_sp500['volatilidad_anual_historica']:.2f}%. "
+                                   f"{resultados_sp500['n_trayectorias']:,} trayectorias ({resultados_sp500['metodo'].upper()}).")
+
+                    st.divider()
+
+                    # Gráfica de abanico por percentiles (2/3)
+                    st.subheader("Gráfica de Proyección")
+
+                    historico = resultados_sp500["df_historico"]["sp500"]
+                    percentiles = resultados_sp500["percentiles_nivel"]
+                    ultimo_punto = pd.DataFrame({col: historico.iloc[-1:] for col in percentiles.columns})
+                    percentiles_graficar = pd.concat([ultimo_punto, percentiles])
+
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=historico.index, y=historico, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
+                    for inferior, superior, opacidad in [("P5", "P95", 0.15), ("P25", "P75", 0.3)]:
+                        fig.add_trace(go.Scatter(x=np.concatenate([percentiles_graficar.index, percentiles_graficar.index[::-1]]), y=np.concatenate([percentiles_graficar[superior], percentiles_graficar[inferior][::-1]]), fill='toself', fillcolor=f'rgba(0, 51, 102, {opacidad})', line=dict(color='rgba(255,255,255,0)'), name=f"{inferior}-{superior}", hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=percentiles_graficar.index, y=percentiles_graficar["P50"], mode='lines', name="Mediana", line=dict(color='#003366', width=4)))
+
+                    fig.update_layout(
+                        title_text=f"Proyección del S&P 500 a {resultados_sp500['anos_proyectados']} años",
+                        xaxis_title="Fecha",
+                        yaxis_title="Nivel del Índice",
+                        yaxis_type="log",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                        template="plotly_white",
+                        font=dict(
+                            family="Arial, sans-serif",
+                            size=12,
+                            color="black"
+                        ),
+                        height=600,
+                        xaxis=dict(gridcolor='#EAEAEA'),
+                        yaxis=dict(gridcolor='#EAEAEA')
+                    )
+
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.divider()
+
+                    # Tabla comparativa de escenarios (3/3)
+                    with st.container():
+                        st.subheader("Comparativa de Escenarios")
+
+                        col0, col1, col2 = st.columns([1, 2, 1])
+
+                        with col1:
+                            st.dataframe(resultados_sp500['tabla_escenarios'], use_container_width=True)
+                            st.markdown("**Probabilidad de pérdida acumulada (%)**")
+                            st.dataframe(resultados_sp500['probabilidad_perdida'].rename("Probabilidad (%)").round(2).to_frame().T, use_container_width=True)
+
+                elif not submit_button:
+                    st.info("Ingresa los parámetros en el formulario y haz clic en 'Generar Proyección' para ver los resultados.")
+
+    # --- Contenido de la Pestaña de Descarga ---
+        with tab_descarga:
+            st.subheader("Descargar Datos de la Proyección")
+            st.divider()
+
+            resultados_sp500 = obtener_resultado("sp500")
+            if resultados_sp500:
+                # Escenarios y percentiles (rendimiento anual compuesto y nivel del índice)
+                df_para_descarga = pd.concat([
+                    pd.DataFrame({
+                        'Base': resultados_sp500['escenario_base'],
+                        'Positivo': resultados_sp500['escenario_positivo'],
+                        'Negativo': resultados_sp500['escenario_negativo']
+                    }),
+                    resultados_sp500['percentiles_rendimiento'].add_prefix("Rendimiento "),
+                    resultados_sp500['percentiles_nivel'].add_prefix("Nivel ")
+                ], axis=1).round(2)
+
+                csv_data = df_para_descarga.to_csv(index=True, encoding='utf-8')
+
+                st.download_button(
+                label="Descargar Proyección (CSV)",
+                data=csv_data,
+                file_name='proyeccion_sp500.csv',
+                mime='text/csv',
+                )
+            else:
+                st.warning("Debes generar una proyección en la pestaña '📈 Proyección' para poder descargar los datos.")
+
+
+    # --- Contenido de la Pestaña de EMBI ---
+    if analisis_seleccionado == "EMBI":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import numpy as np
+        import plotly.graph_objects as go
+        from riesgo_pais_embi import FUENTES_EMBI, VENTANA_DIAS, estadisticas_embi, ingerir_embi, inicio_historia, percentiles_historicos, requiere_reconstruccion
+
+        st.header("Riesgo País: Diferencial EMBI")
+
+        tab_metodologia, tab_estadisticas, tab_proyeccion, tab_descarga = st.tabs([
+            "📄 Metodología",
+            "📊 Estadísticas",
+            "📈 Proyección",
+            "📥 Descarga de Datos"
+        ])
+
+    # --- Contenido de la Pestaña de Metodología ---
+        with tab_metodologia:
+            st.subheader("Metodología")
+
+            col1, col2 = st.columns(2, gap="large")
+
+            with col1:
+                with st.container(border=True):
+                    st.subheader("Ingesta y Estadísticas")
+                    st.markdown(f"""
+                    Cada actualización descarga solo los días posteriores al último dato guardado en el almacén local de series. Si se actualiza con una fecha de inicio anterior a la historia guardada, la historia y sus estadísticas se reconstruyen desde esa fecha.
+
+                    - **Ventana móvil:** {VENTANA_DIAS} días hábiles. Al entrar un dato sale el más viejo: media, volatilidad y percentiles se actualizan sin recorrer la ventana.
+                    - **Percentiles:** Histograma de clases fijas de 5 pb, tanto de la ventana como de toda la historia.
+                    - **Volatilidad:** Cambios diarios del diferencial, anualizados.
+                    """)
+
+            with col2:
+                with st.container(border=True):
+                    st.subheader("Proyección y Datos")
+                    st.markdown("""
+                    * **Modelo:** El mismo motor VAR/VECM de las proyecciones de inflación, con el diferencial (promedio mensual), la tasa de fondos federales y el tipo de cambio peso-dólar.
+                    * **Escenarios:** Convergencia a la mediana histórica (Base) y a los percentiles 25 (Positivo) y 75 (Negativo).
+                    * **Fuentes del diferencial:**
+                        - *Archivo local:* `datos_locales/embi_mexico.csv` (fecha, valor en pb), exportado del EMBI de J.P. Morgan.
+                        - *Aproximación (FRED):* `BAMLEMCBPIOAS`, diferencial ajustado por opciones de bonos corporativos de mercados emergentes.
+                    """)
+
+    # --- Contenido de la Pestaña de Estadísticas ---
+        with tab_estadisticas:
+            col_fuente, col_inicio, col_boton = st.columns([3, 1, 1])
+            with col_fuente:
+                fuente_embi = st.selectbox("Fuente del diferencial", list(FUENTES_EMBI), index=1, format_func=lambda f: FUENTES_EMBI[f]["etiqueta"], key="embi_fuente")
+            with col_inicio:
+                inicio_embi = st.date_input("Historia desde", pd.to_datetime("2000-01-01"), key="embi_inicio").strftime("%Y-%m-%d")
+            with col_boton:
+                st.write("")
+                actualizar = st.button("Actualizar datos", key="embi_actualizar")
+
+            # Solo se ingiere al pedirlo o si aún no hay historia; lo normal es leer las estadísticas ya guardadas.
+            # Una fecha anterior al inicio de la historia guardada la reconstruye desde esa fecha (ver ingerir_embi).
+            estadisticas, estado_embi = estadisticas_embi(fuente_embi)
+            if actualizar or estado_embi is None:
+                reconstruir = requiere_reconstruccion(estado_embi, inicio_embi)
+                with st.spinner(f"Reconstruyendo la historia desde {inicio_embi}..." if reconstruir else "Descargando observaciones nuevas..."):
+                    nuevas = ingerir_embi(fuente_embi, credencial("FRED_API_KEY"), inicio_embi)
+                if nuevas is None:
+                    st.error("No se pudieron descargar los datos del diferencial; las estadísticas guardadas no cambiaron.")
+                else:
+                    st.success(f"{nuevas:,} observaciones nuevas." if nuevas else "Los datos ya están al día.")
+                    estadisticas, estado_embi = estadisticas_embi(fuente_embi)
+
+            if estadisticas.empty:
+                st.info("Aún no hay datos del diferencial para esta fuente.")
+            else:
+                ultimo = estadisticas.iloc[-1]
+                col0, col1, col2, col3, col4 = st.columns([1, 3, 3, 3, 3])
+                col1.metric("Diferencial actual", f"{ultimo['valor']:.0f} pb", f"{ultimo['valor'] - ultimo['media']:+.0f} pb vs. media")
+                col2.metric(f"Media {VENTANA_DIAS} días", f"{ultimo['media']:.0f} pb")
+                col3.metric("Volatilidad anualizada", f"{ultimo['volatilidad']:.0f} pb")
+                col4.metric("Percentil histórico", f"{ultimo['percentil_historico']:.0f}")
+                st.caption(f"Datos del {estadisticas.index[0]:%Y-%m-%d} al {estadisticas.index[-1]:%Y-%m-%d}. "
+                           "El percentil histórico usa toda la historia ingerida.")
+
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=np.concatenate([estadisticas.index, estadisticas.index[::-1]]), y=np.concatenate([estadisticas['p90'], estadisticas['p10'][::-1]]), fill='toself', fillcolor='rgba(173, 216, 230, 0.5)', line=dict(color='rgba(255,255,255,0)'), name=f'P10-P90 ({VENTANA_DIAS} días)', hoverinfo='skip'))
+                fig.add_trace(go.Scatter(x=estadisticas.index, y=estadisticas['valor'], mode='lines', name='Diferencial', line=dict(color='#BBBBBB', width=1)))
+                fig.add_trace(go.Scatter(x=estadisticas.index, y=estadisticas['media'], mode='lines', name=f'Media {VENTANA_DIAS} días', line=dict(color='#003366', width=3)))
+                fig.update_layout(template="plotly_white", height=500, title_text="Diferencial soberano (pb)", xaxis_title="Fecha", yaxis_title="Puntos base", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+                st.plotly_chart(fig, use_container_width=True)
+
+    # --- Contenido de la Pestaña de Proyección ---
+        with tab_proyeccion:
+            st.subheader("Generar Proyección")
+            st.divider()
+
+            col_espacio1, col_analisis, col_espacio2, col_formulario = st.columns([0.5, 5.0, 0.5, 1])
+
+            with col_formulario:
+                st.subheader("Parámetros")
+                if estado_embi is None:
+                    st.info("Primero carga los datos en la pestaña '📊 Estadísticas'.")
+                    submit_button = False
+                else:
+                    # Las metas por defecto salen del histograma histórico guardado, sin releer la serie
+                    p25, p50, p75 = percentiles_historicos(estado_embi)
+                    with st.form(key="form_embi"):
+                        fred_api_key = credencial("FRED_API_KEY")
+                        start_date_embi = st.date_input("Fecha de Inicio", pd.to_datetime("2005-01-01"))
+                        anos_proyeccion_embi = st.number_input("Años a Proyectar", 5, 50, 30)
+                        meta_central = st.number_input("Meta Central (pb)", value=float(round(p50)), step=5.0)
+                        meta_baja = st.number_input("Meta Baja (pb)", value=float(round(p25)), step=5.0)
+                        meta_alta = st.number_input("Meta Alta (pb)", value=float(round(p75)), step=5.0)
+
+                        submit_button = st.form_submit_button(label="Generar Proyección")
+
+            with col_analisis:
+                if submit_button:
+                    parametros_embi = {
+                        "fuente": fuente_embi,
+                        "series_ids": {"tasa_interes": "EFFR", "tipo_cambio": "DEXMXUS"},
+                        "start_date": start_date_embi.strftime("%Y-%m-%d"),
+                        "anos_proyeccion": anos_proyeccion_embi,
+                        "params_escenarios": {
+                            'anos_modelo': 5, 'meta_central': meta_central, 'meta_baja': meta_baja, 'meta_alta': meta_alta,
+                            'theta_central': 0.030, 'theta_baja': 0.030, 'theta_alta': 0.030
+                        }
+                    }
+                    resultados_embi = obtener_resultado("embi", parametros_embi)
+                    if resultados_embi is None and requiere_reconstruccion(estado_embi, parametros_embi["start_date"]):
+                        st.warning(f"La historia guardada del diferencial empieza en {inicio_historia(estado_embi)}. "
+                                   "Para proyectar desde una fecha anterior, actualiza los datos desde esa fecha en la pestaña '📊 Estadísticas'.")
+                    elif resultados_embi is None:
+                        with st.spinner("Ejecutando modelo econométrico..."):
+                            from riesgo_pais_embi import generar_proyeccion_embi
+
+                            resultados_embi = generar_proyeccion_embi(api_key=fred_api_key, **parametros_embi)
+
+                        if resultados_embi:
+                            guardar_resultado("embi", parametros_embi, resultados_embi)
+                            from historial_resultados import guardar_corrida
+                            guardar_corrida("embi", parametros_embi, resultados_embi)
+                            st.success("Proyección generada exitosamente.")
+                        else:
+                            st.error("Ocurrió un error al generar la proyección.")
+
+                resultados_embi = obtener_resultado("embi")
+                if resultados_embi:
+                    promedios = resultados_embi["promedios"]
+
+                    with st.container():
+                        st.subheader("Diferencial Promedio Proyectado")
+                        col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                        col1.metric("Escenario Base", f"{promedios['Base']:.0f} pb")
+                        col2.metric("Escenario Positivo", f"{promedios['Positivo']:.0f} pb")
+                        col3.metric("Escenario Negativo", f"{promedios['Negativo']:.0f} pb")
+                        st.caption(f"Modelo seleccionado: {resultados_embi['modelo_usado']}.")
+
+                    st.divider()
+
+                    historico = resultados_embi["df_historico"]["embi"]
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=historico.index, y=historico, mode='lines', name='Histórico', line=dict(color='#BBBBBB', width=3)))
+                    for nombre, color in [("escenario_base", '#003366'), ("escenario_positivo", '#2ca02c'), ("escenario_negativo", '#d62728')]:
+                        escenario = pd.concat([historico.iloc[-1:], resultados_embi[nombre]])
+                        fig.add_trace(go.Scatter(x=escenario.index, y=escenario, mode='lines', name=nombre.replace("escenario_", "").capitalize(), line=dict(color=color, width=3)))
+                    fig.update_layout(template="plotly_white", height=550, title_text=f"Proyección del diferencial a {resultados_embi['anos_proyectados']} años", xaxis_title="Fecha", yaxis_title="Puntos base", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    col0, col1, col2 = st.columns([1, 2, 1])
+                    with col1:
+                        st.dataframe(resultados_embi['tabla_escenarios'].rename(columns=lambda c: c.replace("(%)", "(pb)")), use_container_width=True)
+
+                elif not submit_button:
+                    st.info("Ingresa los parámetros en el formulario y haz clic en 'Generar Proyección' para ver los resultados.")
+
+    # --- Contenido de la Pestaña de Descarga ---
+        with tab_descarga:
+            st.subheader("Descargar Datos")
+            st.divider()
+
+            if not estadisticas.empty:
+                st.download_button(
+                label="Descargar Estadísticas Diarias (CSV)",
+                data=estadisticas.round(3).to_csv(index=True, encoding='utf-8'),
+                file_name='embi_estadisticas.csv',
+                mime='text/csv',
+                )
+
+            resultados_embi = obtener_resultado("embi")
+            if resultados_embi:
+                df_para_descarga = pd.DataFrame({
+                    'Base': resultados_embi['escenario_base'],
+                    'Positivo': resultados_embi['escenario_positivo'],
+                    'Negativo': resultados_embi['escenario_negativo']
+                }).round(2)
+
+                st.download_button(
+                label="Descargar Proyección (CSV)",
+                data=df_para_descarga.to_csv(index=True, encoding='utf-8'),
+                file_name='proyeccion_embi.csv',
+                mime='text/csv',
+                )
+            else:
+                st.warning("Debes generar una proyección en la pestaña '📈 Proyección' para poder descargar los escenarios.")
+
+
+    # --- Contenido de la Pestaña de Beta Desapalancada ---
+    if analisis_seleccionado == "Beta Desampalancada":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import os
+        import pandas as pd
+        import plotly.graph_objects as go
+        from beta_desapalancada import FRECUENCIAS, calcular_betas, leer_precios, leer_tabla_local, tabla_betas
+
+        st.header("Beta Desapalancada")
+
+        tab_metodologia, tab_calculo = st.tabs([
+            "📄 Metodología",
+            "🧮 Cálculo y Descarga"
+        ])
+
+    # --- Contenido de la Pestaña de Metodología ---
+        with tab_metodologia:
+            st.subheader("Metodología")
+
+            col1, col2 = st.columns(2, gap="large")
+
+            with col1:
+                with st.container(border=True):
+                    st.subheader("Beta Apalancada")
+                    st.markdown("""
+                    Se estima la beta de cada emisora contra un índice de mercado con rendimientos de la misma frecuencia:
+
+                    - **Ventana móvil:** Las betas de todas las emisoras y todas las ventanas se calculan a la vez con sumas acumuladas, sin repetir una regresión por ventana.
+                    - **Beta vigente:** Regresión de la ventana más reciente para todo el universo en una sola operación matricial.
+                    """)
+
+            with col2:
+                with st.container(border=True):
+                    st.subheader("Desapalancamiento (Hamada)")
+                    st.markdown("""
+                    La beta desapalancada elimina el efecto de la estructura de capital:
+
+                    $$\\beta_U = \\dfrac{\\beta_L}{1 + (1 - t)\\,D/E}$$
+
+                    * **Precios:** Archivo local CSV o Parquet con fechas en la primera columna y un ticker por columna (incluido el índice).
+                    * **Apalancamiento (opcional):** Archivo con columnas `ticker`, `deuda_capital` y `tasa_impuestos` (fracción).
+                    """)
+
+    # --- Contenido de la Pestaña de Cálculo ---
+        with tab_calculo:
+            col_datos, col_espacio, col_parametros = st.columns([3, 0.3, 2])
+
+            with col_datos:
+                st.subheader("Datos")
+                archivo_precios = st.file_uploader("Precios (CSV o Parquet)", type=["csv", "parquet"], key="beta_precios")
+                ruta_precios = st.text_input("o ruta local", os.path.join("datos_locales", "precios.csv"), key="beta_ruta")
+                archivo_apalancamiento = st.file_uploader("Apalancamiento por ticker (opcional)", type=["csv", "parquet"], key="beta_apalancamiento")
+
+            precios = None
+            if archivo_precios is not None:
+                precios = leer_precios(archivo_precios)
+            elif os.path.exists(ruta_precios):
+                precios = leer_precios(ruta_precios)
+
+            if precios is None or precios.shape[1] < 2:
+                st.info("Carga un archivo de precios con al menos un índice y una emisora para calcular las betas.")
+            else:
+                with col_parametros:
+                    st.subheader("Parámetros")
+                    indice = st.selectbox("Índice de mercado", list(precios.columns), index=len(precios.columns) - 1, key="beta_indice")
+                    frecuencia = st.selectbox("Frecuencia de rendimientos", list(FRECUENCIAS), key="beta_frecuencia")
+                    ventana = st.number_input("Ventana (periodos)", 12, 1000, 60 if frecuencia == "Mensual" else 104 if frecuencia == "Semanal" else 252, key="beta_ventana")
+
+                tickers = [col for col in precios.columns if col != indice]
+                if archivo_apalancamiento is not None:
+                    apalancamiento = leer_tabla_local(archivo_apalancamiento)
+                    apalancamiento = apalancamiento.set_index("ticker") if "ticker" in apalancamiento.columns else apalancamiento
+                else:
+                    apalancamiento = pd.DataFrame({"deuda_capital": 0.5, "tasa_impuestos": 0.30}, index=pd.Index(tickers, name="ticker"))
+                st.markdown("**Apalancamiento por emisora** (editable)")
+                apalancamiento = st.data_editor(apalancamiento.reindex(tickers), use_container_width=True, key="beta_editor")
+
+                try:
+                    with st.spinner("Calculando betas..."):
+                        betas = calcular_betas(precios, indice, int(ventana), frecuencia)
+                except ValueError as e:
+                    st.warning(str(e))
+                    betas = None
+
+                if betas is not None:
+                    tabla = tabla_betas(betas, apalancamiento)
+                    st.divider()
+                    st.subheader("Betas por Emisora")
+                    st.dataframe(tabla.round(3), use_container_width=True)
+
+                    seleccion = st.multiselect("Betas móviles a graficar", tickers, default=tickers[:5], key="beta_seleccion")
+                    fig = go.Figure()
+                    for ticker in seleccion:
+                        fig.add_trace(go.Scatter(x=betas["betas_moviles"].index, y=betas["betas_moviles"][ticker], mode='lines', name=ticker))
+                    fig.add_hline(y=1.0, line_dash="dot", line_color="black")
+                    fig.update_layout(template="plotly_white", height=450, title_text=f"Beta apalancada móvil ({ventana} periodos, {frecuencia.lower()})", xaxis_title="Fecha", yaxis_title="Beta")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.download_button(
+                    label="Descargar Betas (CSV)",
+                    data=tabla.round(4).to_csv(index=True, encoding='utf-8'),
+                    file_name='betas_desapalancadas.csv',
+                    mime='text/csv',
+                    )
+
+
+    # --- Contenido de la Pestaña de Bonos a 20 Años ---
+    if analisis_seleccionado == "Bonos 20 años":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import numpy as np
+        import plotly.graph_objects as go
+
+        st.header("Rendimiento del Bono Soberano a 20 Años")
+
+        tab_metodologia, tab_curva, tab_descarga = st.tabs([
+            "📄 Metodología",
+            "📈 Curva de Rendimientos",
+            "📥 Descarga de Datos"
+        ])
+
+    # --- Contenido de la Pestaña de Metodología ---
+        with tab_metodologia:
+            st.subheader("Metodología del Ajuste de Curvas")
+
+            col1, col2 = st.columns(2, gap="large")
+
+            with col1:
+                with st.container(border=True):
+                    st.subheader("Nelson-Siegel y Svensson")
+                    st.markdown("""
+                    Cada día se ajusta una curva suave a los nodos observados:
+
+                    $$y(m) = \\beta_0 + \\beta_1 \\frac{1 - e^{-m/\\tau_1}}{m/\\tau_1} + \\beta_2 \\left(\\frac{1 - e^{-m/\\tau_1}}{m/\\tau_1} - e^{-m/\\tau_1}\\right) + \\beta_3 \\left(\\frac{1 - e^{-m/\\tau_2}}{m/\\tau_2} - e^{-m/\\tau_2}\\right)$$
+
+                    - **Nelson-Siegel:** Nivel, pendiente y curvatura ($\\beta_3 = 0$).
+                    - **Svensson:** Agrega una segunda joroba para la parte larga de la curva.
+                    - **Ajuste:** Dados los $\\tau$, las betas salen por mínimos cuadrados; los $\\tau$ se buscan en una rejilla, partiendo de los del día anterior.
+                    """)
+
+            with col2:
+                with st.container(border=True):
+                    st.subheader("Datos")
+                    st.markdown("""
+                    * **Estados Unidos:** Rendimientos diarios a vencimiento constante del Tesoro, de 1 mes a 30 años.
+                        - *IDs de Serie (FRED):* `DGS1MO` ... `DGS30`.
+                    * **México:** Resultados de subasta de Cetes (28 días a 1 año) y Bonos M (3 a 30 años); el último dato de cada nodo se arrastra hasta la siguiente subasta.
+                    * **Rendimiento a 20 años:** Se evalúa la curva ajustada en 20 años, aunque ese día no haya dato observado en ese plazo.
+                    """)
+
+    # --- Contenido de la Pestaña de Curva ---
+        with tab_curva:
+            st.subheader("Ajustar Curvas")
+            st.divider()
+
+            col_espacio1, col_analisis, col_espacio2, col_formulario = st.columns([0.5, 5.0, 0.5, 1])
+
+            with col_formulario:
+                st.subheader("Parámetros")
+                submit_button = formulario_curva("bonos")
+
+            with col_analisis:
+                resultados_curva = obtener_resultado("curva")
+                if resultados_curva:
+                    from curva_rendimientos import rendimientos_ajustados
+
+                    rendimiento_largo = resultados_curva["rendimiento_largo"].dropna()
+                    parametros = resultados_curva["parametros"]
+
+                    # Mostrar KPIs (1/3)
+                    with st.container():
+                        col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                        col1.metric("Rendimiento a 20 años", f"{rendimiento_largo.iloc[-1]:.2f}%", f"{rendimiento_largo.iloc[-1] - rendimiento_largo.iloc[-min(len(rendimiento_largo), 22)]:+.2f} pp (1 mes)")
+                        col2.metric("Promedio del periodo", f"{rendimiento_largo.mean():.2f}%")
+                        col3.metric("Error de ajuste (RMSE)", f"{parametros['rmse'].median() * 100:.1f} pb")
+                        st.caption(f"{len(parametros):,} curvas ajustadas con {'Svensson' if resultados_curva['modelo'] == 'svensson' else 'Nelson-Siegel'}.")
+
+                    st.divider()
+
+                    # Historia del rendimiento a 20 años (2/3)
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=rendimiento_largo.index, y=rendimiento_largo, mode='lines', name='Ajustado a 20 años', line=dict(color='#003366', width=2)))
+                    fig.update_layout(template="plotly_white", height=450, title_text="Rendimiento ajustado a 20 años (%)", xaxis_title="Fecha", yaxis_title="Rendimiento (%)")
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    # Curva de una fecha: nodos observados contra curva ajustada (3/3)
+                    fechas = parametros.dropna().index
+                    fecha = st.select_slider("Fecha de la curva", options=list(fechas), value=fechas[-1], format_func=lambda f: f.strftime("%Y-%m-%d"), key="curva_fecha")
+                    plazos = np.linspace(0.05, 30, 200)
+                    curva_fecha = rendimientos_ajustados(parametros.loc[[fecha]], plazos).iloc[0]
+                    observada = resultados_curva["curva_observada"].loc[fecha].dropna()
+
+                    fig_curva = go.Figure()
+                    fig_curva.add_trace(go.Scatter(x=plazos, y=curva_fecha, mode='lines', name='Curva ajustada', line=dict(color='#003366', width=3)))
+                    fig_curva.add_trace(go.Scatter(x=observada.index, y=observada, mode='markers', name='Observado', marker=dict(color='#D62728', size=9)))
+                    fig_curva.update_layout(template="plotly_white", height=450, title_text=f"Curva de rendimientos al {fecha:%Y-%m-%d}", xaxis_title="Plazo (años)", yaxis_title="Rendimiento (%)")
+                    st.plotly_chart(fig_curva, use_container_width=True)
+
+                elif not submit_button:
+                    st.info("Ingresa los parámetros en el formulario y haz clic en 'Ajustar Curvas' para ver los resultados.")
+
+    # --- Contenido de la Pestaña de Descarga ---
+        with tab_descarga:
+            st.subheader("Descargar Curvas Ajustadas")
+            st.divider()
+
+            resultados_curva = obtener_resultado("curva")
+            if resultados_curva:
+                df_para_descarga = resultados_curva["parametros"].join(resultados_curva["rendimiento_largo"]).round(4)
+
+                st.download_button(
+                label="Descargar Parámetros y Rendimiento a 20 Años (CSV)",
+                data=df_para_descarga.to_csv(index=True, encoding='utf-8'),
+                file_name=f"curva_{resultados_curva['pais']}.csv",
+                mime='text/csv',
+                )
+            else:
+                st.warning("Debes ajustar las curvas en la pestaña '📈 Curva de Rendimientos' para poder descargar los datos.")
+
+
+    # --- Contenido de la Pestaña de Deuda a Largo Plazo ---
+    if analisis_seleccionado == "Deuda Largo Plazo":
+        # Importaciones diferidas: solo se cargan al abrir esta pestaña
+        import pandas as pd
+        import plotly.graph_objects as go
+
+        st.header("Costo de la Deuda a Largo Plazo")
+        st.write("Rendimiento soberano ajustado a 20 años más un diferencial de crédito, antes y después de impuestos.")
+        st.divider()
+
+        col_espacio1, col_analisis, col_espacio2, col_formulario = st.columns([0.5, 5.0, 0.5, 1])
+
+        with col_formulario:
+            st.subheader("Parámetros")
+            submit_button = formulario_curva("deuda")
+            diferencial_pb = st.number_input("Diferencial de crédito (pb)", 0, 2000, 150, step=25)
+            tasa_impuestos = st.number_input("Tasa de impuestos (%)", 0.0, 60.0, 30.0, step=1.0) / 100
+
+        with col_analisis:
+            resultados_curva = obtener_resultado("curva")
+            if resultados_curva:
+                from curva_rendimientos import costo_deuda_largo_plazo
+
+                rendimiento_largo = resultados_curva["rendimiento_largo"].dropna()
+                costo = pd.DataFrame({
+                    "Rendimiento 20 años (%)": rendimiento_largo,
+                    "Costo de deuda (%)": costo_deuda_largo_plazo(rendimiento_largo, diferencial_pb),
+                    "Costo de deuda después de impuestos (%)": costo_deuda_largo_plazo(rendimiento_largo, diferencial_pb, tasa_impuestos),
+                })
+
+                col0, col1, col2, col3, col4 = st.columns([3, 3, 3, 3, 3])
+                col1.metric("Rendimiento a 20 años", f"{costo.iloc[-1, 0]:.2f}%")
+                col2.metric("Costo de deuda", f"{costo.iloc[-1, 1]:.2f}%")
+                col3.metric("Después de impuestos", f"{costo.iloc[-1, 2]:.2f}%")
+
+                fig = go.Figure()
+                for columna, color in zip(costo.columns, ['#BBBBBB', '#003366', '#2ca02c']):
+                    fig.add_trace(go.Scatter(x=costo.index, y=costo[columna], mode='lines', name=columna, line=dict(color=color, width=2)))
+                fig.update_layout(template="plotly_white", height=500, title_text=f"Costo de la deuda a largo plazo ({'México' if resultados_curva['pais'] == 'mexico' else 'Estados Unidos'})", xaxis_title="Fecha", yaxis_title="%", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+                st.plotly_chart(fig, use_container_width=True)
+
+                st.download_button(
+                label="Descargar Costo de Deuda (CSV)",
+                data=costo.round(4).to_csv(index=True, encoding='utf-8'),
+                file_name=f"costo_deuda_{resultados_curva['pais']}.csv",
+                mime='text/csv',
+                )
+            elif not submit_button:
+                st.info("Ingresa los parámetros en el formulario y haz clic en 'Ajustar Curvas' para ver los resultados.")
+
+
+# --- PÁGINA DE ADMINISTRACIÓN ---
+if pagina_seleccionada == "Administración":
+    import pandas as pd
+    from metricas import LIMITES_SEGUNDOS, instantanea, texto_prometheus
+    from programador_actualizaciones import resumen_programador
+
+    st.title("Administración")
+    st.caption("Métricas acumuladas desde que arrancó el proceso, compartidas por todas las sesiones.")
+    contadores, histogramas, medidores = instantanea()
+
+    def tabla_contadores(nombre):
+        filas = [{**dict(etiquetas), "Total": valor} for (n, etiquetas), valor in contadores.items() if n == nombre]
+        return pd.DataFrame(filas)
+
+    def tabla_histogramas(nombre):
+        filas = []
+        for (n, etiquetas), h in histogramas.items():
+            if n != nombre:
+                continue
+            # Percentil 95 aproximado: límite superior del primer intervalo que acumula el 95% de las observaciones
+            acumulados = pd.Series(h["conteos"]).cumsum()
+            p95 = next((limite for limite, acumulado in zip(LIMITES_SEGUNDOS, acumulados) if acumulado >= 0.95 * h["total"]), None)
+            filas.append({**dict(etiquetas), "Observaciones": h["total"], "Promedio (s)": h["suma"] / h["total"],
+                          "Total (s)": h["suma"], "P95 ≤ (s)": p95})
+        return pd.DataFrame(filas)
+
+    def mostrar_tabla(tabla, contenedor=st):
+        if tabla.empty:
+            contenedor.caption("Sin registros todavía.")
+        else:
+            contenedor.dataframe(tabla.round(3), use_container_width=True, hide_index=True)
+
+    # --- Uso de las APIs ---
+    st.subheader("Llamadas a las APIs de datos")
+    col_llamadas, col_latencia = st.columns(2)
+    mostrar_tabla(tabla_contadores("proyecciones_api_llamadas_total"), col_llamadas)
+    mostrar_tabla(tabla_histogramas("proyecciones_api_latencia_segundos"), col_latencia)
+
+    # --- Latencia del pipeline ---
+    st.subheader("Latencia de las proyecciones")
+    col_etapas, col_ajustes = st.columns(2)
+    col_etapas.markdown("**Por país y etapa**")
+    mostrar_tabla(tabla_histogramas("proyecciones_etapa_segundos"), col_etapas)
+    col_ajustes.markdown("**Ajustes nuevos por tipo de modelo**")
+    mostrar_tabla(tabla_histogramas("proyecciones_ajuste_segundos"), col_ajustes)
+    mostrar_tabla(tabla_contadores("proyecciones_generadas_total"))
+
+    # --- Eficiencia de las cachés ---
+    st.subheader("Cachés")
+    consultas = tabla_contadores("proyecciones_cache_consultas_total")
+    if consultas.empty:
+        st.caption("Sin consultas a las cachés todavía.")
+    else:
+        fallos = tabla_contadores("proyecciones_cache_fallos_total")
+        fallos = dict(zip(fallos["funcion"], fallos["Total"])) if not fallos.empty else {}
+        consultas = consultas.rename(columns={"funcion": "Función", "Total": "Consultas"})
+        consultas["Fallos"] = consultas["Función"].map(fallos).fillna(0).astype(int)
+        consultas["Tasa de aciertos (%)"] = (100 * (1 - consultas["Fallos"] / consultas["Consultas"])).round(1)
+        st.dataframe(consultas, use_container_width=True, hide_index=True)
+    mostrar_tabla(pd.DataFrame([{**dict(etiquetas), "MB": valor / 1e6} for (n, etiquetas), valor in medidores.items() if n == "proyecciones_cache_bytes"]))
+    maxima = medidores.get(("proyecciones_memoria_maxima_bytes", ()))
+    if maxima is not None:
+        st.metric("Memoria residente máxima del proceso", f"{maxima / 1e6:,.0f} MB")
+
+    # --- Programador de actualizaciones ---
+    st.subheader("Actualizaciones automáticas")
+    resumen = resumen_programador(iniciar_programador())
+    if resumen["sin_credencial"]:
+        st.warning(f"Sin credencial configurada, no se actualizan: {', '.join(resumen['sin_credencial'])}.")
+    if not resumen["activo"]:
+        st.info("El programador de actualizaciones no está activo (ACTUALIZACION_AUTOMATICA=0 o sin credenciales).")
+    if resumen["proximo"]:
+        st.write(f"Próxima actualización: {resumen['proximo']['pais']} — {resumen['proximo']['descripcion']} "
+                 f"({resumen['proximo']['momento']:%Y-%m-%d %H:%M} UTC)")
+    if resumen["historial"]:
+        st.dataframe(pd.DataFrame(resumen["historial"]), use_container_width=True, hide_index=True)
+    mostrar_tabla(tabla_contadores("proyecciones_actualizaciones_total"))
+
+    # --- Texto para Prometheus ---
+    with st.expander("Formato de texto de Prometheus"):
+        texto = texto_prometheus()
+        st.code(texto, language="text")
+        st.download_button(label="Descargar métricas", data=texto, file_name="metricas.prom", mime="text/plain")
@@ -0,0 +1,135 @@
+# diagnosticos_residuos.py
+
+import numpy as np
+import pandas as pd
+
+# Rezagos por defecto: dos años de datos mensuales para autocorrelación, uno para ARCH
+REZAGOS_ACF = 24
+REZAGOS_ARCH = 12
+
+
+# --- 1. AUTOCOVARIANZAS CRUZADAS CON FFT ---
+def autocovarianzas(residuos, rezagos=REZAGOS_ACF):
+    """
+    Matrices de autocovarianza Γ_h = (1/T) Σ_t u_{t+h} u_t' para h = 0..rezagos, con forma (rezagos + 1, K, K).
+    Todas las parejas de ecuaciones salen de un solo producto de espectros, sin ciclos por variable.
+    """
+    u = np.asarray(residuos, dtype=float)
+    u = u - u.mean(axis=0)
+    T = len(u)
+    n_fft = 1 << int(np.ceil(np.log2(2 * T - 1))) # Relleno con ceros: correlación lineal, no circular
+    espectro = np.fft.rfft(u, n=n_fft, axis=0)
+    cruzado = espectro[:, :, None] * np.conj(espectro[:, None, :])
+    return np.fft.irfft(cruzado, n=n_fft, axis=0)[:rezagos + 1] / T
+
+
+def correlaciones_cruzadas(gamma):
+    """
+    Matrices de correlación cruzada R_h[i, j] = corr(u_{i,t+h}, u_{j,t}); la diagonal es la ACF de cada ecuación.
+    """
+    desv = np.sqrt(np.diagonal(gamma[0]))
+    return gamma / np.outer(desv, desv)
+
+
+def bandas_bartlett(acf, T, alpha=0.05):
+    """
+    Semiancho de la banda de confianza de la ACF con la fórmula de Bartlett (la misma de statsmodels), por ecuación.
+    """
+    from pronostico_analitico import cuantil_normal
+
+    varianza = np.ones_like(acf[1:]) / T
+    varianza[1:] *= 1 + 2 * np.cumsum(acf[1:-1] ** 2, axis=0)
+    return cuantil_normal(alpha) * np.sqrt(varianza)
+
+
+# --- 2. PRUEBAS POR ECUACIÓN (VECTORIZADAS) ---
+def ljung_box(acf, T):
+    """
+    Estadístico Q de Ljung-Box con todos los rezagos de `acf` (forma (rezagos + 1, K)) para cada ecuación.
+    """
+    h = np.arange(1, len(acf))[:, None]
+    return T * (T + 2) * np.sum(acf[1:] ** 2 / (T - h), axis=0)
+
+
+def jarque_bera(residuos):
+    """
+    Estadístico de Jarque-Bera, asimetría y curtosis de cada columna.
+    """
+    u = np.asarray(residuos, dtype=float)
+    u = u - u.mean(axis=0)
+    m2 = np.mean(u ** 2, axis=0)
+    asimetria = np.mean(u ** 3, axis=0) / m2 ** 1.5
+    curtosis = np.mean(u ** 4, axis=0) / m2 ** 2
+    return len(u) / 6 * (asimetria ** 2 + (curtosis - 3) ** 2 / 4), asimetria, curtosis
+
+
+def arch_lm(residuos, rezagos=REZAGOS_ARCH):
+    """
+    Prueba ARCH-LM de Engle: T·R² de la regresión de u_t² sobre una constante y `rezagos` rezagos de u².
+    Las K regresiones se resuelven como un solo lote de ecuaciones normales.
+    """
+    u2 = np.asarray(residuos, dtype=float).T ** 2 # (K, T)
+    K, T = u2.shape
+    y = u2[:, rezagos:]
+    X = np.concatenate([np.ones((K, T - rezagos, 1))] + [u2[:, rezagos - j:T - j, None] for j in range(1, rezagos + 1)], axis=2)
+    Xt = X.transpose(0, 2, 1)
+    beta = np.linalg.solve(Xt @ X, Xt @ y[:, :, None])
+    residuo = y - (X @ beta)[:, :, 0]
+    r2 = 1 - np.sum(residuo ** 2, axis=1) / np.sum((y - y.mean(axis=1, keepdims=True)) ** 2, axis=1)
+    return (T - rezagos) * r2
+
+
+# --- 3. PRUEBA CONJUNTA DEL SISTEMA ---
+def portmanteau(gamma, T, k_ar=0, ajustada=True):
+    """
+    Portmanteau multivariado con todos los rezagos de `gamma`: Q = T² Σ_h tr(Γ_h' Γ_0⁻¹ Γ_h Γ_0⁻¹) / (T - h)
+    (Hosking; con `ajustada=False`, Q = T Σ_h tr(...)). Grados de libertad K²(rezagos - k_ar), como en statsmodels.
+    """
+    rezagos, K = len(gamma) - 1, gamma.shape[1]
+    inversa = np.linalg.inv(gamma[0])
+    derecha = gamma[1:] @ inversa # Γ_h Γ_0⁻¹
+    izquierda = gamma[1:].transpose(0, 2, 1) @ inversa # Γ_h' Γ_0⁻¹
+    trazas = np.einsum("hij,hji->h", izquierda, derecha)
+    pesos = T ** 2 / (T - np.arange(1, rezagos + 1)) if ajustada else np.full(rezagos, T)
+    return float(np.sum(pesos * trazas)), K ** 2 * (rezagos - k_ar)
+
+
+# --- 4. BATERÍA COMPLETA ---
+def diagnosticar_residuos(residuos, columnas, k_ar=0, rezagos=REZAGOS_ACF, rezagos_arch=REZAGOS_ARCH):
+    """
+    Todas las pruebas sobre los residuos (T, K) de todas las ecuaciones del VAR/VECM. Se calcula una sola vez
+    junto con el ajuste; el dashboard solo lee la tabla y las autocorrelaciones guardadas.
+    """
+    from scipy.stats import chi2
+
+    u = np.asarray(residuos, dtype=float)
+    T = len(u)
+    gamma = autocovarianzas(u, rezagos)
+    correlaciones = correlaciones_cruzadas(gamma)
+    acf = np.diagonal(correlaciones, axis1=1, axis2=2)
+
+    q = ljung_box(acf, T)
+    jb, asimetria, curtosis = jarque_bera(u)
+    lm = arch_lm(u, rezagos_arch)
+    tabla = pd.DataFrame({
+        f"Ljung-Box Q({rezagos})": q,
+        "p-valor LB": chi2.sf(q, rezagos),
+        "Jarque-Bera": jb,
+        "p-valor JB": chi2.sf(jb, 2),
+        "Asimetría": asimetria,
+        "Curtosis": curtosis,
+        f"ARCH-LM({rezagos_arch})": lm,
+        "p-valor ARCH": chi2.sf(lm, rezagos_arch),
+    }, index=list(columnas))
+
+    estadistico, grados = portmanteau(gamma, T, k_ar)
+    return {
+        "tabla": tabla,
+        "portmanteau": {"estadistico": estadistico, "grados_libertad": grados,
+                        "p_valor": float(chi2.sf(estadistico, grados)) if grados > 0 else np.nan, "rezagos": rezagos},
+        "acf": acf,
+        "bandas_acf": bandas_bartlett(acf, T),
+        "correlaciones_cruzadas": correlaciones,
+        "columnas": list(columnas),
+        "observaciones": T,
+    }
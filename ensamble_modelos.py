@@ -0,0 +1,237 @@
+# ensamble_modelos.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from diagnosticos_residuos import diagnosticar_residuos
+from impulso_respuesta import parametros_var
+from metricas import cache_instrumentada, observar
+from motor_var_vecm import HORIZONTE_MAXIMO_ANOS, TTL_AJUSTES_SEGUNDOS, _trayectorias, seleccionar_modelo
+from pronostico_analitico import calcular_componentes
+
+# Rezagos (en niveles) de las especificaciones candidatas
+REZAGOS_CANDIDATOS = (2, 6, 12)
+
+# Backtest: pronósticos a HORIZONTE_BACKTEST meses desde ORIGENES_BACKTEST cortes separados por ese mismo horizonte
+HORIZONTE_BACKTEST = 12
+ORIGENES_BACKTEST = 3
+
+# Ensambles en caché: cada uno cuesta el ajuste y backtest de todos los candidatos, con el mismo ttl que ajustar_modelo
+MAX_ENSAMBLES_CACHE = 4
+
+ESQUEMAS_PESOS = {
+    "aic": "Ensamble ponderado por AIC",
+    "bic": "Ensamble ponderado por BIC",
+    "backtest": "Ensamble ponderado por backtest",
+}
+
+
+# --- 1. ESPECIFICACIONES CANDIDATAS ---
+def especificaciones_candidatas(n_variables, rezagos=REZAGOS_CANDIDATOS):
+    """
+    VAR en niveles, VAR en diferencias y VECM de rango 1..K-1, cada uno con todos los rezagos candidatos.
+    """
+    especificaciones = []
+    for p in rezagos:
+        especificaciones.append({"tipo": "var_niveles", "rezagos": p, "rango": 0, "nombre": f"VAR en niveles (p={p})"})
+        especificaciones.append({"tipo": "var_diferencias", "rezagos": p, "rango": 0, "nombre": f"VAR en diferencias (p={p})"})
+        especificaciones.extend({"tipo": "vecm", "rezagos": p, "rango": r, "nombre": f"VECM rango {r} (p={p})"} for r in range(1, n_variables))
+    return especificaciones
+
+
+def orden_en_niveles(especificacion):
+    # El VAR en diferencias con p rezagos equivale a un VAR(p + 1) en niveles
+    return especificacion["rezagos"] + (especificacion["tipo"] == "var_diferencias")
+
+
+def coeficientes_en_niveles(coefs, diferenciadas):
+    """
+    Representación VAR en niveles de un VAR(p) en el que las variables marcadas en `diferenciadas` entran en diferencias:
+    (I - Σ A_j L^j)(I - E L) y_t, con E = diag(diferenciadas). Devuelve p + 1 matrices de coeficientes.
+    """
+    p, K, _ = coefs.shape
+    E = np.diag(np.asarray(diferenciadas, dtype=float))
+    niveles = np.zeros((p + 1, K, K))
+    niveles[:p] += coefs
+    niveles[0] += E
+    niveles[1:] -= coefs @ E
+    return niveles
+
+
+# --- 2. AJUSTE DE UN CANDIDATO (DENTRO DE UN PROCESO TRABAJADOR) ---
+def _ajustar_especificacion(y, exog, especificacion, diferenciadas, pasos, exog_futuro):
+    """
+    Ajusta una especificación sobre `y` (niveles) y devuelve pronóstico puntual en niveles, coeficientes VAR
+    en niveles, Σ_u y residuos.
+    """
+    from statsmodels.tsa.api import VAR, VECM
+
+    p = especificacion["rezagos"]
+    if especificacion["tipo"] == "vecm":
+        modelo = VECM(y, exog=exog, k_ar_diff=p - 1, coint_rank=especificacion["rango"], deterministic='ci').fit()
+        punto = modelo.predict(steps=pasos, exog_fc=exog_futuro)
+        return punto, modelo.var_rep, modelo.sigma_u, np.asarray(modelo.resid)
+
+    if especificacion["tipo"] == "var_niveles":
+        modelo = VAR(y, exog=exog).fit(p, trend='c')
+        punto = modelo.forecast(y[-p:], steps=pasos, exog_future=exog_futuro)
+        return punto, modelo.coefs, modelo.sigma_u, np.asarray(modelo.resid)
+
+    w = y.copy()
+    w[1:, diferenciadas] = np.diff(y[:, diferenciadas], axis=0)
+    w, exog_w = w[1:], None if exog is None else exog[1:]
+    modelo = VAR(w, exog=exog_w).fit(p, trend='c')
+    punto = modelo.forecast(w[-p:], steps=pasos, exog_future=exog_futuro)
+    punto[:, diferenciadas] = y[-1, diferenciadas] + np.cumsum(punto[:, diferenciadas], axis=0)
+    return punto, coeficientes_en_niveles(modelo.coefs, diferenciadas), modelo.sigma_u, np.asarray(modelo.resid)
+
+
+def _numero_parametros(especificacion, K, n_exogenas):
+    p, r = especificacion["rezagos"], especificacion["rango"]
+    if especificacion["tipo"] == "vecm":
+        # Γ_1..Γ_{p-1}, α, β normalizada y la constante dentro de la relación de cointegración
+        return K * K * (p - 1) + K * r + r * (K - r) + r + K * n_exogenas
+    return K * (1 + K * p) + K * n_exogenas
+
+
+def _evaluar_candidato(y, exog, especificacion, diferenciadas, inicio, pasos):
+    """
+    Ajuste completo, criterios de información y error de backtest de una especificación.
+    `inicio` recorta la muestra para que todos los candidatos tengan las mismas observaciones efectivas
+    y sus verosimilitudes sean comparables. Devuelve None si la especificación no se puede estimar.
+    """
+    y, exog = y[inicio:], None if exog is None else exog[inicio:]
+    K = y.shape[1]
+    exog_futuro = None if exog is None else np.repeat(exog[-1:], pasos, axis=0)
+    try:
+        punto, coefs, sigma_u, residuos = _ajustar_especificacion(y, exog, especificacion, diferenciadas, pasos, exog_futuro)
+
+        # Verosimilitud gaussiana con Σ de máxima verosimilitud (la del VAR en diferencias es la de los niveles)
+        T = len(residuos)
+        _, logdet = np.linalg.slogdet(residuos.T @ residuos / T)
+        log_verosimilitud = -T / 2 * (K * (1 + np.log(2 * np.pi)) + logdet)
+        k = _numero_parametros(especificacion, K, 0 if exog is None else exog.shape[1])
+
+        # Backtest de la variable objetivo (primera columna) desde varios cortes
+        errores = []
+        for j in range(ORIGENES_BACKTEST, 0, -1):
+            corte = len(y) - j * HORIZONTE_BACKTEST
+            exog_corte = None if exog is None else exog[:corte]
+            exog_prueba = None if exog is None else exog[corte:corte + HORIZONTE_BACKTEST]
+            prueba, *_ = _ajustar_especificacion(y[:corte], exog_corte, especificacion, diferenciadas, HORIZONTE_BACKTEST, exog_prueba)
+            errores.append(prueba[:, 0] - y[corte:corte + HORIZONTE_BACKTEST, 0])
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+
+    return {
+        "punto": punto,
+        "desv_est": calcular_componentes(coefs, sigma_u, pasos)["desv_est"],
+        "coefs": np.asarray(coefs),
+        "sigma_u": np.asarray(sigma_u),
+        "residuos": residuos,
+        "aic": -2 * log_verosimilitud + 2 * k,
+        "bic": -2 * log_verosimilitud + k * np.log(T),
+        "mse_backtest": float(np.mean(np.square(errores))),
+    }
+
+
+# --- 3. PESOS Y MEZCLA ---
+def calcular_pesos(candidatos, esquema="aic"):
+    """
+    Pesos de Akaike/Schwarz, exp(-Δ/2) normalizados, o inversos del error cuadrático medio del backtest.
+    """
+    if esquema == "backtest":
+        puntajes = 1 / np.array([c["mse_backtest"] for c in candidatos])
+        return puntajes / puntajes.sum()
+    if esquema not in ("aic", "bic"):
+        raise ValueError(f"Esquema de pesos desconocido: '{esquema}'. Opciones: {', '.join(ESQUEMAS_PESOS)}.")
+    criterio = np.array([c[esquema] for c in candidatos])
+    pesos = np.exp(-(criterio - criterio.min()) / 2)
+    return pesos / pesos.sum()
+
+
+def mezclar_pronosticos(puntos, desviaciones, pesos):
+    """
+    Media y desviación estándar de la mezcla de normales: μ = Σ w_c μ_c, σ² = Σ w_c (σ_c² + (μ_c - μ)²).
+    La dispersión entre modelos se suma a la incertidumbre de cada uno.
+    """
+    w = np.asarray(pesos)[:, None, None]
+    media = np.sum(w * puntos, axis=0)
+    varianza = np.sum(w * (desviaciones ** 2 + (puntos - media) ** 2), axis=0)
+    return media, np.sqrt(varianza)
+
+
+# --- 4. ENSAMBLE COMPATIBLE CON EL AJUSTE DE motor_var_vecm ---
+@cache_instrumentada(st.cache_resource(show_spinner=False, max_entries=MAX_ENSAMBLES_CACHE, ttl=TTL_AJUSTES_SEGUNDOS))
+def ajustar_ensamble(df, exogenas=None, variables_a_probar=('tasa_interes', 'tipo_cambio'), esquema="aic", n_procesos=None):
+    """
+    Ajusta todas las especificaciones candidatas en paralelo (un proceso por candidato) y las combina
+    en un diccionario con las mismas llaves que `ajustar_modelo`, para que `construir_resultados` lo use igual.
+    Las bandas son gaussianas con la media y la varianza de la mezcla. El impulso-respuesta y los diagnósticos
+    de residuos corresponden al candidato de mayor peso.
+    """
+    inicio = time.perf_counter()
+    # Las pruebas ADF/Johansen ya no deciden el modelo; se conservan para el reporte de diagnósticos
+    seleccion = seleccionar_modelo(df, variables_a_probar)
+    columnas = list(df.columns)
+    diferenciadas = [col in variables_a_probar for col in columnas]
+    y = df.to_numpy(dtype=float)
+    exog = None if exogenas is None else exogenas.loc[df.index].to_numpy(dtype=float)
+
+    n_max = HORIZONTE_MAXIMO_ANOS * 12
+    especificaciones = especificaciones_candidatas(len(columnas))
+    orden_maximo = max(orden_en_niveles(e) for e in especificaciones)
+    inicios = [orden_maximo - orden_en_niveles(e) for e in especificaciones]
+    argumentos = ([y] * len(especificaciones), [exog] * len(especificaciones), especificaciones,
+                  [diferenciadas] * len(especificaciones), inicios, [n_max] * len(especificaciones))
+
+    n_procesos = n_procesos or min(os.cpu_count() or 1, len(especificaciones))
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+            evaluados = list(ejecutor.map(_evaluar_candidato, *argumentos))
+    else:
+        evaluados = [_evaluar_candidato(*args) for args in zip(*argumentos)]
+
+    validos = [(e, c) for e, c in zip(especificaciones, evaluados) if c is not None]
+    if not validos:
+        raise ValueError("Ninguna especificación candidata se pudo estimar con estos datos.")
+    especificaciones, candidatos = map(list, zip(*validos))
+    pesos = calcular_pesos(candidatos, esquema)
+    punto, desv_est = mezclar_pronosticos(np.array([c["punto"] for c in candidatos]), np.array([c["desv_est"] for c in candidatos]), pesos)
+
+    tabla_pesos = pd.DataFrame({
+        "AIC": [c["aic"] for c in candidatos],
+        "BIC": [c["bic"] for c in candidatos],
+        f"ECM backtest ({HORIZONTE_BACKTEST} meses)": [c["mse_backtest"] for c in candidatos],
+        "Peso": pesos,
+    }, index=[e["nombre"] for e in especificaciones]).sort_values("Peso", ascending=False)
+
+    principal = candidatos[int(np.argmax(pesos))]
+    endog = y[orden_maximo - principal["coefs"].shape[0]:]
+    exog_principal = None if exog is None else exog[orden_maximo - principal["coefs"].shape[0]:]
+    seleccion = {**seleccion, "usar_vecm": False, "reconstruir_niveles": False, "df_modelo": df}
+    ajuste = {
+        **seleccion,
+        "resultados_modelo": None,
+        "estimador": "mco",
+        "modelo_usado": f"{ESQUEMAS_PESOS[esquema]} ({len(candidatos)} modelos)",
+        "ensamble": tabla_pesos,
+        "columnas": columnas,
+        "exogenas": [] if exogenas is None else list(exogenas.columns),
+        "fechas_futuras": pd.date_range(start=df.index[-1] + pd.DateOffset(months=1), periods=n_max, freq="MS"),
+        "ultimos_niveles": y[-1],
+        "punto_modelo": punto,
+        "desv_est": desv_est,
+        "trayectorias": _trayectorias(seleccion, columnas, y[-1], punto, desv_est),
+        "residuos": principal["residuos"][:, 0],
+        "resumen_texto": f"{ESQUEMAS_PESOS[esquema]}\n\n" + tabla_pesos.round(4).to_string(),
+        "parametros_var": parametros_var(principal["coefs"], principal["sigma_u"], endog, principal["residuos"], columnas, exog_principal),
+        "diagnosticos": diagnosticar_residuos(principal["residuos"], columnas, k_ar=principal["coefs"].shape[0]),
+    }
+    observar("proyecciones_ajuste_segundos", time.perf_counter() - inicio, tipo=f"ensamble_{esquema}")
+    return ajuste
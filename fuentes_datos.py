@@ -0,0 +1,193 @@
+# fuentes_datos.py
+"""
+Capa de acceso a las APIs de Banxico y FRED con tres modos, elegidos con FUENTE_DATOS
+(variable de entorno o llave de st.secrets):
+
+- "vivo" (por defecto): consulta las APIs.
+- "grabar": consulta las APIs y guarda cada respuesta en GRABACIONES_DIR.
+- "reproducir": responde con las grabaciones, sin red ni credenciales. Si URL_REPRODUCCION está
+  definida, las pide a un servidor local que sirve ese mismo directorio:
+
+      python fuentes_datos.py servir --puerto 8765 [--latencia-ms 50]
+"""
+
+import json
+import os
+import re
+import time
+
+import streamlit as st
+
+from metricas import incrementar, observar
+
+MODOS = ("vivo", "grabar", "reproducir")
+
+DIRECTORIO_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_locales", "grabaciones")
+
+# Credencial de relleno en modo reproducir: las grabaciones nunca guardan tokens
+CREDENCIAL_REPRODUCCION = "reproduccion"
+
+
+# --- 1. CONFIGURACIÓN ---
+def _configuracion(nombre, defecto=None):
+    if nombre in os.environ:
+        return os.environ[nombre]
+    try:
+        return st.secrets.get(nombre, defecto)
+    except Exception: # Sin archivo de secretos
+        return defecto
+
+
+def modo_fuente():
+    modo = _configuracion("FUENTE_DATOS", "vivo")
+    if modo not in MODOS:
+        raise ValueError(f"FUENTE_DATOS debe ser uno de {MODOS}, no '{modo}'.")
+    return modo
+
+
+def directorio_grabaciones():
+    return _configuracion("GRABACIONES_DIR", DIRECTORIO_DEFECTO)
+
+
+def credencial(nombre):
+    """
+    Token o llave de API desde st.secrets. En modo reproducir no hace falta y se usa un valor de relleno.
+    """
+    if modo_fuente() == "reproducir":
+        return _configuracion(nombre, CREDENCIAL_REPRODUCCION)
+    return st.secrets[nombre]
+
+
+# --- 2. GRABACIONES EN DISCO ---
+def _ruta_grabacion(directorio, fuente, id_serie, fecha_inicio):
+    nombre = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{id_serie}__{fecha_inicio}")
+    return os.path.join(directorio, fuente, f"{nombre}.json")
+
+
+def buscar_grabacion(directorio, fuente, id_serie, fecha_inicio):
+    """
+    Ruta de la grabación de la serie que empieza en `fecha_inicio`; si no existe, la que empieza más tarde
+    sin pasar de esa fecha (quien la usa recorta desde `fecha_inicio`). None si no hay ninguna.
+    """
+    exacta = _ruta_grabacion(directorio, fuente, id_serie, fecha_inicio)
+    if os.path.exists(exacta):
+        return exacta
+    prefijo = os.path.basename(_ruta_grabacion(directorio, fuente, id_serie, ""))[:-len(".json")]
+    carpeta = os.path.join(directorio, fuente)
+    candidatas = sorted(archivo[len(prefijo):-len(".json")] for archivo in (os.listdir(carpeta) if os.path.isdir(carpeta) else [])
+                        if archivo.startswith(prefijo) and archivo.endswith(".json"))
+    anteriores = [inicio for inicio in candidatas if inicio <= str(fecha_inicio)]
+    return os.path.join(carpeta, f"{prefijo}{anteriores[-1]}.json") if anteriores else None
+
+
+def _reproducir(fuente, id_serie, fecha_inicio):
+    url = _configuracion("URL_REPRODUCCION")
+    if url:
+        import requests
+
+        respuesta = requests.get(f"{url.rstrip('/')}/{fuente}/{id_serie}", params={"inicio": fecha_inicio}, timeout=15)
+        respuesta.raise_for_status()
+        return respuesta.json()
+    ruta = buscar_grabacion(directorio_grabaciones(), fuente, id_serie, fecha_inicio)
+    if ruta is None:
+        raise FileNotFoundError(f"No hay grabación de {fuente}/{id_serie} desde {fecha_inicio} en {directorio_grabaciones()}.")
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+# --- 3. PUNTO DE ENTRADA PARA LOS DESCARGADORES ---
+def obtener_json(fuente, id_serie, fecha_inicio, url, params=None, headers=None):
+    """
+    Respuesta JSON de la API según el modo activo. La grabación se identifica por fuente, serie y fecha de inicio
+    (no por la URL, que incluye la fecha de hoy y credenciales).
+    """
+    modo = modo_fuente()
+    inicio = time.perf_counter()
+    resultado = "error"
+    try:
+        datos = _descargar_json(modo, fuente, id_serie, fecha_inicio, url, params, headers)
+        resultado = "ok"
+        return datos
+    finally:
+        incrementar("proyecciones_api_llamadas_total", fuente=fuente, modo=modo, resultado=resultado)
+        observar("proyecciones_api_latencia_segundos", time.perf_counter() - inicio, fuente=fuente, modo=modo)
+
+
+def _descargar_json(modo, fuente, id_serie, fecha_inicio, url, params, headers):
+    if modo == "reproducir":
+        return _reproducir(fuente, id_serie, fecha_inicio)
+
+    import requests
+
+    respuesta = requests.get(url, params=params, headers=headers, timeout=15)
+    respuesta.raise_for_status()
+    datos = respuesta.json()
+    if modo == "grabar":
+        ruta = _ruta_grabacion(directorio_grabaciones(), fuente, id_serie, fecha_inicio)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo)
+    return datos
+
+
+def avisar(nivel, mensaje):
+    """
+    st.warning/st.error solo si hay una sesión que lo muestre. Los hilos de precarga y del programador
+    no tienen contexto de ejecución de Streamlit; ahí el aviso se omite y la función devuelve None como siempre.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        getattr(st, nivel)(mensaje)
+
+
+# --- 4. SERVIDOR LOCAL DE REPRODUCCIÓN ---
+def servir(directorio, puerto=8765, latencia_ms=0):
+    """
+    Servidor HTTP que responde GET /<fuente>/<id_serie>?inicio=AAAA-MM-DD con las grabaciones de `directorio`.
+    `latencia_ms` agrega un retraso fijo por respuesta para simular la red de forma reproducible.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            partes = urlparse(self.path)
+            ruta_partes = [p for p in partes.path.split("/") if p]
+            inicio = parse_qs(partes.query).get("inicio", [""])[0]
+            ruta = buscar_grabacion(directorio, *ruta_partes, inicio) if len(ruta_partes) == 2 else None
+            if latencia_ms:
+                time.sleep(latencia_ms / 1000)
+            if ruta is None:
+                self.send_error(404, "Grabación no encontrada")
+                return
+            with open(ruta, "rb") as archivo:
+                cuerpo = archivo.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+    print(f"Sirviendo {directorio} en http://127.0.0.1:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    parser_servir = subcomandos.add_parser("servir", help="Sirve las grabaciones por HTTP")
+    parser_servir.add_argument("--directorio", default=None)
+    parser_servir.add_argument("--puerto", type=int, default=8765)
+    parser_servir.add_argument("--latencia-ms", type=int, default=0)
+    args = parser.parse_args()
+    servir(args.directorio or directorio_grabaciones(), args.puerto, args.latencia_ms)
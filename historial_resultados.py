@@ -0,0 +1,119 @@
+# historial_resultados.py
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from base_sqlite import conexion_sqlite
+from sesion_resultados import hash_parametros
+
+# Base local del historial; se puede cambiar con la variable de entorno HISTORIAL_DB
+RUTA_HISTORIAL = os.environ.get("HISTORIAL_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_locales", "historial.sqlite"))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY,
+    pais TEXT NOT NULL,
+    vintage TEXT NOT NULL,
+    hash_parametros TEXT NOT NULL,
+    fecha_corrida TEXT NOT NULL,
+    modelo_usado TEXT NOT NULL,
+    relaciones_coint INTEGER NOT NULL,
+    anos_proyectados INTEGER NOT NULL,
+    parametros TEXT NOT NULL,
+    promedios TEXT NOT NULL,
+    UNIQUE (pais, vintage, hash_parametros)
+);
+CREATE INDEX IF NOT EXISTS idx_corridas_pais_fecha ON corridas (pais, fecha_corrida);
+CREATE TABLE IF NOT EXISTS escenarios (
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    fecha TEXT NOT NULL,
+    base REAL,
+    positivo REAL,
+    negativo REAL,
+    PRIMARY KEY (corrida_id, fecha)
+) WITHOUT ROWID;
+"""
+
+
+# pandas envuelve los errores de ejecución de sqlite3 en su propio DatabaseError
+ERRORES_LECTURA = (sqlite3.Error, pd.errors.DatabaseError)
+
+
+# --- CONEXIÓN ---
+def _conexion(ruta=None):
+    return conexion_sqlite(ruta or RUTA_HISTORIAL, ESQUEMA)
+
+
+# --- ESCRITURA ---
+def guardar_corrida(pais, parametros, resultados, ruta=None):
+    """
+    Guarda una proyección con sus escenarios, modelo, rango de cointegración y parámetros.
+    La corrida queda identificada por país, vintage de datos (última fecha histórica) y huella de parámetros;
+    repetir la misma combinación reemplaza la corrida anterior.
+    """
+    vintage = resultados["df_historico"].index[-1].strftime("%Y-%m-%d")
+    fila = (pais, vintage, hash_parametros(parametros), datetime.now().isoformat(timespec="seconds"),
+            resultados["modelo_usado"], int(resultados["relaciones_coint"]), int(resultados["anos_proyectados"]),
+            json.dumps(parametros, sort_keys=True, default=str),
+            json.dumps({k: float(v) for k, v in resultados["promedios"].items()}))
+    escenarios = zip(resultados["escenario_base"].index.strftime("%Y-%m-%d"),
+                     resultados["escenario_base"].to_numpy(dtype=float).tolist(),
+                     resultados["escenario_positivo"].to_numpy(dtype=float).tolist(),
+                     resultados["escenario_negativo"].to_numpy(dtype=float).tolist())
+    try:
+        with _conexion(ruta) as conexion:
+            conexion.execute("DELETE FROM corridas WHERE pais = ? AND vintage = ? AND hash_parametros = ?", fila[:3])
+            corrida_id = conexion.execute(
+                "INSERT INTO corridas (pais, vintage, hash_parametros, fecha_corrida, modelo_usado, relaciones_coint, "
+                "anos_proyectados, parametros, promedios) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", fila).lastrowid
+            conexion.executemany("INSERT INTO escenarios VALUES (?, ?, ?, ?, ?)",
+                                 ((corrida_id, *valores) for valores in escenarios))
+        return corrida_id
+    except sqlite3.Error as e:
+        st.warning(f"No se pudo guardar la proyección en el historial: {e}")
+        return None
+
+
+# --- CONSULTAS ---
+def buscar_corridas(pais, vintage=None, hash_param=None, limite=50, ruta=None):
+    """
+    Corridas guardadas de un país (más recientes primero), filtrables por vintage y huella de parámetros.
+    """
+    condiciones, valores = ["pais = ?"], [pais]
+    if vintage is not None:
+        condiciones.append("vintage = ?")
+        valores.append(vintage)
+    if hash_param is not None:
+        condiciones.append("hash_parametros = ?")
+        valores.append(hash_param)
+    consulta = (f"SELECT id, vintage, hash_parametros, fecha_corrida, modelo_usado, relaciones_coint, anos_proyectados, promedios "
+                f"FROM corridas WHERE {' AND '.join(condiciones)} ORDER BY fecha_corrida DESC LIMIT ?")
+    try:
+        with _conexion(ruta) as conexion:
+            corridas = pd.read_sql_query(consulta, conexion, params=[*valores, limite])
+    except ERRORES_LECTURA as e: # El historial es opcional: una base bloqueada o dañada no debe romper los resultados
+        st.warning(f"No se pudo leer el historial de proyecciones: {e}")
+        return pd.DataFrame(columns=["id", "vintage", "hash_parametros", "fecha_corrida", "modelo_usado",
+                                     "relaciones_coint", "anos_proyectados", "promedio_base"])
+    corridas["promedio_base"] = [json.loads(p)["Base"] for p in corridas.pop("promedios")]
+    return corridas
+
+
+def cargar_escenarios(corrida_id, ruta=None):
+    """
+    Escenarios Base/Positivo/Negativo de una corrida, indexados por fecha.
+    """
+    try:
+        with _conexion(ruta) as conexion:
+            escenarios = pd.read_sql_query("SELECT fecha, base, positivo, negativo FROM escenarios WHERE corrida_id = ? ORDER BY fecha",
+                                           conexion, params=[corrida_id], parse_dates=["fecha"], index_col="fecha")
+    except ERRORES_LECTURA as e:
+        st.warning(f"No se pudieron leer los escenarios de la corrida {corrida_id}: {e}")
+        return pd.DataFrame(columns=["Base", "Positivo", "Negativo"], index=pd.DatetimeIndex([], name="fecha"))
+    escenarios.columns = ["Base", "Positivo", "Negativo"]
+    return escenarios
@@ -0,0 +1,137 @@
+# impulso_respuesta.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import streamlit as st
+
+from pronostico_analitico import coeficientes_ma
+
+# Tamaño de bloque de réplicas por proceso: suficientemente grande para vectorizar, pequeño para repartir la carga
+REPLICAS_POR_BLOQUE = 250
+
+
+# --- 1. PARÁMETROS DEL VAR EN FORMA COMPACTA ---
+def parametros_var(coefs, sigma_u, endog, residuos, columnas, exog=None):
+    """
+    Arreglos mínimos del VAR (o de la representación VAR de un VECM) que necesitan el análisis
+    impulso-respuesta y el bootstrap. El intercepto y los coeficientes de las exógenas (`exog`, alineadas
+    con `endog`) se deducen de los datos por MCO sobre la parte no explicada por los rezagos, para que sirva en ambos casos.
+    """
+    coefs, endog, residuos = np.asarray(coefs), np.asarray(endog, dtype=float), np.asarray(residuos, dtype=float)
+    exog = None if exog is None else np.asarray(exog, dtype=float)
+    p, n = coefs.shape[0], len(residuos)
+    rezagos = np.concatenate([endog[p - j - 1:len(endog) - j - 1] for j in range(p)], axis=1)
+    ajustado = rezagos @ np.concatenate(coefs, axis=1).T
+    determinista = (endog[p:] - ajustado)[-n:] - residuos
+    regresores = np.ones((n, 1)) if exog is None else np.column_stack([np.ones(n), exog[p:][-n:]])
+    B = np.linalg.lstsq(regresores, determinista, rcond=None)[0]
+    return {
+        "coefs": coefs,
+        "intercepto": B[0],
+        "coefs_exog": B[1:],
+        "sigma_u": np.asarray(sigma_u),
+        "endog": endog,
+        "exog": exog,
+        "residuos": residuos,
+        "columnas": list(columnas),
+    }
+
+
+# --- 2. IMPULSO-RESPUESTA Y DESCOMPOSICIÓN DE VARIANZA ---
+def irf_ortogonal(coefs, sigma_u, periodos):
+    """
+    Respuestas a choques ortogonalizados (Cholesky): Θ_h = Φ_h P, con forma (..., periodos + 1, K, K).
+    Θ_h[i, j] es la respuesta de la variable i en h a un choque de una desviación estándar en j.
+    """
+    return coeficientes_ma(coefs, periodos + 1) @ np.linalg.cholesky(sigma_u)[..., None, :, :]
+
+
+def descomposicion_varianza(irf):
+    """
+    FEVD: fracción del error de pronóstico de i en h explicada por choques en j.
+    """
+    acumulado = np.cumsum(irf ** 2, axis=-3)
+    return acumulado / acumulado.sum(axis=-1, keepdims=True)
+
+
+# --- 3. BOOTSTRAP DE RESIDUOS (VECTORIZADO POR BLOQUE DE RÉPLICAS) ---
+def _ajustar_var_lote(y, p, exog=None):
+    """
+    MCO con constante (y exógenas `exog` de forma (T, m), comunes a todo el lote) de un VAR(p)
+    para un lote de series y de forma (R, T, K). Devuelve coefs (R, p, K, K) y sigma_u (R, K, K).
+    """
+    R, T, K = y.shape
+    bloques = [np.ones((R, T - p, 1))] + [y[:, p - j - 1:T - j - 1] for j in range(p)]
+    if exog is not None:
+        bloques.append(np.broadcast_to(exog[p:], (R, T - p, exog.shape[1])))
+    X = np.concatenate(bloques, axis=2)
+    Y = y[:, p:]
+    B = np.linalg.solve(X.transpose(0, 2, 1) @ X, X.transpose(0, 2, 1) @ Y)
+    residuos = Y - X @ B
+    sigma_u = residuos.transpose(0, 2, 1) @ residuos / (T - p - X.shape[2])
+    coefs = B[:, 1:K * p + 1].reshape(R, p, K, K).transpose(0, 1, 3, 2)
+    return coefs, sigma_u
+
+
+def _bloque_bootstrap(parametros, periodos, replicas, semilla):
+    """
+    Simula `replicas` series con residuos remuestreados, reestima el VAR y devuelve sus IRF.
+    Las exógenas se mantienen fijas en sus valores observados, en la simulación y en la reestimación.
+    Se ejecuta dentro de un proceso trabajador.
+    """
+    rng = np.random.default_rng(semilla)
+    coefs, intercepto, endog = parametros["coefs"], parametros["intercepto"], parametros["endog"]
+    exog = parametros.get("exog")
+    residuos = parametros["residuos"] - parametros["residuos"].mean(axis=0)
+    p, K, _ = coefs.shape
+    T = len(endog)
+    coefs_apilados = np.concatenate(coefs, axis=1).T # (K*p, K)
+    determinista = np.broadcast_to(intercepto, (T, K)) if exog is None else intercepto + exog @ parametros["coefs_exog"]
+
+    y = np.empty((replicas, T, K))
+    y[:, :p] = endog[:p]
+    choques = residuos[rng.integers(0, len(residuos), size=(replicas, T - p))]
+    for t in range(p, T):
+        rezagos = y[:, t - p:t][:, ::-1].reshape(replicas, K * p)
+        y[:, t] = determinista[t] + rezagos @ coefs_apilados + choques[:, t - p]
+
+    coefs_b, sigma_b = _ajustar_var_lote(y, p, exog)
+    return irf_ortogonal(coefs_b, sigma_b, periodos)
+
+
+@st.cache_data(show_spinner=False)
+def calcular_impulso_respuesta(parametros, periodos=24, n_replicas=0, nivel=0.95, semilla=12345, n_procesos=None):
+    """
+    IRF ortogonalizadas y FEVD del ajuste. Con `n_replicas` > 0 agrega bandas bootstrap de percentiles,
+    repartiendo las réplicas en procesos con semillas independientes (SeedSequence.spawn).
+    Para un VECM se usa su representación VAR en niveles y las réplicas se reestiman como VAR en niveles.
+    El resultado se guarda en caché por ajuste y configuración.
+    """
+    irf = irf_ortogonal(parametros["coefs"], parametros["sigma_u"], periodos)
+    resultado = {
+        "irf": irf,
+        "fevd": descomposicion_varianza(irf),
+        "columnas": parametros["columnas"],
+        "inferior": None,
+        "superior": None,
+    }
+    if n_replicas <= 0:
+        return resultado
+
+    n_bloques = -(-n_replicas // REPLICAS_POR_BLOQUE)
+    tamanos = [REPLICAS_POR_BLOQUE] * (n_bloques - 1) + [n_replicas - REPLICAS_POR_BLOQUE * (n_bloques - 1)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    n_procesos = n_procesos or min(os.cpu_count() or 1, n_bloques)
+
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+            bloques = list(ejecutor.map(_bloque_bootstrap, [parametros] * n_bloques, [periodos] * n_bloques, tamanos, semillas))
+    else:
+        bloques = [_bloque_bootstrap(parametros, periodos, r, s) for r, s in zip(tamanos, semillas)]
+
+    replicas = np.concatenate(bloques, axis=0)
+    cola = (1 - nivel) / 2 * 100
+    resultado["inferior"], resultado["superior"] = np.percentile(replicas, [cola, 100 - cola], axis=0)
+    return resultado
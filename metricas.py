@@ -0,0 +1,248 @@
+# metricas.py
+"""
+Telemetría del dashboard en formato de texto de Prometheus: contadores, histogramas y medidores
+en memoria del proceso (compartidos por todas las sesiones de Streamlit).
+
+Se exponen de tres formas:
+- METRICAS_PUERTO: servidor HTTP local con GET /metrics (para que Prometheus lo consulte).
+- METRICAS_ARCHIVO: archivo que se reescribe cada METRICAS_INTERVALO segundos (textfile collector).
+- La página "Administración" del dashboard.
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Nombre -> (tipo, ayuda). Solo se pueden registrar métricas declaradas aquí.
+METRICAS = {
+    "proyecciones_api_llamadas_total": ("counter", "Llamadas a las APIs de Banxico y FRED (o a sus grabaciones) por fuente, modo y resultado."),
+    "proyecciones_api_latencia_segundos": ("histogram", "Latencia de las llamadas a las APIs de datos."),
+    "proyecciones_etapa_segundos": ("histogram", "Duración de cada etapa de la proyección (carga, ajuste, escenarios) por país."),
+    "proyecciones_ajuste_segundos": ("histogram", "Duración del ajuste y pronóstico al horizonte máximo por tipo de modelo (solo cuando no está en caché)."),
+    "proyecciones_generadas_total": ("counter", "Proyecciones solicitadas por país y resultado."),
+    "proyecciones_cache_consultas_total": ("counter", "Llamadas a funciones con st.cache_data/st.cache_resource."),
+    "proyecciones_cache_fallos_total": ("counter", "Llamadas que no estaban en caché y ejecutaron la función."),
+    "proyecciones_actualizaciones_total": ("counter", "Actualizaciones en segundo plano del programador por país y resultado."),
+    "proyecciones_cache_bytes": ("gauge", "Memoria de los resultados en caché por tipo de caché y función (Streamlit solo mide st.cache_data; st.cache_resource reporta 1 por entrada)."),
+    "proyecciones_memoria_maxima_bytes": ("gauge", "Memoria residente máxima del proceso."),
+}
+
+# Límites de los histogramas de duración (segundos)
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_candado = threading.Lock()
+_contadores = {}
+_histogramas = {}
+
+
+def _llave(nombre, etiquetas):
+    if nombre not in METRICAS:
+        raise KeyError(f"Métrica no declarada en METRICAS: '{nombre}'.")
+    return nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items()))
+
+
+# --- 1. REGISTRO ---
+def incrementar(nombre, valor=1, **etiquetas):
+    llave = _llave(nombre, etiquetas)
+    with _candado:
+        _contadores[llave] = _contadores.get(llave, 0) + valor
+
+
+def observar(nombre, valor, **etiquetas):
+    """
+    Agrega una observación al histograma (conteos por límite, suma y total).
+    """
+    llave = _llave(nombre, etiquetas)
+    with _candado:
+        histograma = _histogramas.setdefault(llave, {"conteos": [0] * len(LIMITES_SEGUNDOS), "suma": 0.0, "total": 0})
+        for i, limite in enumerate(LIMITES_SEGUNDOS):
+            if valor <= limite:
+                histograma["conteos"][i] += 1
+                break
+        histograma["suma"] += valor
+        histograma["total"] += 1
+
+
+@contextmanager
+def medir(nombre, **etiquetas):
+    """
+    Observa en el histograma `nombre` la duración del bloque, aunque termine con una excepción.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+
+def cache_instrumentada(decorador_cache, nombre=None):
+    """
+    Aplica `decorador_cache` (st.cache_data, st.cache_resource o uno ya configurado) y cuenta consultas y fallos:
+    el cuerpo de la función solo corre cuando no hay resultado en caché. Conserva `.clear()`.
+    """
+    def decorar(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def sin_cache(*args, **kwargs):
+            incrementar("proyecciones_cache_fallos_total", funcion=etiqueta)
+            return funcion(*args, **kwargs)
+
+        cacheada = decorador_cache(sin_cache)
+
+        @functools.wraps(funcion)
+        def con_conteo(*args, **kwargs):
+            incrementar("proyecciones_cache_consultas_total", funcion=etiqueta)
+            return cacheada(*args, **kwargs)
+
+        con_conteo.clear = cacheada.clear
+        return con_conteo
+    return decorar
+
+
+# --- 2. MEDIDORES QUE SE LEEN AL EXPORTAR ---
+def memoria_caches():
+    """
+    Bytes por (tipo de caché, función) según las estadísticas de caché de Streamlit.
+    """
+    from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+
+    memoria = {}
+    for proveedor in (get_data_cache_stats_provider(), get_resource_cache_stats_provider()):
+        estadisticas = proveedor.get_stats()
+        # Según la versión de Streamlit, get_stats devuelve una lista o un diccionario por familia
+        for stat in (s for grupo in estadisticas.values() for s in grupo) if isinstance(estadisticas, dict) else estadisticas:
+            llave = (stat.category_name, stat.cache_name.rsplit(".", 1)[-1])
+            memoria[llave] = memoria.get(llave, 0) + stat.byte_length
+    return memoria
+
+
+def memoria_maxima_proceso():
+    try:
+        import resource
+    except ImportError: # No existe en Windows
+        return None
+    import sys
+
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == "darwin" else maximo * 1024 # Linux lo reporta en KiB
+
+
+# --- 3. FORMATO DE TEXTO DE PROMETHEUS ---
+def _formato_etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    escapar = lambda v: v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in etiquetas) + "}"
+
+
+def _numero(valor):
+    return "+Inf" if valor == float("inf") else repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def instantanea():
+    """
+    Copia consistente de contadores e histogramas, más los medidores leídos en este momento.
+    """
+    with _candado:
+        contadores = dict(_contadores)
+        histogramas = {llave: {"conteos": list(h["conteos"]), "suma": h["suma"], "total": h["total"]} for llave, h in _histogramas.items()}
+    medidores = {_llave("proyecciones_cache_bytes", {"tipo": tipo, "funcion": funcion}): bytes_
+                 for (tipo, funcion), bytes_ in memoria_caches().items()}
+    maxima = memoria_maxima_proceso()
+    if maxima is not None:
+        medidores[_llave("proyecciones_memoria_maxima_bytes", {})] = maxima
+    return contadores, histogramas, medidores
+
+
+def texto_prometheus():
+    contadores, histogramas, medidores = instantanea()
+    lineas = []
+    for nombre, (tipo, ayuda) in METRICAS.items():
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        if tipo == "histogram":
+            for (n, etiquetas), h in sorted(histogramas.items()):
+                if n != nombre:
+                    continue
+                acumulado = 0
+                for limite, conteo in zip((*LIMITES_SEGUNDOS, float("inf")), (*h["conteos"], h["total"] - sum(h["conteos"]))):
+                    acumulado += conteo
+                    lineas.append(f"{nombre}_bucket{_formato_etiquetas((*etiquetas, ('le', _numero(limite))))} {acumulado}")
+                lineas.append(f"{nombre}_sum{_formato_etiquetas(etiquetas)} {_numero(h['suma'])}")
+                lineas.append(f"{nombre}_count{_formato_etiquetas(etiquetas)} {h['total']}")
+        else:
+            valores = contadores if tipo == "counter" else medidores
+            lineas += [f"{nombre}{_formato_etiquetas(etiquetas)} {_numero(valor)}" for (n, etiquetas), valor in sorted(valores.items()) if n == nombre]
+    return "\n".join(lineas) + "\n"
+
+
+# --- 4. EXPORTADORES ---
+def escribir_archivo(ruta):
+    """
+    Reescribe el archivo de forma atómica, para que un lector nunca vea un archivo a medias.
+    """
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(carpeta, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        archivo.write(texto_prometheus())
+    os.replace(temporal, ruta)
+
+
+def servir_metricas(puerto):
+    """
+    Servidor HTTP local que responde GET /metrics con el texto de Prometheus.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404, "Use /metrics")
+                return
+            cuerpo = texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+
+
+def _escribir_periodicamente(ruta, intervalo):
+    while True:
+        try:
+            escribir_archivo(ruta)
+        except OSError:
+            pass
+        time.sleep(intervalo)
+
+
+@st.cache_resource
+def iniciar_exportador():
+    """
+    Arranca una vez por proceso los exportadores configurados con METRICAS_PUERTO y METRICAS_ARCHIVO.
+    """
+    configuracion = {
+        "puerto": int(os.environ["METRICAS_PUERTO"]) if os.environ.get("METRICAS_PUERTO") else None,
+        "archivo": os.environ.get("METRICAS_ARCHIVO") or None,
+        "intervalo": float(os.environ.get("METRICAS_INTERVALO", 15)),
+    }
+    if configuracion["puerto"]:
+        threading.Thread(target=servir_metricas, args=(configuracion["puerto"],), name="metricas_http", daemon=True).start()
+    if configuracion["archivo"]:
+        threading.Thread(target=_escribir_periodicamente, args=(configuracion["archivo"], configuracion["intervalo"]),
+                         name="metricas_archivo", daemon=True).start()
+    return configuracion
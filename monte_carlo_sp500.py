@@ -0,0 +1,139 @@
+# monte_carlo_sp500.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Trayectorias por bloque: acota la memoria (bloque x meses x 8 bytes, ~29 MB a 30 años) y es la unidad de trabajo por proceso
+TRAYECTORIAS_POR_BLOQUE = 10_000
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Percentiles que definen los escenarios, con la misma convención que las proyecciones de inflación
+PERCENTIL_ESCENARIO = {"Base": 50, "Positivo": 75, "Negativo": 25}
+
+
+# --- 1. CARGA DE DATOS ---
+@st.cache_data
+def cargar_datos_sp500(api_key, id_serie, start_date):
+    """
+    Nivel mensual del índice (último dato del mes) y sus rendimientos logarítmicos mensuales.
+    """
+    from VAR_VECM_USA_MODULO_CACHE import obtener_serie_fred
+
+    serie = obtener_serie_fred(id_serie, api_key, start_date)
+    if serie is None:
+        return None
+    nivel = serie.dropna().resample('MS').last().dropna()
+    df = pd.DataFrame({"sp500": nivel, "rendimiento_log": np.log(nivel).diff()})
+    return df.dropna()
+
+
+# --- 2. SIMULACIÓN POR BLOQUES ---
+def _bloque_simulacion(metodo, n_trayectorias, meses, mu, sigma, historicos, semilla):
+    """
+    Simula un bloque de trayectorias de rendimientos log mensuales y devuelve el rendimiento log acumulado
+    al cierre de cada año, forma (n_trayectorias, meses // 12). Se ejecuta dentro de un proceso trabajador.
+    """
+    rng = np.random.default_rng(semilla)
+    if metodo == "gbm":
+        rendimientos = rng.standard_normal((n_trayectorias, meses))
+        rendimientos *= sigma
+        rendimientos += mu - 0.5 * sigma ** 2
+    else:
+        rendimientos = historicos[rng.integers(0, len(historicos), size=(n_trayectorias, meses))]
+    np.cumsum(rendimientos, axis=1, out=rendimientos)
+    return rendimientos[:, 11::12].copy()
+
+
+def simular_rendimientos_acumulados(rendimientos_log, anos, n_trayectorias, metodo="gbm", semilla=2024, n_procesos=None):
+    """
+    Rendimiento log acumulado al cierre de cada año para `n_trayectorias`, forma (n_trayectorias, anos).
+    - "gbm": movimiento browniano geométrico con media y volatilidad mensual históricas.
+    - "bootstrap": remuestreo con reemplazo de los rendimientos mensuales históricos.
+    Cada bloque usa su propia semilla derivada con SeedSequence.spawn, por lo que el resultado es el mismo
+    sin importar cuántos procesos se usen.
+    """
+    if metodo not in ("gbm", "bootstrap"):
+        raise ValueError("El método debe ser 'gbm' o 'bootstrap'.")
+    historicos = np.asarray(rendimientos_log, dtype=float)
+    # sigma² / 2 compensa la corrección de Itô: el crecimiento esperado del nivel coincide con el histórico
+    mu, sigma = historicos.mean() + 0.5 * historicos.var(ddof=1), historicos.std(ddof=1)
+
+    n_bloques = -(-n_trayectorias // TRAYECTORIAS_POR_BLOQUE)
+    tamanos = [TRAYECTORIAS_POR_BLOQUE] * (n_bloques - 1) + [n_trayectorias - TRAYECTORIAS_POR_BLOQUE * (n_bloques - 1)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    argumentos = [(metodo, tamano, anos * 12, mu, sigma, historicos, s) for tamano, s in zip(tamanos, semillas)]
+
+    n_procesos = n_procesos or min(os.cpu_count() or 1, n_bloques)
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+            bloques = list(ejecutor.map(_bloque_simulacion, *zip(*argumentos)))
+    else:
+        bloques = [_bloque_simulacion(*a) for a in argumentos]
+    return np.concatenate(bloques, axis=0)
+
+
+# --- 3. FUNCIÓN PRINCIPAL ---
+@st.cache_data
+def generar_proyeccion_sp500(api_key, id_serie, start_date, anos_proyeccion, n_trayectorias, metodo, semilla=2024):
+    """
+    Proyección de rendimientos del S&P 500 por Monte Carlo con resúmenes por percentiles.
+    Los escenarios son el rendimiento anual compuesto (%) acumulado hasta cada año en los percentiles 50/75/25.
+    """
+    # --- 1. Carga de Datos ---
+    df = cargar_datos_sp500(api_key, id_serie, start_date)
+    if df is None or len(df) < 24:
+        return None
+
+    # --- 2. Simulación ---
+    acumulados = simular_rendimientos_acumulados(df["rendimiento_log"].to_numpy(), anos_proyeccion, n_trayectorias, metodo, semilla)
+
+    # --- 3. Resúmenes por percentiles ---
+    fechas = pd.date_range(start=df.index[-1] + pd.DateOffset(years=1), periods=anos_proyeccion, freq="YS")
+    anos = np.arange(1, anos_proyeccion + 1)
+    percentiles_log = np.percentile(acumulados, PERCENTILES, axis=0).T # (anos, percentiles)
+    columnas = [f"P{p}" for p in PERCENTILES]
+    percentiles_nivel = pd.DataFrame(df["sp500"].iloc[-1] * np.exp(percentiles_log), index=fechas, columns=columnas)
+    percentiles_rendimiento = pd.DataFrame((np.exp(percentiles_log / anos[:, None]) - 1) * 100, index=fechas, columns=columnas)
+
+    # --- 4. Escenarios ---
+    escenarios = {nombre: percentiles_rendimiento[f"P{p}"].rename(nombre) for nombre, p in PERCENTIL_ESCENARIO.items()}
+    escenario_base, escenario_positivo, escenario_negativo = escenarios["Base"], escenarios["Positivo"], escenarios["Negativo"]
+
+    promedios = { "Base": escenario_base.mean(),
+                 "Positivo": escenario_positivo.mean(),
+                 "Negativo": escenario_negativo.mean()
+                }
+
+    df_resumen_escenarios = pd.DataFrame({
+        'Promedio (%)': [promedios['Base'], promedios['Positivo'], promedios['Negativo']],
+        'Volatilidad (Desv. Est.)': [escenario_base.std(), escenario_positivo.std(), escenario_negativo.std()],
+        'Máximo (%)': [escenario_base.max(), escenario_positivo.max(), escenario_negativo.max()],
+        'Mínimo (%)': [escenario_base.min(), escenario_positivo.min(), escenario_negativo.min()]
+    }, index=['Base', 'Positivo', 'Negativo'])
+
+    df_resumen_escenarios = df_resumen_escenarios.round(3)
+
+    historicos = df["rendimiento_log"]
+    resultados_sp500 = {
+    "df_historico": df,
+    "escenario_base": escenario_base,
+    "escenario_positivo": escenario_positivo,
+    "escenario_negativo": escenario_negativo,
+    "promedios": promedios,
+    "tabla_escenarios": df_resumen_escenarios,
+    "percentiles_nivel": percentiles_nivel,
+    "percentiles_rendimiento": percentiles_rendimiento,
+    "probabilidad_perdida": pd.Series((acumulados < 0).mean(axis=0) * 100, index=fechas),
+    "metodo": metodo,
+    "n_trayectorias": n_trayectorias,
+    "anos_proyectados": anos_proyeccion,
+    "rendimiento_anual_historico": (np.exp(historicos.mean() * 12) - 1) * 100,
+    "volatilidad_anual_historica": historicos.std() * np.sqrt(12) * 100,
+    }
+
+    return resultados_sp500
@@ -0,0 +1,253 @@
+# motor_var_vecm.py
+
+import time
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from diagnosticos_residuos import diagnosticar_residuos
+from impulso_respuesta import parametros_var
+from metricas import cache_instrumentada, observar
+from pronostico_analitico import NIVELES_BANDAS, calcular_componentes, intervalo
+
+# Máximo de "Años a Proyectar" que acepta el dashboard. El pronóstico se calcula una sola vez
+# a este horizonte y cualquier horizonte menor se sirve como un recorte de esas trayectorias.
+HORIZONTE_MAXIMO_ANOS = 50
+
+# Límite de ajustes en caché. Cada entrada guarda el modelo de statsmodels, trayectorias y MA/MSE a 600 pasos
+# y diagnósticos, y la llave es el DataFrame completo: cada vintage, fecha de inicio o exógena nueva agrega una.
+# Se conserva con st.cache_resource (sin copiar ni serializar en cada acierto) porque nadie modifica el ajuste.
+MAX_AJUSTES_CACHE = 16
+TTL_AJUSTES_SEGUNDOS = 24 * 60 * 60
+
+
+# --- 1. SELECCIÓN DE MODELO ---
+def seleccionar_modelo(df, variables_a_probar=('tasa_interes', 'tipo_cambio'), estimador="mco"):
+    """
+    Decide entre VAR en diferencias y VECM con las pruebas ADF y de Johansen.
+    Con los estimadores de contracción no se usa VECM: el VAR ridge va en diferencias y el bayesiano
+    (Minnesota) en niveles, con media a priori 1 en el primer rezago propio de las series no estacionarias.
+    """
+    from statsmodels.tsa.stattools import adfuller
+    from statsmodels.tsa.vector_ar.vecm import coint_johansen
+
+    series_no_estacionarias = [col for col in variables_a_probar if adfuller(df[col].dropna())[1] >= 0.05]
+    num_relaciones_coint = 0
+    usar_vecm = False
+    if estimador == "mco" and len(series_no_estacionarias) >= 2:
+        johansen = coint_johansen(df[series_no_estacionarias], 0, 1)
+        num_relaciones_coint = int(sum(johansen.lr1 > johansen.cvt[:, 1]))
+        usar_vecm = num_relaciones_coint > 0
+
+    if estimador == "minnesota":
+        return {
+            "usar_vecm": False,
+            "reconstruir_niveles": False,
+            "series_no_estacionarias": series_no_estacionarias,
+            "num_relaciones_coint": 0,
+            "df_modelo": df.copy(),
+        }
+
+    df_modelo = df.copy()
+    if not usar_vecm:
+        for col in series_no_estacionarias: df_modelo[col] = df_modelo[col].diff()
+        df_modelo.dropna(inplace=True)
+
+    return {
+        "usar_vecm": usar_vecm,
+        "reconstruir_niveles": not usar_vecm,
+        "series_no_estacionarias": series_no_estacionarias,
+        "num_relaciones_coint": num_relaciones_coint,
+        "df_modelo": df_modelo,
+    }
+
+
+# --- 2. AJUSTE Y PRONÓSTICO AL HORIZONTE MÁXIMO (UNA VEZ POR MODELO) ---
+@cache_instrumentada(st.cache_resource(show_spinner=False, max_entries=MAX_AJUSTES_CACHE, ttl=TTL_AJUSTES_SEGUNDOS))
+def ajustar_modelo(df, exogenas=None, variables_a_probar=('tasa_interes', 'tipo_cambio'), estimador="mco"):
+    """
+    Selecciona, ajusta y pronostica a HORIZONTE_MAXIMO_ANOS. Se ejecuta una sola vez por conjunto de datos;
+    el horizonte pedido por el usuario no forma parte de la llave de caché.
+    `exogenas` (opcional) son regresores con el mismo índice que `df`; en el pronóstico se mantienen en su último valor.
+    `variables_a_probar` son las columnas que pasan por las pruebas de raíz unitaria y cointegración.
+    `estimador` es "mco" (VAR/VECM de statsmodels) o uno con contracción de var_bayesiano ("minnesota", "ridge"),
+    pensados para sistemas de 10 a 20 series donde el VAR sin restricciones con 12 rezagos se sobreajusta.
+    Las varianzas del error de pronóstico salen de los coeficientes MA(∞) calculados aquí una sola vez,
+    de modo que los intervalos de cualquier nivel de confianza no requieren volver a estimarlas.
+    Los diagnósticos de residuos de todas las ecuaciones también se calculan aquí y quedan en caché con el ajuste.
+    """
+    from statsmodels.tsa.api import VAR, VECM
+
+    inicio = time.perf_counter()
+    seleccion = seleccionar_modelo(df, variables_a_probar, estimador)
+    df_modelo = seleccion["df_modelo"]
+
+    n_max = HORIZONTE_MAXIMO_ANOS * 12
+    exog = None if exogenas is None else exogenas.loc[df_modelo.index]
+    exog_futuro = None if exog is None else np.repeat(exog.to_numpy()[-1:], n_max, axis=0)
+    if estimador != "mco":
+        from var_bayesiano import ESTIMADORES, ajustar_var_contraccion, pronosticar, resumen_contraccion
+
+        media_propia = [float(col in seleccion["series_no_estacionarias"]) for col in df_modelo.columns]
+        resultados_modelo = ajustar_var_contraccion(df_modelo, estimador, exog=exog, media_propia=media_propia)
+        punto_proy = pronosticar(resultados_modelo, df_modelo.values, n_max, exog_futuro)
+        coefs, sigma_u, resid = resultados_modelo["coefs"], resultados_modelo["sigma_u"], resultados_modelo["resid"]
+        modelo_usado = ESTIMADORES[estimador]
+        resumen_texto = resumen_contraccion(resultados_modelo)
+    elif seleccion["usar_vecm"]:
+        p = VAR(df_modelo, exog=exog).select_order(maxlags=12).aic
+        resultados_modelo = VECM(df_modelo, exog=exog, k_ar_diff=p-1, coint_rank=seleccion["num_relaciones_coint"], deterministic='ci').fit()
+        punto_proy = resultados_modelo.predict(steps=n_max, exog_fc=exog_futuro)
+        coefs = resultados_modelo.var_rep # Representación VAR en niveles del VECM
+    else:
+        resultados_modelo = VAR(df_modelo, exog=exog).fit(maxlags=12, ic='aic')
+        y_input = df_modelo.values[-resultados_modelo.k_ar:]
+        punto_proy = resultados_modelo.forecast(y=y_input, steps=n_max, exog_future=exog_futuro)
+        coefs = resultados_modelo.coefs
+    if estimador == "mco":
+        sigma_u, resid = resultados_modelo.sigma_u, resultados_modelo.resid
+        modelo_usado = "VECM" if seleccion["usar_vecm"] else "VAR"
+        resumen_texto = str(resultados_modelo.summary())
+
+    componentes = calcular_componentes(coefs, sigma_u, n_max)
+
+    # Residuos de la variable objetivo (primera columna) de forma robusta
+    if isinstance(resid, pd.DataFrame):
+        residuos = resid.iloc[:, 0].to_numpy()
+    else:
+        residuos = np.asarray(resid)[:, 0]
+
+    ajuste = {
+        **seleccion,
+        "resultados_modelo": resultados_modelo,
+        "estimador": estimador,
+        "modelo_usado": modelo_usado,
+        "ensamble": None,
+        "columnas": list(df.columns),
+        "exogenas": [] if exogenas is None else list(exogenas.columns),
+        "fechas_futuras": pd.date_range(start=df.index[-1] + pd.DateOffset(months=1), periods=n_max, freq="MS"),
+        "ultimos_niveles": df.iloc[-1].to_numpy(),
+        "punto_modelo": punto_proy,
+        **componentes,
+        "trayectorias": _trayectorias(seleccion, df.columns, df.iloc[-1].to_numpy(), punto_proy, componentes["desv_est"]),
+        "residuos": residuos,
+        "resumen_texto": resumen_texto,
+        "parametros_var": parametros_var(coefs, sigma_u, df_modelo.values, resid, df.columns, None if exog is None else exog.to_numpy()),
+        "diagnosticos": diagnosticar_residuos(resid, df.columns, k_ar=np.asarray(coefs).shape[0]),
+    }
+    observar("proyecciones_ajuste_segundos", time.perf_counter() - inicio, tipo=modelo_usado.lower() if estimador == "mco" else estimador)
+    return ajuste
+
+
+def _trayectorias(seleccion, columnas, ultimos_niveles, punto, desv_est, alpha=0.05):
+    """
+    Trayectorias punto/inferior/superior en niveles para un nivel de significancia.
+    """
+    inferior, superior = intervalo(punto, desv_est, alpha)
+    trayectorias = {"punto": punto.copy(), "inferior": inferior, "superior": superior}
+    if seleccion["reconstruir_niveles"]:
+        # La suma acumulada es consistente por prefijos: recortar después equivale a pronosticar menos pasos
+        for col in seleccion["series_no_estacionarias"]:
+            i = list(columnas).index(col)
+            for trayectoria in trayectorias.values():
+                trayectoria[:, i] = ultimos_niveles[i] + np.cumsum(trayectoria[:, i])
+    return trayectorias
+
+
+def trayectorias_intervalo(ajuste, alpha):
+    """
+    Trayectorias al horizonte máximo para cualquier `alpha`, usando las desviaciones ya guardadas en el ajuste.
+    """
+    if alpha == 0.05:
+        return ajuste["trayectorias"]
+    return _trayectorias(ajuste, ajuste["columnas"], ajuste["ultimos_niveles"], ajuste["punto_modelo"], ajuste["desv_est"], alpha)
+
+
+def recortar_pronostico(ajuste, n_periodos, variable='inflacion', alpha=0.05):
+    """
+    Devuelve (fechas, punto, inferior, superior) de `variable` para los primeros `n_periodos`.
+    Con el alpha por defecto los arreglos son vistas de las trayectorias guardadas en el ajuste (no se copian).
+    """
+    n_max = len(ajuste["fechas_futuras"])
+    if n_periodos > n_max:
+        raise ValueError(f"El horizonte máximo es de {HORIZONTE_MAXIMO_ANOS} años ({n_max} meses).")
+    i = ajuste["columnas"].index(variable)
+    trayectorias = trayectorias_intervalo(ajuste, alpha)
+    return (ajuste["fechas_futuras"][:n_periodos],
+            trayectorias["punto"][:n_periodos, i],
+            trayectorias["inferior"][:n_periodos, i],
+            trayectorias["superior"][:n_periodos, i])
+
+
+# --- 3. ESCENARIOS ---
+def converger_a_meta(trayectoria, inicio, meta, theta):
+    """
+    Convergencia suave a la meta a partir de `inicio`: x_t = x_{t-1} + theta * (meta - x_{t-1}).
+    Se usa la forma cerrada x_t = meta + (1 - theta)^k * (x_{inicio-1} - meta), sin ciclo por mes.
+    """
+    escenario = np.array(trayectoria, dtype=float)
+    if inicio >= len(escenario):
+        return escenario
+    k = np.arange(1, len(escenario) - inicio + 1)
+    escenario[inicio:] = meta + (1 - theta) ** k * (escenario[inicio - 1] - meta)
+    return escenario
+
+
+def construir_resultados(df, ajuste, anos_proyeccion, params_escenarios, variable='inflacion'):
+    """
+    Arma el diccionario de resultados que consume el dashboard para un horizonte dado, sin reajustar el modelo.
+    """
+    n_periodos = anos_proyeccion * 12
+    fechas_futuras, punto, inferior, superior = recortar_pronostico(ajuste, n_periodos, variable)
+
+    # --- Creación de Escenarios ---
+    inicio = params_escenarios['anos_modelo'] * 12
+    escenario_base = pd.Series(converger_a_meta(punto, inicio, params_escenarios['meta_central'], params_escenarios['theta_central']), index=fechas_futuras, name=variable)
+    escenario_positivo = pd.Series(converger_a_meta(inferior, inicio, params_escenarios['meta_baja'], params_escenarios['theta_baja']), index=fechas_futuras, name=variable)
+    escenario_negativo = pd.Series(converger_a_meta(superior, inicio, params_escenarios['meta_alta'], params_escenarios['theta_alta']), index=fechas_futuras, name=variable)
+
+    # --- Preparación de Resultados Finales ---
+    promedios = { "Base": escenario_base.mean(),
+                 "Positivo": escenario_positivo.mean(),
+                 "Negativo": escenario_negativo.mean()
+                }
+
+    df_resumen_escenarios = pd.DataFrame({
+        'Promedio (%)': [promedios['Base'], promedios['Positivo'], promedios['Negativo']],
+        'Volatilidad (Desv. Est.)': [escenario_base.std(), escenario_positivo.std(), escenario_negativo.std()],
+        'Máximo (%)': [escenario_base.max(), escenario_positivo.max(), escenario_negativo.max()],
+        'Mínimo (%)': [escenario_base.min(), escenario_positivo.min(), escenario_negativo.min()]
+    }, index=['Base', 'Positivo', 'Negativo'])
+
+    df_resumen_escenarios = df_resumen_escenarios.round(3)
+
+    # Abanico de bandas de confianza para el periodo en que manda el modelo
+    n_bandas = min(inicio, n_periodos)
+    bandas_confianza = {}
+    for nivel in NIVELES_BANDAS:
+        _, _, inferior_nivel, superior_nivel = recortar_pronostico(ajuste, n_bandas, variable, alpha=round(1 - nivel, 10))
+        bandas_confianza[f"Inferior {nivel:.0%}"] = inferior_nivel
+        bandas_confianza[f"Superior {nivel:.0%}"] = superior_nivel
+    bandas_confianza = pd.DataFrame(bandas_confianza, index=fechas_futuras[:n_bandas])
+
+    return {
+    "df_historico": df,
+    "escenario_base": escenario_base,
+    "escenario_positivo": escenario_positivo,
+    "escenario_negativo": escenario_negativo,
+    "promedios": promedios,
+    "tabla_escenarios": df_resumen_escenarios,
+    "bandas_confianza": bandas_confianza,
+    "modelo_usado": ajuste["modelo_usado"],
+    "estimador": ajuste["estimador"],
+    "ensamble": ajuste["ensamble"],
+    "anos_proyectados": anos_proyeccion,
+    "series_no_estacionarias": ajuste["series_no_estacionarias"],
+    "relaciones_coint": ajuste["num_relaciones_coint"],
+    "exogenas": ajuste["exogenas"],
+    "resumen_texto": ajuste["resumen_texto"],
+    "residuos": pd.Series(ajuste["residuos"]),
+    "parametros_var": ajuste["parametros_var"],
+    "diagnosticos": ajuste["diagnosticos"]
+    }
@@ -0,0 +1,139 @@
+# programador_actualizaciones.py
+
+import os
+import threading
+from datetime import datetime, timezone
+
+import streamlit as st
+
+from calendario_publicaciones import CALENDARIO, proximos_eventos
+from fuentes_datos import credencial
+from metricas import incrementar
+from sesion_resultados import MODULOS_PAIS, PARAMETROS_DEFECTO, _ejecutar_proyeccion
+
+
+# --- 1. ACTUALIZACIÓN DE UN PAÍS ---
+def actualizar_pais(pais, estado, motivo):
+    """
+    Vuelve a descargar las series del país (lo que también actualiza el almacén local) y recalcula la proyección
+    por defecto, de modo que el siguiente usuario encuentre datos y ajuste ya en caché. No hace falta limpiar
+    la caché de datos: los cargadores reciben el vintage del calendario (ver calendario_publicaciones), que cambia
+    con cada publicación, así que las entradas de cualquier parámetro quedan sin uso. Si los datos cambiaron,
+    se descarta el ajuste hecho con los datos anteriores; los demás expiran por el ttl/max_entries de su caché.
+    """
+    nombre_credencial = MODULOS_PAIS[pais][3]
+    inicio = datetime.now(timezone.utc)
+    registro = {"pais": pais, "motivo": motivo, "inicio": inicio, "vintage": None, "segundos": None, "error": None}
+    try:
+        valor_credencial = credencial(nombre_credencial)
+        parametros = PARAMETROS_DEFECTO[pais]
+        resultados = _ejecutar_proyeccion(pais, valor_credencial, parametros)
+        if resultados is None:
+            registro["error"] = "No se pudieron descargar los datos."
+        else:
+            registro["vintage"] = resultados["df_historico"].index[-1].strftime("%Y-%m-%d")
+            with estado["candado"]:
+                anterior = estado["datos"].get(pais)
+                estado["datos"][pais] = resultados["df_historico"]
+            if anterior is not None and not anterior.equals(resultados["df_historico"]):
+                _descartar_ajuste(anterior)
+    except Exception as e: # El hilo nunca debe morir por un error de datos o de credenciales
+        registro["error"] = f"{type(e).__name__}: {e}"
+    registro["segundos"] = (datetime.now(timezone.utc) - inicio).total_seconds()
+    incrementar("proyecciones_actualizaciones_total", pais=pais, resultado="error" if registro["error"] else "ok")
+
+    with estado["candado"]:
+        estado["ultimas"][pais] = registro
+        estado["historial"] = ([registro] + estado["historial"])[:50]
+    return registro
+
+
+def _descartar_ajuste(df):
+    """
+    Descarta el ajuste de la proyección por defecto hecho con `df`, con los mismos argumentos con que
+    la llaman los módulos de país (sin exógenas, estimador por MCO).
+    """
+    from motor_var_vecm import ajustar_modelo
+
+    ajustar_modelo.clear(df, None, ('tasa_interes', 'tipo_cambio', *df.columns[3:]), "mco")
+
+
+def paises_con_credencial(calendario=CALENDARIO):
+    """
+    Países del calendario cuya credencial está configurada; sin ella cada actualización solo registraría un error.
+    """
+    disponibles = {}
+    for pais, reglas in calendario.items():
+        try:
+            credencial(MODULOS_PAIS[pais][3])
+        except (KeyError, FileNotFoundError):
+            continue
+        disponibles[pais] = reglas
+    return disponibles
+
+
+# --- 2. HILO EN SEGUNDO PLANO ---
+def _ciclo(estado, calendario):
+    # Calentamiento al arrancar: datos y ajustes por defecto de todos los países
+    for pais in calendario:
+        if estado["detener"].is_set():
+            return
+        actualizar_pais(pais, estado, "Calentamiento al iniciar")
+
+    while not estado["detener"].is_set():
+        momento, pais, regla = proximos_eventos(datetime.now(timezone.utc), calendario)[0]
+        with estado["candado"]:
+            estado["proximo"] = {"momento": momento, "pais": pais, "serie": regla["serie"], "descripcion": regla["descripcion"]}
+        espera = (momento - datetime.now(timezone.utc)).total_seconds()
+        if estado["detener"].wait(max(espera, 0)):
+            return
+        actualizar_pais(pais, estado, f"Publicación de {regla['descripcion']} ({regla['serie']})")
+
+
+def programador_activo():
+    """
+    El programador se desactiva con ACTUALIZACION_AUTOMATICA=0 (por ejemplo, en pruebas o benchmarks).
+    """
+    return os.environ.get("ACTUALIZACION_AUTOMATICA", "1") != "0"
+
+
+@st.cache_resource
+def iniciar_programador(calendario=None):
+    """
+    Arranca una sola vez por proceso (compartido por todas las sesiones) el hilo que calienta las cachés
+    y refresca cada país justo después de cada publicación. Devuelve el estado compartido del programador.
+    """
+    estado = {
+        "candado": threading.Lock(),
+        "detener": threading.Event(),
+        "ultimas": {},
+        "historial": [],
+        "proximo": None,
+        "hilo": None,
+        "datos": {}, # Último DataFrame por defecto de cada país, para descartar su ajuste cuando cambie
+        "sin_credencial": [],
+    }
+    if not programador_activo():
+        return estado
+    calendario = calendario or CALENDARIO
+    disponibles = paises_con_credencial(calendario)
+    estado["sin_credencial"] = [pais for pais in calendario if pais not in disponibles]
+    if not disponibles:
+        return estado
+    estado["hilo"] = threading.Thread(target=_ciclo, args=(estado, disponibles), name="programador_actualizaciones", daemon=True)
+    estado["hilo"].start()
+    return estado
+
+
+def resumen_programador(estado):
+    """
+    Copia legible del estado: última actualización por país y próxima publicación esperada.
+    """
+    with estado["candado"]:
+        return {
+            "activo": estado["hilo"] is not None and estado["hilo"].is_alive(),
+            "ultimas": dict(estado["ultimas"]),
+            "historial": list(estado["historial"]),
+            "proximo": estado["proximo"],
+            "sin_credencial": list(estado["sin_credencial"]),
+        }
@@ -0,0 +1,81 @@
+# pronostico_analitico.py
+
+from statistics import NormalDist
+
+import numpy as np
+
+# Niveles de confianza que se dibujan como abanico en la gráfica de proyección
+NIVELES_BANDAS = (0.68, 0.90, 0.95)
+
+
+# --- 1. COEFICIENTES MA(∞) ---
+def matriz_companera(coefs):
+    """
+    Matriz compañera (K*p x K*p) de un VAR(p) con coeficientes `coefs` de forma (p, K, K).
+    Acepta dimensiones previas de lote, p. ej. (replicas, p, K, K).
+    """
+    *lote, p, K, _ = coefs.shape
+    companera = np.zeros((*lote, K * p, K * p))
+    companera[..., :K, :] = np.moveaxis(coefs, -3, -2).reshape(*lote, K, K * p)
+    companera[..., K:, :-K] = np.eye(K * (p - 1))
+    return companera
+
+
+def coeficientes_ma(coefs, pasos):
+    """
+    Matrices Φ_0, ..., Φ_{pasos-1} de la representación MA(∞), con Φ_i = J C^i J'.
+    Las potencias de la matriz compañera se obtienen por duplicación: en cada ronda se multiplica
+    todo el bloque ya calculado por C^n de una sola vez, así que solo hay log2(pasos) rondas.
+    Con `coefs` de forma (..., p, K, K) devuelve (..., pasos, K, K).
+    """
+    *lote, p, K, _ = coefs.shape
+    companera = matriz_companera(coefs)
+    potencias = np.empty((*lote, pasos, K * p, K))
+    potencias[..., 0, :, :] = np.eye(K * p, K)
+    n, companera_n = 1, companera[..., None, :, :]
+    while n < pasos:
+        m = min(n, pasos - n)
+        potencias[..., n:n + m, :, :] = companera_n @ potencias[..., :m, :, :]
+        companera_n = companera_n @ companera_n
+        n += m
+    return potencias[..., :K, :]
+
+
+# --- 2. COVARIANZAS DEL ERROR DE PRONÓSTICO ---
+def covarianzas_error_pronostico(ma, sigma_u):
+    """
+    MSE(h) = Σ_{i<h} Φ_i Σ_u Φ_i' para h = 1..pasos, como suma acumulada de todas las contribuciones a la vez.
+    """
+    contribuciones = np.einsum('hij,jk,hlk->hil', ma, sigma_u, ma)
+    return np.cumsum(contribuciones, axis=0)
+
+
+def calcular_componentes(coefs, sigma_u, pasos):
+    """
+    Todo lo que depende del ajuste y no del nivel de confianza; se calcula una vez por modelo.
+    """
+    ma = coeficientes_ma(np.asarray(coefs), pasos)
+    mse = covarianzas_error_pronostico(ma, np.asarray(sigma_u))
+    return {
+        "coeficientes_ma": ma,
+        "mse": mse,
+        "desv_est": np.sqrt(np.diagonal(mse, axis1=1, axis2=2)),
+    }
+
+
+# --- 3. INTERVALOS PARA CUALQUIER NIVEL ---
+def cuantil_normal(alpha):
+    """
+    Cuantil z de dos colas para el nivel de significancia `alpha` (0.05 -> 1.96).
+    """
+    if not 0 < alpha < 1:
+        raise ValueError("alpha debe estar entre 0 y 1.")
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+def intervalo(punto, desv_est, alpha=0.05):
+    """
+    Límites inferior y superior gaussianos a partir de las desviaciones ya calculadas.
+    """
+    z = cuantil_normal(alpha)
+    return punto - z * desv_est, punto + z * desv_est
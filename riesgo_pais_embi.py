@@ -0,0 +1,225 @@
+# riesgo_pais_embi.py
+
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from almacen_series import guardar_estadisticas, guardar_observaciones, leer_estado, leer_estadisticas, leer_serie
+from motor_var_vecm import ajustar_modelo, construir_resultados
+
+# Fuentes del diferencial soberano, en puntos base. El EMBI de J.P. Morgan no tiene una API pública:
+# se puede cargar desde un archivo local (fecha, valor en pb) o usar como aproximación el diferencial
+# ajustado por opciones del índice ICE BofA de mercados emergentes que publica FRED (en %).
+FUENTES_EMBI = {
+    "archivo": {"etiqueta": "Archivo local (EMBI México)", "id_serie": "EMBI_MEXICO", "escala": 1,
+                "ruta": os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos_locales", "embi_mexico.csv")},
+    "fred": {"etiqueta": "FRED: ICE BofA EM Corporate Plus OAS (aproximación)", "id_serie": "BAMLEMCBPIOAS", "escala": 100},
+}
+
+# Ventana de las estadísticas móviles (días hábiles, ~1 año)
+VENTANA_DIAS = 252
+
+# Histograma de clases fijas para los percentiles: agregar o quitar una observación es O(1) y consultar
+# un percentil recorre un número fijo de clases, sin importar cuántos datos haya en la ventana o en la historia.
+ANCHO_CLASE_PB = 5
+LIMITE_HISTOGRAMA_PB = 5000
+N_CLASES = LIMITE_HISTOGRAMA_PB // ANCHO_CLASE_PB
+
+
+# --- 1. ESTADÍSTICAS INCREMENTALES ---
+def estado_inicial():
+    return {
+        "ventana": [],
+        "histograma_ventana": [0] * N_CLASES,
+        "histograma_total": [0] * N_CLASES,
+        "ultima_fecha": None,
+        "inicio": None,
+    }
+
+
+def _clase(valor):
+    return min(max(int(valor // ANCHO_CLASE_PB), 0), N_CLASES - 1)
+
+
+def percentil_histograma(conteos, q):
+    """
+    Percentil `q` (0-1) con interpolación lineal dentro de la clase.
+    """
+    acumulado = np.cumsum(conteos)
+    objetivo = q * acumulado[-1]
+    i = int(np.searchsorted(acumulado, objetivo))
+    previo = acumulado[i - 1] if i else 0
+    return (i + (objetivo - previo) / max(conteos[i], 1)) * ANCHO_CLASE_PB
+
+
+def actualizar_estadisticas(estado, nuevas):
+    """
+    Agrega observaciones nuevas (en orden) al estado y devuelve (estadísticas por fecha, estado actualizado).
+    Cada observación entra y la más vieja sale de la ventana ajustando sumas y conteos del histograma,
+    en tiempo constante. La volatilidad es la raíz del promedio de los cambios diarios al cuadrado (pb), anualizada.
+    """
+    ventana = deque(estado["ventana"])
+    # Las sumas se reconstruyen una vez por ingesta desde la ventana guardada, así no acumulan error de redondeo
+    suma = float(np.sum(estado["ventana"]))
+    suma_cuadrados = float(np.sum(np.square(np.diff(estado["ventana"]))))
+    histograma_ventana = np.array(estado["histograma_ventana"])
+    histograma_total = np.array(estado["histograma_total"])
+
+    filas = np.empty((len(nuevas), 7))
+    for t, valor in enumerate(nuevas.to_numpy(dtype=float)):
+        if ventana:
+            suma_cuadrados += (valor - ventana[-1]) ** 2
+        ventana.append(valor)
+        suma += valor
+        histograma_ventana[_clase(valor)] += 1
+        histograma_total[_clase(valor)] += 1
+        if len(ventana) > VENTANA_DIAS:
+            saliente = ventana.popleft()
+            suma -= saliente
+            suma_cuadrados -= (ventana[0] - saliente) ** 2
+            histograma_ventana[_clase(saliente)] -= 1
+
+        n = len(ventana)
+        volatilidad = np.sqrt(max(suma_cuadrados, 0.0) / (n - 1) * 252) if n > 1 else np.nan
+        clase = _clase(valor)
+        debajo = histograma_total[:clase].sum() + 0.5 * histograma_total[clase]
+        filas[t] = (valor, suma / n, volatilidad,
+                    percentil_histograma(histograma_ventana, 0.10),
+                    percentil_histograma(histograma_ventana, 0.50),
+                    percentil_histograma(histograma_ventana, 0.90),
+                    debajo / histograma_total.sum() * 100)
+
+    estado = {
+        "ventana": list(ventana),
+        "histograma_ventana": histograma_ventana.tolist(),
+        "histograma_total": histograma_total.tolist(),
+        "ultima_fecha": nuevas.index[-1].strftime("%Y-%m-%d"),
+        "inicio": estado.get("inicio"),
+    }
+    estadisticas = pd.DataFrame(filas, index=nuevas.index, columns=["valor", "media", "volatilidad", "p10", "p50", "p90", "percentil_historico"])
+    return estadisticas, estado
+
+
+def percentiles_historicos(estado, cuantiles=(0.25, 0.50, 0.75)):
+    """
+    Percentiles de toda la historia ingerida, leídos del histograma guardado.
+    """
+    return [percentil_histograma(np.array(estado["histograma_total"]), q) for q in cuantiles]
+
+
+# --- 2. INGESTA INCREMENTAL ---
+def _descargar_embi(fuente, api_key, desde):
+    configuracion = FUENTES_EMBI[fuente]
+    if fuente == "fred":
+        from VAR_VECM_USA_MODULO_CACHE import obtener_serie_fred
+
+        serie = obtener_serie_fred(configuracion["id_serie"], api_key, desde)
+    else:
+        if not os.path.exists(configuracion["ruta"]):
+            st.error(f"No se encontró el archivo {configuracion['ruta']} (columnas: fecha, valor en pb).")
+            return None
+        serie = pd.read_csv(configuracion["ruta"], index_col=0).iloc[:, 0]
+        serie.index = pd.to_datetime(serie.index)
+    if serie is None:
+        return None
+    return pd.to_numeric(serie, errors='coerce').dropna().sort_index() * configuracion["escala"]
+
+
+def inicio_historia(estado):
+    """
+    Fecha de inicio con la que se construyó la historia (los estados guardados antes de registrarla usan la última fecha,
+    de modo que se reconstruyen una vez).
+    """
+    return None if estado is None else estado.get("inicio") or estado["ultima_fecha"]
+
+
+def requiere_reconstruccion(estado, start_date):
+    inicio = inicio_historia(estado)
+    return inicio is not None and pd.Timestamp(start_date) < pd.Timestamp(inicio)
+
+
+def ingerir_embi(fuente, api_key=None, start_date="2000-01-01"):
+    """
+    Descarga solo las observaciones posteriores a la última ingerida, las guarda en el almacén de series
+    y actualiza las estadísticas precalculadas. Devuelve el número de observaciones nuevas (None si falló).
+    Si `start_date` es anterior al inicio con el que se construyó la historia, el estado se reconstruye desde cero
+    para que el histograma total y el percentil histórico cubran el rango nuevo.
+    """
+    id_serie = FUENTES_EMBI[fuente]["id_serie"]
+    estado = leer_estado("embi", id_serie) or estado_inicial()
+    reconstruir = requiere_reconstruccion(estado, start_date)
+    if reconstruir:
+        estado = estado_inicial()
+    estado["inicio"] = estado.get("inicio") or start_date
+    ultima = pd.Timestamp(estado["ultima_fecha"]) if estado["ultima_fecha"] else None
+    desde = (ultima + pd.Timedelta(days=1)).strftime("%Y-%m-%d") if ultima is not None else start_date
+
+    serie = _descargar_embi(fuente, api_key, desde)
+    if serie is None:
+        return None
+    nuevas = serie[serie.index > ultima] if ultima is not None else serie[serie.index >= pd.Timestamp(start_date)]
+    if nuevas.empty:
+        return 0
+
+    guardar_observaciones("embi", id_serie, nuevas)
+    estadisticas, estado = actualizar_estadisticas(estado, nuevas)
+    guardar_estadisticas("embi", id_serie, estadisticas, estado, reemplazar=reconstruir)
+    return len(nuevas)
+
+
+def estadisticas_embi(fuente):
+    """
+    Estadísticas precalculadas y estado incremental de la fuente (sin recalcular la historia).
+    """
+    id_serie = FUENTES_EMBI[fuente]["id_serie"]
+    return leer_estadisticas("embi", id_serie), leer_estado("embi", id_serie)
+
+
+# --- 3. PROYECCIÓN CON EL MOTOR VAR/VECM ---
+@st.cache_data
+def cargar_datos_embi(api_key, fuente, series_ids, start_date, vintage):
+    """
+    DataFrame mensual del modelo: diferencial (pb), tasa de interés y tipo de cambio (log).
+    `vintage` (última fecha ingerida) solo sirve para invalidar la caché cuando llegan datos nuevos.
+    """
+    from VAR_VECM_USA_MODULO_CACHE import obtener_serie_fred
+
+    diferencial = leer_serie("embi", FUENTES_EMBI[fuente]["id_serie"], start_date)
+    datos_api = {nombre: obtener_serie_fred(id_serie, api_key, start_date) for nombre, id_serie in series_ids.items()}
+    if diferencial.empty or not all(serie is not None for serie in datos_api.values()):
+        return None
+
+    df_raw = pd.concat([diferencial, *datos_api.values()], axis=1)
+    df_raw.columns = ['embi', 'tasa_interes', 'tipo_cambio']
+    df_raw.ffill(inplace=True)
+    df_mensual = df_raw.resample('MS').mean()
+
+    df = pd.DataFrame()
+    df['embi'] = df_mensual['embi']
+    df['tasa_interes'] = df_mensual['tasa_interes']
+    df['tipo_cambio'] = np.log(df_mensual['tipo_cambio'])
+    df.dropna(inplace=True)
+    return df
+
+
+def generar_proyeccion_embi(api_key, fuente, series_ids, start_date, anos_proyeccion, params_escenarios):
+    """
+    Proyección del diferencial con el mismo motor VAR/VECM de la inflación. Aquí también el diferencial
+    pasa por la prueba de raíz unitaria, así que puede modelarse en diferencias o dentro del VECM.
+    """
+    # --- 1. Carga de Datos ---
+    _, estado = estadisticas_embi(fuente)
+    if estado is None:
+        return None
+    df = cargar_datos_embi(api_key, fuente, series_ids, start_date, estado["ultima_fecha"])
+    if df is None:
+        return None
+
+    # --- 2. Selección, Entrenamiento y Proyección al horizonte máximo ---
+    ajuste = ajustar_modelo(df, variables_a_probar=('embi', 'tasa_interes', 'tipo_cambio'))
+
+    # --- 3. Escenarios y resultados para el horizonte pedido ---
+    return construir_resultados(df, ajuste, anos_proyeccion, params_escenarios, variable='embi')
@@ -0,0 +1,134 @@
+# sesion_resultados.py
+
+import hashlib
+import importlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from calendario_publicaciones import CALENDARIO, vintage_datos
+from fuentes_datos import credencial
+
+# --- PARÁMETROS POR DEFECTO DE CADA PAÍS ---
+# Son los mismos valores con los que se inicializan los formularios del dashboard.
+PARAMETROS_DEFECTO = {
+    "mexico": {
+        "series_ids": {"inflacion": "SP30578", "tasa_interes": "SF43783", "tipo_cambio": "SF43718"},
+        "start_date": "2002-01-01",
+        "anos_proyeccion": 30,
+        "params_escenarios": {
+            'anos_modelo': 5, 'meta_central': 3.0, 'meta_baja': 3.0, 'meta_alta': 5.5,
+            'theta_central': 0.030, 'theta_baja': 0.015, 'theta_alta': 0.050
+        },
+    },
+    "usa": {
+        "series_ids": {"cpi_index": "CPIAUCSL", "tasa_interes": "EFFR", "tipo_cambio": "DTWEXAFEGS"},
+        "start_date": "2005-01-01",
+        "anos_proyeccion": 30,
+        "params_escenarios": {
+            'anos_modelo': 5, 'meta_central': 2.0, 'meta_baja': 2.0, 'meta_alta': 3.5,
+            'theta_central': 0.030, 'theta_baja': 0.050, 'theta_alta': 0.015
+        },
+    },
+}
+
+# Módulo, función y credencial de cada país. Los módulos se importan hasta que se necesitan
+# (statsmodels tarda más en importarse que todo el resto del dashboard).
+MODULOS_PAIS = {
+    "mexico": ("VAR_VECM_MEXICO_MODULO_CACHE2", "generar_proyeccion_mexico", "token", "TOKEN_BANXICO"),
+    "usa": ("VAR_VECM_USA_MODULO_CACHE", "generar_proyeccion_usa", "api_key", "FRED_API_KEY"),
+}
+
+
+# --- FUNCIONES AUXILIARES ---
+def hash_parametros(parametros):
+    """
+    Huella corta y estable de un diccionario de parámetros (sin tokens).
+    """
+    texto = json.dumps(parametros, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+@st.cache_resource
+def _ejecutor_precarga():
+    # Un solo hilo compartido por todas las sesiones: la precarga nunca compite con el usuario por varios núcleos.
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="precarga")
+
+
+def _espacios():
+    return (st.session_state.setdefault('resultados_por_pais', {}),
+            st.session_state.setdefault('resultado_activo', {}),
+            st.session_state.setdefault('precargas', {}))
+
+
+# --- ALMACENAMIENTO DE RESULTADOS POR PAÍS ---
+def guardar_resultado(pais, parametros, resultados):
+    """
+    Guarda los resultados en el espacio del país bajo la huella de sus parámetros y los marca como activos.
+    """
+    slots, activos, _ = _espacios()
+    clave = hash_parametros(parametros)
+    slots.setdefault(pais, {})[clave] = resultados
+    activos[pais] = clave
+    return clave
+
+
+def resultado_desactualizado(pais, resultados):
+    """
+    True si los resultados se calcularon antes de la última publicación de datos del país (ver calendario_publicaciones).
+    """
+    return pais in CALENDARIO and resultados.get("vintage_datos") is not None and resultados["vintage_datos"] < vintage_datos(pais)
+
+
+def obtener_resultado(pais, parametros=None):
+    """
+    Devuelve los resultados del país: los de `parametros` si se indican, o los activos en caso contrario.
+    Si aún no hay resultados pero terminó una precarga para ese país, se adopta como resultado activo.
+    Al pedir unos `parametros` concretos, los resultados anteriores a la última publicación se descartan
+    para que se vuelvan a calcular; los activos se devuelven igual y el dashboard los marca como desactualizados.
+    """
+    slots, activos, precargas = _espacios()
+    slots_pais = slots.get(pais, {})
+
+    if pais in precargas and precargas[pais][1].done():
+        clave_precarga, futuro = precargas.pop(pais)
+        try:
+            resultado_precarga = futuro.result()
+        except Exception:
+            resultado_precarga = None
+        if resultado_precarga:
+            slots_pais = slots.setdefault(pais, {})
+            slots_pais.setdefault(clave_precarga, resultado_precarga)
+            activos.setdefault(pais, clave_precarga)
+
+    clave = hash_parametros(parametros) if parametros is not None else activos.get(pais)
+    if parametros is not None and clave in slots_pais and resultado_desactualizado(pais, slots_pais[clave]):
+        del slots_pais[clave]
+    if clave is not None and parametros is not None and clave in slots_pais:
+        activos[pais] = clave
+    return slots_pais.get(clave)
+
+
+def _ejecutar_proyeccion(pais, valor_credencial, parametros):
+    modulo, funcion, argumento_credencial, _ = MODULOS_PAIS[pais]
+    generar_proyeccion = getattr(importlib.import_module(modulo), funcion)
+    return generar_proyeccion(**{argumento_credencial: valor_credencial}, **parametros)
+
+
+def precargar(pais, parametros=None):
+    """
+    Lanza en segundo plano la proyección por defecto de `pais`, si todavía no existe ni se está calculando.
+    La importación del módulo del país también ocurre en el hilo de precarga.
+    """
+    slots, _, precargas = _espacios()
+    parametros = parametros if parametros is not None else PARAMETROS_DEFECTO[pais]
+    clave = hash_parametros(parametros)
+    if clave in slots.get(pais, {}) or pais in precargas:
+        return
+    try:
+        valor_credencial = credencial(MODULOS_PAIS[pais][3])
+    except (KeyError, FileNotFoundError): # La precarga es opcional: sin credencial de ese país no se precarga
+        return
+    futuro = _ejecutor_precarga().submit(_ejecutar_proyeccion, pais, valor_credencial, parametros)
+    precargas[pais] = (clave, futuro)
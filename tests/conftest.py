@@ -0,0 +1,14 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Los módulos viven en la raíz del repositorio, igual que para los benchmarks
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    # statsmodels avisa de cambios futuros en sus tipos de retorno y de frecuencias en datos simulados;
+    # no afecta las comparaciones
+    config.addinivalue_line("filterwarnings", "ignore::FutureWarning")
+    config.addinivalue_line("filterwarnings", "ignore::statsmodels.tools.sm_exceptions.ValueWarning")
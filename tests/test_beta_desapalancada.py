@@ -0,0 +1,60 @@
+# tests/test_beta_desapalancada.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from beta_desapalancada import betas_moviles, betas_regresion, desapalancar_hamada, leer_tabla_local
+
+VENTANA = 60
+
+
+@pytest.fixture(scope="module")
+def rendimientos_simulados():
+    rng = np.random.default_rng(0)
+    dias, tickers = 400, 8
+    mercado = rng.normal(0.0004, 0.01, dias)
+    activos = mercado[:, None] * rng.uniform(0.3, 1.8, tickers) + rng.normal(0, 0.015, (dias, tickers))
+    # Historias incompletas y un hueco aislado
+    for j, inicio in enumerate(rng.integers(0, dias // 2, tickers)):
+        activos[:inicio, j] = np.nan
+    activos[300:305, 0] = np.nan
+    return activos, mercado
+
+
+def test_betas_moviles_igual_a_regresion_por_ventana(rendimientos_simulados):
+    activos, mercado = rendimientos_simulados
+    betas = betas_moviles(activos, mercado, VENTANA)
+    assert betas.shape == (len(mercado) - VENTANA + 1, activos.shape[1])
+
+    for t in range(VENTANA - 1, len(mercado)):
+        x = mercado[t - VENTANA + 1:t + 1]
+        for j in range(activos.shape[1]):
+            y = activos[t - VENTANA + 1:t + 1, j]
+            valido = ~np.isnan(y)
+            if valido.sum() >= int(0.8 * VENTANA):
+                assert betas[t - VENTANA + 1, j] == pytest.approx(np.polyfit(x[valido], y[valido], 1)[0], abs=1e-9)
+            else:
+                assert np.isnan(betas[t - VENTANA + 1, j])
+
+
+def test_betas_regresion_igual_a_polyfit(rendimientos_simulados):
+    activos, mercado = rendimientos_simulados
+    reciente = slice(-VENTANA, None)
+    esperadas = [np.polyfit(mercado[reciente], activos[reciente, j], 1)[0] for j in range(activos.shape[1])]
+    np.testing.assert_allclose(betas_regresion(activos[reciente], mercado[reciente]), esperadas, atol=1e-10)
+
+
+def test_desapalancar_hamada():
+    assert desapalancar_hamada(1.2, 0.5, 0.3) == pytest.approx(1.2 / 1.35)
+
+
+def test_parquet_sin_indice_usa_la_primera_columna(tmp_path):
+    pytest.importorskip("pyarrow")
+    precios = pd.DataFrame({"fecha": pd.date_range("2024-01-31", periods=3, freq="ME"), "AAA": [10.0, 11.0, 12.0]})
+    ruta = str(tmp_path / "precios.parquet")
+    precios.to_parquet(ruta, index=False)
+
+    tabla = leer_tabla_local(ruta)
+    assert list(tabla.columns) == ["AAA"]
+    assert tabla.index.equals(pd.DatetimeIndex(precios["fecha"], name="fecha"))
@@ -0,0 +1,56 @@
+# tests/test_diagnosticos_residuos.py
+
+import numpy as np
+import pytest
+
+from diagnosticos_residuos import REZAGOS_ACF, REZAGOS_ARCH, diagnosticar_residuos
+
+
+@pytest.fixture(scope="module")
+def ajuste_var():
+    from statsmodels.tsa.api import VAR
+
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=(300, 3)), axis=0) * 0.1 + rng.normal(size=(300, 3))
+    return VAR(y).fit(2)
+
+
+@pytest.fixture(scope="module")
+def diagnosticos(ajuste_var):
+    return diagnosticar_residuos(np.asarray(ajuste_var.resid), ["y0", "y1", "y2"], k_ar=ajuste_var.k_ar)
+
+
+def test_acf_y_bandas_de_bartlett_igual_a_statsmodels(ajuste_var, diagnosticos):
+    from statsmodels.tsa.stattools import acf
+
+    u = np.asarray(ajuste_var.resid)
+    for k in range(u.shape[1]):
+        valores, confianza = acf(u[:, k], nlags=REZAGOS_ACF, alpha=0.05)
+        np.testing.assert_allclose(diagnosticos["acf"][:, k], valores, atol=1e-10)
+        np.testing.assert_allclose(diagnosticos["bandas_acf"][:, k], confianza[1:, 1] - valores[1:], atol=1e-10)
+
+
+def test_ljung_box_jarque_bera_y_arch_igual_a_statsmodels(ajuste_var, diagnosticos):
+    from statsmodels.stats.diagnostic import acorr_ljungbox, het_arch
+    from statsmodels.stats.stattools import jarque_bera
+
+    u = np.asarray(ajuste_var.resid)
+    tabla = diagnosticos["tabla"]
+    for k in range(u.shape[1]):
+        ljung_box = acorr_ljungbox(u[:, k], lags=[REZAGOS_ACF])
+        assert tabla.iloc[k][f"Ljung-Box Q({REZAGOS_ACF})"] == pytest.approx(ljung_box.lb_stat.iloc[0], rel=1e-10)
+        assert tabla.iloc[k]["p-valor LB"] == pytest.approx(ljung_box.lb_pvalue.iloc[0], rel=1e-8)
+        assert tabla.iloc[k]["Jarque-Bera"] == pytest.approx(jarque_bera(u[:, k])[0], rel=1e-10)
+        assert tabla.iloc[k][f"ARCH-LM({REZAGOS_ARCH})"] == pytest.approx(het_arch(u[:, k], nlags=REZAGOS_ARCH)[0], rel=1e-8)
+
+
+def test_correlaciones_cruzadas_y_portmanteau_igual_a_statsmodels(ajuste_var, diagnosticos):
+    from statsmodels.tsa.stattools import ccf
+
+    u = np.asarray(ajuste_var.resid)
+    cruzadas = [[ccf(u[:, i], u[:, j], adjusted=False)[:REZAGOS_ACF + 1] for j in range(3)] for i in range(3)]
+    np.testing.assert_allclose(diagnosticos["correlaciones_cruzadas"], np.array(cruzadas).transpose(2, 0, 1), atol=1e-10)
+
+    blancura = ajuste_var.test_whiteness(nlags=REZAGOS_ACF, adjusted=True)
+    assert diagnosticos["portmanteau"]["estadistico"] == pytest.approx(blancura.test_statistic, rel=1e-10)
+    assert diagnosticos["portmanteau"]["grados_libertad"] == blancura.df
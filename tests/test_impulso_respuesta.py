@@ -0,0 +1,54 @@
+# tests/test_impulso_respuesta.py
+
+import numpy as np
+import pytest
+
+from impulso_respuesta import _ajustar_var_lote, calcular_impulso_respuesta, descomposicion_varianza, irf_ortogonal, parametros_var
+
+
+@pytest.fixture(scope="module")
+def datos():
+    rng = np.random.default_rng(1)
+    T, K = 300, 3
+    x = np.cumsum(rng.normal(size=(T, 1)), axis=0) * 0.1
+    y = np.zeros((T, K))
+    for t in range(2, T):
+        y[t] = 0.5 * y[t - 1] - 0.1 * y[t - 2] + np.array([1, -0.5, 0.3]) * x[t, 0] + 0.2 + rng.normal(size=K)
+    return y, x
+
+
+@pytest.mark.parametrize("con_exogenas", [False, True])
+def test_parametros_y_mco_por_lote_igual_a_statsmodels(datos, con_exogenas):
+    from statsmodels.tsa.api import VAR
+
+    y, x = datos
+    exog = x if con_exogenas else None
+    ajuste = VAR(y, exog=exog).fit(2, trend='c')
+    parametros = parametros_var(ajuste.coefs, ajuste.sigma_u, y, ajuste.resid, ["a", "b", "c"], exog)
+    np.testing.assert_allclose(parametros["intercepto"], ajuste.params[0], atol=1e-10)
+    np.testing.assert_allclose(parametros["coefs_exog"], ajuste.params[1:1 + (exog is not None)], atol=1e-10)
+
+    coefs, sigma_u = _ajustar_var_lote(y[None], 2, exog)
+    np.testing.assert_allclose(coefs[0], ajuste.coefs, atol=1e-10)
+    np.testing.assert_allclose(sigma_u[0], ajuste.sigma_u, atol=1e-10)
+
+
+def test_irf_y_fevd_igual_a_statsmodels(datos):
+    from statsmodels.tsa.api import VAR
+
+    y, _ = datos
+    ajuste = VAR(y).fit(2)
+    irf = irf_ortogonal(ajuste.coefs, ajuste.sigma_u, 12)
+    np.testing.assert_allclose(irf, ajuste.irf(12).orth_irfs, atol=1e-10)
+    np.testing.assert_allclose(descomposicion_varianza(irf)[:12], ajuste.fevd(12).decomp.transpose(1, 0, 2), atol=1e-10)
+
+
+def test_bandas_bootstrap_con_exogenas_contienen_la_irf(datos):
+    from statsmodels.tsa.api import VAR
+
+    y, x = datos
+    ajuste = VAR(y, exog=x).fit(2, trend='c')
+    parametros = parametros_var(ajuste.coefs, ajuste.sigma_u, y, ajuste.resid, ["a", "b", "c"], x)
+    resultado = calcular_impulso_respuesta(parametros, periodos=12, n_replicas=300, n_procesos=1)
+    assert resultado["inferior"].shape == resultado["irf"].shape
+    assert np.all((resultado["inferior"] <= resultado["irf"]) & (resultado["irf"] <= resultado["superior"]))
@@ -0,0 +1,47 @@
+# tests/test_pronostico_analitico.py
+
+import numpy as np
+import pytest
+
+from pronostico_analitico import calcular_componentes, coeficientes_ma, cuantil_normal, intervalo
+
+
+def simular_var(n_obs, k, p, semilla=0):
+    rng = np.random.default_rng(semilla)
+    coefs = rng.normal(0, 0.3 / (k * p), size=(p, k, k))
+    coefs[0] += 0.5 * np.eye(k)
+    y = np.zeros((n_obs + p, k))
+    for t in range(p, n_obs + p):
+        y[t] = sum(coefs[j] @ y[t - j - 1] for j in range(p)) + rng.normal(size=k)
+    return y[p:]
+
+
+@pytest.fixture(scope="module")
+def ajuste_var():
+    from statsmodels.tsa.api import VAR
+
+    return VAR(simular_var(300, 3, 4)).fit(4)
+
+
+def test_coeficientes_ma_igual_a_statsmodels(ajuste_var):
+    np.testing.assert_allclose(coeficientes_ma(ajuste_var.coefs, 40), ajuste_var.ma_rep(39), atol=1e-12)
+
+
+@pytest.mark.parametrize("alpha", [0.32, 0.10, 0.05])
+def test_intervalos_igual_a_forecast_interval(ajuste_var, alpha):
+    pasos = 120
+    y_input = ajuste_var.endog[-ajuste_var.k_ar:]
+    _, inferior_sm, superior_sm = ajuste_var.forecast_interval(y=y_input, steps=pasos, alpha=alpha)
+
+    punto = ajuste_var.forecast(y=y_input, steps=pasos)
+    componentes = calcular_componentes(ajuste_var.coefs, ajuste_var.sigma_u, pasos)
+    inferior, superior = intervalo(punto, componentes["desv_est"], alpha)
+
+    np.testing.assert_allclose(inferior, inferior_sm, atol=1e-10)
+    np.testing.assert_allclose(superior, superior_sm, atol=1e-10)
+
+
+def test_cuantil_normal_rechaza_alpha_fuera_de_rango():
+    assert cuantil_normal(0.05) == pytest.approx(1.959964, abs=1e-6)
+    with pytest.raises(ValueError):
+        cuantil_normal(1.5)
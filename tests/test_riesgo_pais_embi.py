@@ -0,0 +1,49 @@
+# tests/test_riesgo_pais_embi.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from riesgo_pais_embi import ANCHO_CLASE_PB, VENTANA_DIAS, actualizar_estadisticas, estado_inicial, requiere_reconstruccion
+
+
+@pytest.fixture(scope="module")
+def diferencial():
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range("2010-01-01", periods=3 * VENTANA_DIAS)
+    return pd.Series(300 + np.cumsum(rng.normal(0, 6, len(fechas))).clip(-250, None), index=fechas)
+
+
+def test_estadisticas_igual_a_ventanas_de_pandas(diferencial):
+    estadisticas, _ = actualizar_estadisticas(estado_inicial(), diferencial)
+    ventana = diferencial.rolling(VENTANA_DIAS, min_periods=1)
+    completas = estadisticas.index[VENTANA_DIAS - 1:]
+
+    np.testing.assert_allclose(estadisticas["media"], ventana.mean(), atol=1e-8)
+    volatilidad = diferencial.diff().pow(2).rolling(VENTANA_DIAS - 1).mean().pow(0.5) * np.sqrt(252)
+    np.testing.assert_allclose(estadisticas.loc[completas, "volatilidad"], volatilidad[completas], atol=1e-8)
+    # Los percentiles salen del histograma: el error queda dentro de una clase
+    for q in (0.10, 0.50, 0.90):
+        diferencia = (estadisticas[f"p{int(q * 100)}"] - ventana.quantile(q)).abs()
+        assert diferencia.max() <= ANCHO_CLASE_PB
+
+
+def test_ingesta_por_partes_igual_a_una_sola(diferencial):
+    completa, estado_completo = actualizar_estadisticas(estado_inicial(), diferencial)
+
+    partes, estado = [], estado_inicial()
+    for corte in np.array_split(np.arange(len(diferencial)), [100, 400, 401]):
+        estadisticas, estado = actualizar_estadisticas(estado, diferencial.iloc[corte])
+        partes.append(estadisticas)
+
+    pd.testing.assert_frame_equal(pd.concat(partes), completa, atol=1e-8)
+    assert estado["histograma_total"] == estado_completo["histograma_total"]
+    assert estado["histograma_ventana"] == estado_completo["histograma_ventana"]
+
+
+def test_requiere_reconstruccion():
+    assert not requiere_reconstruccion(None, "2000-01-01")
+    assert requiere_reconstruccion({"inicio": "2005-01-01", "ultima_fecha": "2024-12-31"}, "2000-01-01")
+    assert not requiere_reconstruccion({"inicio": "2005-01-01", "ultima_fecha": "2024-12-31"}, "2010-01-01")
+    # Estados guardados antes de registrar "inicio"
+    assert requiere_reconstruccion({"ultima_fecha": "2024-12-31"}, "2010-01-01")
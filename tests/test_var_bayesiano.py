@@ -0,0 +1,61 @@
+# tests/test_var_bayesiano.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from var_bayesiano import REJILLA_LAMBDA, ajustar_var_contraccion, escalas_ar1, matrices_regresion, posterior, varianzas_prior
+
+
+def simular_sistema(n_obs=120, k=3, semilla=0):
+    rng = np.random.default_rng(semilla)
+    y = np.zeros((n_obs, k))
+    for t in range(1, n_obs):
+        y[t] = 0.6 * y[t - 1] + rng.normal(size=k)
+    return pd.DataFrame(y, columns=[f"serie_{j}" for j in range(k)], index=pd.date_range("2010-01-01", periods=n_obs, freq="MS"))
+
+
+@pytest.mark.parametrize("lam", [0.05, 0.2, 1.0])
+def test_verosimilitud_marginal_igual_a_identidad_de_bayes(lam):
+    """
+    log p(Y) = log p(Y | B, Σ) + log p(B, Σ) - log p(B, Σ | Y) para cualquier (B, Σ); se evalúa en la media posterior.
+    """
+    from scipy.stats import invwishart, matrix_normal
+
+    y = simular_sistema().to_numpy()
+    rezagos, K = 2, y.shape[1]
+    X, Y = matrices_regresion(y, rezagos)
+    escalas = escalas_ar1(y)
+    varianzas = varianzas_prior(escalas, rezagos, lam, decaimiento=1)
+    media_prior = np.zeros((X.shape[1], K))
+    media_prior[1:K + 1] = np.diag(np.full(K, 0.5))
+
+    B, sigma, log_marginal = posterior(X.T @ X, X.T @ Y, Y.T @ Y, len(Y), media_prior, varianzas, escalas)
+
+    grados_prior, grados = K + 2, K + 2 + len(Y)
+    S = sigma * (grados - K - 1)
+    covarianza_posterior = np.linalg.inv(X.T @ X + np.diag(1 / varianzas))
+    identidad = (matrix_normal(mean=X @ B, rowcov=np.eye(len(Y)), colcov=sigma).logpdf(Y)
+                 + matrix_normal(mean=media_prior, rowcov=np.diag(varianzas), colcov=sigma).logpdf(B)
+                 + invwishart(df=grados_prior, scale=np.diag(escalas ** 2)).logpdf(sigma)
+                 - matrix_normal(mean=B, rowcov=covarianza_posterior, colcov=sigma).logpdf(B)
+                 - invwishart(df=grados, scale=S).logpdf(sigma))
+    assert log_marginal == pytest.approx(identidad, abs=1e-6)
+
+
+def test_lambda_elegida_maximiza_la_verosimilitud_marginal():
+    df = simular_sistema()
+    elegido = ajustar_var_contraccion(df, "minnesota", rezagos=2)
+    for lam in REJILLA_LAMBDA[::5]:
+        fijo = ajustar_var_contraccion(df, "minnesota", rezagos=2, lam=lam)
+        assert fijo["log_verosimilitud_marginal"] <= elegido["log_verosimilitud_marginal"]
+
+
+def test_contraccion_debil_converge_a_mco():
+    from statsmodels.tsa.api import VAR
+
+    df = simular_sistema()
+    ajuste = ajustar_var_contraccion(df, "ridge", rezagos=2, lam=1e3)
+    referencia = VAR(df).fit(2)
+    np.testing.assert_allclose(ajuste["coefs"], referencia.coefs, atol=1e-4)
+    np.testing.assert_allclose(ajuste["intercepto"], referencia.intercept, atol=1e-3)
@@ -0,0 +1,177 @@
+# var_bayesiano.py
+
+import numpy as np
+import pandas as pd
+
+# Estimadores con contracción disponibles junto al VAR/VECM por MCO
+ESTIMADORES = {
+    "mco": "VAR/VECM (MCO)",
+    "minnesota": "VAR bayesiano (Minnesota)",
+    "ridge": "VAR ridge",
+}
+
+# Rezagos fijos: la contracción controla el sobreajuste, así que no hace falta elegirlos por AIC
+REZAGOS_CONTRACCION = 12
+
+# Rejilla de la contracción global λ; se elige el valor con mayor verosimilitud marginal
+REJILLA_LAMBDA = np.geomspace(0.01, 2.0, 30)
+
+# Varianza a priori de la constante y de las exógenas (prácticamente difusa)
+VARIANZA_DIFUSA = 1e4
+
+
+# --- 1. PRIOR CONJUGADA NORMAL-WISHART INVERSA ---
+def escalas_ar1(y):
+    """
+    Desviación estándar del residuo de un AR(1) con constante para cada columna, sin ciclos por variable.
+    Fijan la escala relativa de las variables en la prior.
+    """
+    actual, previo = y[1:], y[:-1]
+    previo_c, actual_c = previo - previo.mean(axis=0), actual - actual.mean(axis=0)
+    pendiente = np.sum(previo_c * actual_c, axis=0) / np.sum(previo_c ** 2, axis=0)
+    residuo = actual_c - pendiente * previo_c
+    return np.sqrt(np.sum(residuo ** 2, axis=0) / (len(actual) - 2))
+
+
+def varianzas_prior(escalas, rezagos, lam, decaimiento, n_exogenas=0):
+    """
+    Diagonal de Ω0 en el orden [constante, y_{t-1}, ..., y_{t-p}, exógenas]: λ² / (l^(2·decaimiento) σ_j²)
+    para el coeficiente del rezago l de la variable j. Con la prior conjugada Σ ⊗ Ω0, la misma Ω0
+    sirve para todas las ecuaciones y el factor σ_i² de la ecuación lo aporta Σ.
+    """
+    l = np.repeat(np.arange(1, rezagos + 1), len(escalas))
+    rezagadas = lam ** 2 / (l ** (2 * decaimiento) * np.tile(escalas, rezagos) ** 2)
+    return np.concatenate([[VARIANZA_DIFUSA], rezagadas, np.full(n_exogenas, VARIANZA_DIFUSA)])
+
+
+def matrices_regresion(y, rezagos, exog=None):
+    """
+    Regresores X = [1, y_{t-1}, ..., y_{t-p}, exógenas] y respuestas Y del VAR(p).
+    """
+    T = len(y)
+    bloques = [np.ones((T - rezagos, 1))] + [y[rezagos - j:T - j] for j in range(1, rezagos + 1)]
+    if exog is not None:
+        bloques.append(exog[rezagos:])
+    return np.concatenate(bloques, axis=1), y[rezagos:]
+
+
+# --- 2. POSTERIOR EN FORMA CERRADA ---
+def posterior(XtX, XtY, YtY, T, media_prior, varianzas, escalas):
+    """
+    Media posterior de los coeficientes y de Σ, y log-verosimilitud marginal, con la prior
+    B | Σ ~ MN(B0, Σ, Ω0), Σ ~ IW(S0, K + 2), S0 = diag(σ²).
+    La covarianza posterior de los coeficientes es Σ ⊗ (X'X + Ω0⁻¹)⁻¹: una sola factorización de tamaño
+    (1 + Kp) sirve para las K ecuaciones, en lugar de una de tamaño K(1 + Kp).
+    """
+    from scipy.linalg import cho_factor, cho_solve
+    from scipy.special import multigammaln
+
+    K = XtY.shape[1]
+    precision_prior = 1 / varianzas
+    precision = XtX + np.diag(precision_prior)
+    factor = cho_factor(precision)
+    B = cho_solve(factor, XtY + precision_prior[:, None] * media_prior)
+
+    # S̄ = S0 + Y'Y + B0'Ω0⁻¹B0 - B̄'(X'X + Ω0⁻¹)B̄
+    grados_prior = K + 2
+    S = np.diag(escalas ** 2) + YtY + media_prior.T @ (precision_prior[:, None] * media_prior) - B.T @ precision @ B
+    S = (S + S.T) / 2
+    grados = grados_prior + T
+
+    logdet_precision = 2 * np.sum(np.log(np.diag(factor[0])))
+    _, logdet_S = np.linalg.slogdet(S)
+    log_marginal = (-T * K / 2 * np.log(np.pi) + multigammaln(grados / 2, K) - multigammaln(grados_prior / 2, K)
+                    - K / 2 * (np.sum(np.log(varianzas)) + logdet_precision)
+                    + grados_prior / 2 * np.sum(np.log(escalas ** 2)) - grados / 2 * logdet_S)
+    return B, S / (grados - K - 1), log_marginal
+
+
+# --- 3. AJUSTE Y PRONÓSTICO ---
+def ajustar_var_contraccion(df_modelo, estimador="minnesota", exog=None, rezagos=REZAGOS_CONTRACCION, media_propia=None, lam=None):
+    """
+    VAR(p) con contracción y posterior en forma cerrada.
+    - "minnesota": la media a priori del primer rezago propio es `media_propia` (1 para series con raíz unitaria,
+      0 para estacionarias) y la varianza decrece con el rezago (l⁻²).
+    - "ridge": media a priori cero y la misma penalización para todos los rezagos (ridge sobre regresores
+      estandarizados por σ_j); se usa con el modelo en diferencias.
+    `lam` fija la contracción global; si es None se elige en REJILLA_LAMBDA por verosimilitud marginal,
+    reutilizando X'X, X'Y y Y'Y para cada valor.
+    """
+    y = np.asarray(df_modelo, dtype=float)
+    K = y.shape[1]
+    exog = None if exog is None else np.asarray(exog, dtype=float)
+    n_exogenas = 0 if exog is None else exog.shape[1]
+    X, Y = matrices_regresion(y, rezagos, exog)
+    XtX, XtY, YtY = X.T @ X, X.T @ Y, Y.T @ Y
+    escalas = escalas_ar1(y)
+
+    media_prior = np.zeros((X.shape[1], K))
+    if estimador == "minnesota":
+        decaimiento = 1
+        media_prior[1:K + 1] = np.diag(np.zeros(K) if media_propia is None else np.asarray(media_propia, dtype=float))
+    elif estimador == "ridge":
+        decaimiento = 0
+    else:
+        raise ValueError(f"Estimador desconocido: '{estimador}'. Opciones: minnesota, ridge.")
+
+    candidatos = REJILLA_LAMBDA if lam is None else [lam]
+    ajustes = [posterior(XtX, XtY, YtY, len(Y), media_prior, varianzas_prior(escalas, rezagos, l, decaimiento, n_exogenas), escalas)
+               for l in candidatos]
+    mejor = int(np.argmax([ajuste[2] for ajuste in ajustes]))
+    B, sigma_u, log_marginal = ajustes[mejor]
+
+    return {
+        "estimador": estimador,
+        "lambda": float(candidatos[mejor]),
+        "log_verosimilitud_marginal": float(log_marginal),
+        "k_ar": rezagos,
+        "intercepto": B[0],
+        "coefs": B[1:K * rezagos + 1].reshape(rezagos, K, K).transpose(0, 2, 1), # coefs[l][i, j]: efecto de y_j(t-l-1) en y_i(t)
+        "coefs_exog": B[K * rezagos + 1:],
+        "sigma_u": sigma_u,
+        "resid": pd.DataFrame(Y - X @ B, index=df_modelo.index[rezagos:], columns=df_modelo.columns),
+        "columnas": list(df_modelo.columns),
+    }
+
+
+def pronosticar(estimacion, y, pasos, exog_futuro=None):
+    """
+    Pronóstico puntual recursivo a `pasos` a partir de las últimas observaciones de `y`.
+    """
+    coefs, p = estimacion["coefs"], estimacion["k_ar"]
+    K = coefs.shape[1]
+    apilados = np.concatenate(coefs, axis=1) # (K, K*p)
+    base = np.broadcast_to(estimacion["intercepto"], (pasos, K)).copy()
+    if exog_futuro is not None and len(estimacion["coefs_exog"]):
+        base += np.asarray(exog_futuro, dtype=float)[:pasos] @ estimacion["coefs_exog"]
+
+    historia = np.asarray(y, dtype=float)[-p:][::-1].reshape(-1) # [y_t, y_{t-1}, ..., y_{t-p+1}]
+    punto = np.empty((pasos, K))
+    for h in range(pasos):
+        punto[h] = base[h] + apilados @ historia
+        historia = np.concatenate([punto[h], historia[:-K]])
+    return punto
+
+
+def resumen_contraccion(estimacion):
+    """
+    Texto de resumen equivalente al `summary()` de statsmodels para el diagnóstico del dashboard.
+    """
+    columnas = estimacion["columnas"]
+    tabla = pd.DataFrame({
+        "Intercepto": estimacion["intercepto"],
+        "Primer rezago propio": np.diagonal(estimacion["coefs"][0]),
+        "Suma de rezagos propios": np.diagonal(estimacion["coefs"].sum(axis=0)),
+        "Desv. est. del residuo": np.sqrt(np.diagonal(estimacion["sigma_u"])),
+    }, index=columnas)
+    correlaciones = estimacion["sigma_u"] / np.outer(np.sqrt(np.diagonal(estimacion["sigma_u"])), np.sqrt(np.diagonal(estimacion["sigma_u"])))
+    return "\n".join([
+        f"Resumen del {ESTIMADORES[estimacion['estimador']]}",
+        f"Variables: {len(columnas)}    Rezagos: {estimacion['k_ar']}    Observaciones: {len(estimacion['resid'])}",
+        f"Contracción global (lambda): {estimacion['lambda']:.4f}    Log-verosimilitud marginal: {estimacion['log_verosimilitud_marginal']:.2f}",
+        "",
+        tabla.round(4).to_string(),
+        "",
+        "Correlación de los residuos",
+        pd.DataFrame(correlaciones, index=columnas, columns=columnas).round(3).to_string(),
+    ])